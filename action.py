@@ -1,7 +1,7 @@
 from speech import speak
 from context import update_context
 
-def execute(intent, entities, text):
+def execute(intent, entities, text, ctx=None):
 
     if intent == "AC":
         if entities.get("temperature"):
@@ -32,5 +32,5 @@ def execute(intent, entities, text):
     else:
         response = "Command not understood"
 
-    speak(response)
-    update_context(intent, entities)
+    speak(response, preempt=True)   # a newer command's reply replaces any pending one
+    update_context(intent, entities, ctx)
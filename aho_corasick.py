@@ -0,0 +1,71 @@
+"""
+SPF Aho–Corasick automaton
+==========================
+Multi-pattern matcher that reports every occurrence of every pattern
+in one left-to-right pass.  Patterns are sequences of hashable symbols:
+plain strings match character by character, tuples of words match
+word by word.
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    def __init__(self, patterns):
+        self.patterns = [tuple(p) if not isinstance(p, str) else p for p in patterns]
+        self.lengths  = [len(p) for p in self.patterns]
+
+        self._goto = [{}]    # state → {symbol: next state}
+        self._fail = [0]
+        self._out  = [()]    # state → pattern ids ending here
+
+        for pid, pattern in enumerate(self.patterns):
+            self._add(pid, pattern)
+        self._link()
+
+    def _add(self, pid, pattern):
+        state = 0
+        for sym in pattern:
+            nxt = self._goto[state].get(sym)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][sym] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (pid,)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for sym, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and sym not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(sym, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def step(self, state, sym):
+        """Advance one symbol. Returns the new state; matches are in outputs(state)."""
+        goto, fail = self._goto, self._fail
+        while state and sym not in goto[state]:
+            state = fail[state]
+        return goto[state].get(sym, 0)
+
+    def outputs(self, state):
+        return self._out[state]
+
+    def finditer(self, seq):
+        """Yield (start, end, pattern_id) for every occurrence, overlaps included."""
+        state = 0
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self.lengths
+        for i, sym in enumerate(seq):
+            while state and sym not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(sym, 0)
+            for pid in out[state]:
+                yield i + 1 - lengths[pid], i + 1, pid
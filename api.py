@@ -4,33 +4,57 @@ SPF — Smart Car AI  |  Multilingual Flask API  v2
 Manual language selection — user picks from UI dropdown.
 Backend pipeline:
   1. Receive text + user-selected lang code
-  2. Translate input → English
-  3. NLP (intent + entities) — always English
+  2. Romanised hi/te/es the model knows → classified as-is ("native");
+     anything else → translate input → English ("translated")
+  3. NLP (intent + entities)
   4. Build English response → translate back to selected lang
+A repeated (text, lang) is answered from the result cache
+(result_cache.py) without running any of these steps.  Each request
+has a latency budget; when translation would overrun it the request
+degrades instead of waiting (deadline.py).
 
 Run:   python api.py
 Open:  http://localhost:5000
+
+The model loads in a background warm-up after the server starts
+listening; GET /ready returns 200 once it is done (503 before).
 """
 
+import hmac
+import json
 import os
 import re
 import threading
-from flask import Flask, jsonify, request, render_template
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, jsonify, request, render_template
 from flask_cors import CORS
 
 from preprocess import preprocess
-from intent_model import predict_intent
+from intent_model import generation as model_generation, predict_intents, warm_up as warm_up_model
 from entity import extract_entities
 from language import (
     translate_to_english,
     translate_from_english,
     build_response,
+    UNKNOWN_INTENT,
+    translation_cache_stats,
+    translation_batcher_stats,
+    thread_translation_failures,
+    TEMPLATES_VERSION,
     SUPPORTED_LANGUAGES,
     SPEECH_RECOGNITION_LANGS,
     TTS_LANG_HINTS,
 )
 from action import execute
-from context import context
+from speech import tts_stats
+from scheduler import MicroBatcher, QueueFull, BATCH_SIZE_BUCKETS
+from keyword_intent import KeywordClassifier, FASTPATH_ENABLED
+from session import SessionStore, SESSION_HEADER
+from metrics import METRICS
+from model_registry import ModelRegistry, RegistryBusy, RegistryReadOnly
+from routing import NativeRouter, command_words
+from result_cache import ResultCache
+import deadline
 
 BASE_DIR     = os.path.dirname(os.path.abspath(__file__))
 TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
@@ -38,19 +62,118 @@ TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
 app = Flask(__name__, template_folder=TEMPLATE_DIR)
 CORS(app)
 
+# Per-vehicle state (last intent, entities, lang, context), keyed by
+# the X-Session-Id header or "session_id" body field
+_sessions = SessionStore()
+
 _lock  = threading.Lock()
-_state = {
-    "processing": False,
-    "intent":     "",
-    "entities":   {},
-    "raw_voice":  "",
-    "clean_text": "",
-    "lang":       "en",
-}
-
-
-def _map_entities_for_dashboard(intent, entities, raw_english):
-    """Map NLP entities to dashboard-ready format (English labels)."""
+_state = {"inflight": 0}
+
+
+def _session_id(body=None):
+    return request.headers.get(SESSION_HEADER) or (body or {}).get("session_id")
+
+# Concurrent /process calls share model invocations through this batcher
+_scheduler = MicroBatcher(predict_intents)
+
+# Versioned models; /admin routes add phrases, fine-tune and roll back
+_registry   = ModelRegistry()
+ADMIN_TOKEN = os.environ.get("SPF_ADMIN_TOKEN")
+
+# Unambiguous trigger words skip the model entirely
+_keywords = KeywordClassifier(_registry.corpus()) if FASTPATH_ENABLED else None
+
+# Confident native-language commands skip the translate round trip
+_router = NativeRouter(KeywordClassifier(_registry.corpus()), _registry.corpus())
+
+
+def _on_model_swap(samples):
+    # Triggers must reflect the corpus the active model was tuned on
+    global _keywords
+    if _keywords is not None:
+        _keywords = KeywordClassifier(samples)
+    _router.keywords = KeywordClassifier(samples)
+    _router.words    = command_words(samples)
+
+
+_registry.on_swap(_on_model_swap)
+
+# Finished results of repeated commands, valid for one model + template version
+_results = ResultCache(version=lambda: (model_generation(), TEMPLATES_VERSION))
+
+# Words that mean "play" in the romanised training phrases
+NATIVE_PLAY_WORDS = {"bajao", "chalao", "shuru", "veyyi", "pettinchu", "start", "pon", "reproduce"}
+
+
+# Heavy dependencies (model backend, NLTK) load lazily; the warm-up
+# thread loads them once the server is listening and flips /ready.
+_ready = threading.Event()
+
+
+def _warm_up():
+    try:
+        warm_up_model()
+        extract_entities(preprocess("warm up"))
+        _ready.set()
+        print("[SPF] Warm-up complete — ready")
+    except Exception as e:
+        print(f"[SPF] Warm-up failed: {e}")
+        import traceback; traceback.print_exc()
+
+
+def start_warm_up():
+    """Start the background warm-up (call once the server is accepting connections)."""
+    t = threading.Thread(target=_warm_up, name="spf-warmup", daemon=True)
+    t.start()
+    return t
+
+
+def _classify(clean):
+    if _keywords is None:
+        return _scheduler.predict(clean)
+    return _keywords.classify(clean, _scheduler.predict)
+
+
+def _classify_batch(cleaned):
+    if _keywords is None:
+        return predict_intents(cleaned)
+    return _keywords.classify_batch(cleaned, predict_intents)
+
+
+def _understand(raw_lower, lang, timings=None):
+    """
+    Route one utterance. Returns (text, clean, intent, route) where text
+    is the raw input on the "native" and "deadline" routes and the
+    English translation on the "translated" / "english" routes.
+    """
+    clean = None
+    if lang != "en":
+        with METRICS.time("native_route", timings):
+            clean = preprocess(raw_lower)
+            intent, _, _ = _router.classify(clean, lang)
+        if intent:
+            return raw_lower, clean, intent, "native"
+    budget   = deadline.current()
+    timeouts = budget.timeouts if budget else 0
+    with METRICS.time("translate_to_english", timings):
+        english_text = translate_to_english(raw_lower, lang)
+    if budget is not None and budget.timeouts > timeouts:
+        # No translation in time, and the router already declined the
+        # input as-is (language, script, confidence): never guess an intent
+        budget.degrade("repeat_request")
+        return raw_lower, clean if clean is not None else preprocess(raw_lower), UNKNOWN_INTENT, "deadline"
+    with METRICS.time("preprocess", timings):
+        clean = preprocess(english_text)
+    with METRICS.time("predict_intent", timings):
+        intent = _classify(clean)
+    return english_text, clean, intent, "english" if lang == "en" else "translated"
+
+
+def _map_entities_for_dashboard(intent, entities, raw_english, native=False):
+    """
+    Map NLP entities to dashboard-ready format (English labels).
+    native=True when raw_english is the untranslated romanised input.
+    """
     out = {}
 
     if intent == "AC":
@@ -69,7 +192,8 @@ def _map_entities_for_dashboard(intent, entities, raw_english):
 
     elif intent == "MEDIA":
         raw = raw_english.lower()
-        out["action"] = "play" if "play" in raw else "stop"
+        play = "play" in raw or (native and not NATIVE_PLAY_WORDS.isdisjoint(raw.split()))
+        out["action"] = "play" if play else "stop"
         m = re.search(r'play (.+?) by (.+)', raw)
         if m:
             out["track"]  = m.group(1).strip().title()
@@ -96,6 +220,89 @@ def _map_entities_for_dashboard(intent, entities, raw_english):
     return out
 
 
+def _read_text_and_lang(body):
+    raw  = (body.get("text") or "").strip()
+    lang = (body.get("lang") or "en").strip()
+
+    # Fallback for unsupported codes
+    if lang not in SUPPORTED_LANGUAGES:
+        print(f"[SPF] Unknown lang '{lang}', defaulting to 'en'")
+        lang = "en"
+    return raw, lang
+
+
+def _wants_timings(body):
+    return bool(body.get("timings")) or request.args.get("timings") == "1"
+
+
+def _nlp(raw, lang, sid, timings=None):
+    """
+    Steps 1–3 of the pipeline for one utterance; records it in the
+    session. Returns (result fields, text the reply falls back on,
+    session fields written).
+    """
+    # 1–2. Native classification, or translate → English and classify
+    raw_lower = raw.lower()
+    english_text, clean, intent, route = _understand(raw_lower, lang, timings)
+    with METRICS.time("extract_entities", timings):
+        entities = extract_entities(clean)
+
+    # 3. Map entities for dashboard
+    dash_entities = _map_entities_for_dashboard(intent, entities, english_text,
+                                                native=route == "native")
+
+    fields = {"clean_text": clean, "intent": intent, "entities": entities}
+    _sessions.update(sid, raw_voice=raw_lower, lang=lang, **fields)
+
+    print(f"[SPF] lang={lang} route={route} intent={intent} text='{english_text}'")
+    return {
+        "intent":   intent,
+        "heard":    raw,
+        "entities": dash_entities,
+        "lang":     lang,
+        "route":    route,
+    }, english_text, fields
+
+
+def _cached(raw, lang, sid, timings=None):
+    """
+    Stored (result fields, response) for a repeated command, recorded in
+    the session as if it had been computed; None on a miss.
+    """
+    with METRICS.time("result_cache", timings):
+        hit = _results.get(raw, lang)
+    if hit is None:
+        return None
+    result, response_text, fields = hit
+    _sessions.update(sid, raw_voice=raw.lower(), lang=lang,
+                     **dict(fields, entities=dict(fields["entities"])))
+    print(f"[SPF] lang={lang} cached intent={result['intent']} text='{raw}'")
+    return dict(result, heard=raw), response_text
+
+
+def _reply(result, english_text, lang, timings=None):
+    """Step 4: the reply in lang, or (partly) in English when the deadline leaves no time to translate."""
+    budget   = deadline.current()
+    timeouts = budget.timeouts if budget else 0
+    with METRICS.time("build_response", timings):
+        response_text = build_response(result["intent"], result["entities"], lang, english_text)
+    if budget is not None and budget.timeouts > timeouts:
+        budget.degrade("english_response")
+    return response_text
+
+
+def _degraded():
+    """Degradation steps taken by this request so far (see deadline.py)."""
+    budget = deadline.current()
+    return list(budget.degraded) if budget else []
+
+
+def _remember(raw, lang, result, response_text, fields, version, failures):
+    """Cache a finished result unless a translation failed or the request degraded."""
+    if thread_translation_failures() == failures and not _degraded():
+        _results.put(raw, lang, (dict(result), response_text, fields), version)
+
+
 # ══════════════════════════════════════════════════════════
 @app.route("/")
 def index():
@@ -114,101 +321,344 @@ def languages():
 @app.route("/process", methods=["POST"])
 def process():
     """
-    Body: { "text": "...", "lang": "<code>" }
+    Body: { "text": "...", "lang": "<code>", "session_id": "..." }
     lang is the user-selected language code (e.g. "hi", "te", "es").
-    Defaults to "en" if missing or unsupported.
+    Defaults to "en" if missing or unsupported.  The session id (or the
+    X-Session-Id header) selects the vehicle whose state is updated.
     """
-    body = request.get_json(silent=True) or {}
-    raw  = (body.get("text") or "").strip()
-    lang = (body.get("lang") or "en").strip()
-
-    # Fallback for unsupported codes
-    if lang not in SUPPORTED_LANGUAGES:
-        print(f"[SPF] Unknown lang '{lang}', defaulting to 'en'")
-        lang = "en"
-
+    body      = request.get_json(silent=True) or {}
+    raw, lang = _read_text_and_lang(body)
     if not raw:
         return jsonify({"status": "error", "error": "No text received"}), 400
 
     with _lock:
-        if _state["processing"]:
-            return jsonify({"status": "busy"}), 409
-        _state["processing"] = True
+        _state["inflight"] += 1
+    timings = {} if _wants_timings(body) else None
+    METRICS.inc("requests_total")
 
     try:
-        # 1. Translate user input → English
-        raw_lower    = raw.lower()
-        english_text = translate_to_english(raw_lower, lang)
+        with METRICS.time("process", timings), deadline.bind(deadline.from_request(body, request.headers)):
+            sid      = _session_id(body)
+            version  = _results.version()
+            failures = thread_translation_failures()
+            cached   = _cached(raw, lang, sid, timings)
+            if cached is not None:
+                result, response_text = cached
+            else:
+                result, english_text, fields = _nlp(raw, lang, sid, timings)
+
+                # 4. Build response + translate back to selected lang
+                response_text = _reply(result, english_text, lang, timings)
+                _remember(raw, lang, result, response_text, fields, version, failures)
+            degraded = _degraded()
+        print(f"[SPF] response='{response_text}'")
+        if degraded:
+            METRICS.inc("degraded_requests_total")
+            print(f"[SPF] degraded: {', '.join(degraded)}")
 
-        # 2. NLP pipeline (always English)
-        clean    = preprocess(english_text)
-        intent   = predict_intent(clean)
-        entities = extract_entities(clean)
+        if timings is not None:
+            result["timings"] = timings
+        return jsonify({"status": "ok", **result, "response": response_text,
+                        "cached": cached is not None, "degraded": degraded}), 200
 
-        # 3. Map entities for dashboard
-        dash_entities = _map_entities_for_dashboard(intent, entities, english_text)
+    except QueueFull:
+        METRICS.inc("busy_responses_total")
+        return jsonify({"status": "busy"}), 409
 
-        # 4. Build response + translate back to selected lang
-        response_text = build_response(intent, dash_entities, lang, english_text)
+    except Exception as e:
+        METRICS.inc("error_responses_total")
+        print(f"[SPF] Error: {e}")
+        import traceback; traceback.print_exc()
+        return jsonify({"status": "error", "error": str(e)}), 500
 
+    finally:
         with _lock:
-            _state.update({
-                "raw_voice":  raw_lower,
-                "clean_text": clean,
-                "intent":     intent,
-                "entities":   entities,
-                "lang":       lang,
-            })
+            _state["inflight"] -= 1
 
-        print(f"[SPF] lang={lang} intent={intent} en='{english_text}'")
-        print(f"[SPF] response='{response_text}'")
 
-        return jsonify({
-            "status":   "ok",
-            "intent":   intent,
-            "heard":    raw,
-            "entities": dash_entities,
-            "lang":     lang,
-            "response": response_text,
-        }), 200
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@app.route("/process_stream", methods=["POST"])
+def process_stream():
+    """
+    Same body as /process, answered as Server-Sent Events:
+      event: nlp       { intent, heard, entities, lang, route, degraded }  — as soon as NLP is done
+      event: response  { response, degraded }                              — once the reply is translated
+    On failure a single "busy" or "error" event is sent instead.
+    """
+    body      = request.get_json(silent=True) or {}
+    raw, lang = _read_text_and_lang(body)
+    if not raw:
+        return jsonify({"status": "error", "error": "No text received"}), 400
+    sid     = _session_id(body)
+    timings = {} if _wants_timings(body) else None
+    budget  = deadline.from_request(body, request.headers)
+
+    def events():
+        with _lock:
+            _state["inflight"] += 1
+        METRICS.inc("requests_total")
+        try:
+            with deadline.bind(budget):
+                version  = _results.version()
+                failures = thread_translation_failures()
+                cached   = _cached(raw, lang, sid, timings)
+                if cached is not None:
+                    result, response_text = cached
+                    yield _sse("nlp", dict(result, cached=True, degraded=[]))
+                else:
+                    result, english_text, fields = _nlp(raw, lang, sid, timings)
+                    yield _sse("nlp", dict(result, cached=False, degraded=_degraded()))
+
+                    response_text = _reply(result, english_text, lang, timings)
+                    _remember(raw, lang, result, response_text, fields, version, failures)
+                degraded = _degraded()
+            print(f"[SPF] response='{response_text}'")
+            if degraded:
+                METRICS.inc("degraded_requests_total")
+            payload = {"response": response_text, "degraded": degraded}
+            if timings is not None:
+                payload["timings"] = timings
+            yield _sse("response", payload)
+
+        except QueueFull:
+            METRICS.inc("busy_responses_total")
+            yield _sse("busy", {"status": "busy"})
+
+        except Exception as e:
+            METRICS.inc("error_responses_total")
+            print(f"[SPF] Error: {e}")
+            import traceback; traceback.print_exc()
+            yield _sse("error", {"status": "error", "error": str(e)})
+
+        finally:
+            with _lock:
+                _state["inflight"] -= 1
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/process_batch", methods=["POST"])
+def process_batch():
+    """
+    Body: { "texts": ["...", ...], "lang": "<code>" }
+    Each entry in texts may also be { "text": "...", "lang": "<code>" }
+    to override the batch-level lang. Intent classification for the
+    whole batch runs as one model call.  Translations run concurrently
+    under one latency budget shared by the batch (deadline.py); each
+    result lists its own "degraded" steps.
+    """
+    body  = request.get_json(silent=True) or {}
+    budget = deadline.from_request(body, request.headers)
+    items = body.get("texts")
+    default_lang = (body.get("lang") or "en").strip()
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"status": "error", "error": "No texts received"}), 400
+
+    batch = []
+    for item in items:
+        if isinstance(item, dict):
+            raw  = (item.get("text") or "").strip()
+            lang = (item.get("lang") or default_lang).strip()
+        else:
+            raw, lang = str(item or "").strip(), default_lang
+        if lang not in SUPPORTED_LANGUAGES:
+            lang = "en"
+        batch.append((raw, lang))
+
+    try:
+        # 1. Native route for confident romanised commands
+        texts   = [raw.lower() for raw, _ in batch]
+        cleaned = [preprocess(t) if t else "" for t in texts]
+        intents, routes = {}, {}
+        native  = [i for i, (raw, lang) in enumerate(batch) if raw and lang != "en"]
+        for i, (intent, _, _) in zip(native, _router.classify_batch(
+                [cleaned[i] for i in native], [batch[i][1] for i in native])):
+            if intent:
+                intents[i], routes[i] = intent, "native"
+
+        # 2. Translate + preprocess the rest, all items at once
+        parts = {i: budget.split() if budget else None for i in range(len(batch))}
+        rest  = [i for i, (raw, lang) in enumerate(batch) if raw and i not in routes]
+
+        def to_english(i):
+            with deadline.bind(parts[i]):
+                return translate_to_english(texts[i], batch[i][1])
+
+        foreign = [i for i in rest if batch[i][1] != "en"]
+        if foreign:
+            with ThreadPoolExecutor(min(len(foreign), 16), thread_name_prefix="spf-batch") as pool:
+                for i, text in zip(foreign, pool.map(to_english, foreign)):
+                    texts[i] = text
+        for i in rest:
+            if parts[i] is not None and parts[i].timeouts:
+                # As in _understand: no translation in time, never guess
+                parts[i].degrade("repeat_request")
+                intents[i], routes[i] = UNKNOWN_INTENT, "deadline"
+                continue
+            cleaned[i] = preprocess(texts[i])
+            routes[i]  = "english" if batch[i][1] == "en" else "translated"
+
+        # 3. Keyword fast path, then one forward pass for the rest
+        idx = [i for i, (raw, _) in enumerate(batch) if raw and i not in intents]
+        intents.update(zip(idx, _classify_batch([cleaned[i] for i in idx])))
+
+        results = []
+        for i, (raw, lang) in enumerate(batch):
+            if not raw:
+                results.append({"status": "error", "error": "No text received", "heard": raw})
+                continue
+            intent        = intents[i]
+            entities      = extract_entities(cleaned[i])
+            dash_entities = _map_entities_for_dashboard(intent, entities, texts[i],
+                                                        native=routes[i] == "native")
+            with deadline.bind(parts[i]):
+                response = _reply({"intent": intent, "entities": dash_entities}, texts[i], lang)
+            results.append({
+                "status":   "ok",
+                "intent":   intent,
+                "heard":    raw,
+                "entities": dash_entities,
+                "lang":     lang,
+                "route":    routes[i],
+                "response": response,
+                "degraded": list(parts[i].degraded) if parts[i] else [],
+            })
+
+        print(f"[SPF] batch of {len(batch)} processed")
+        return jsonify({"status": "ok", "results": results}), 200
 
     except Exception as e:
-        print(f"[SPF] Error: {e}")
+        METRICS.inc("error_responses_total")
+        print(f"[SPF] Batch error: {e}")
         import traceback; traceback.print_exc()
         return jsonify({"status": "error", "error": str(e)}), 500
 
-    finally:
-        with _lock:
-            _state["processing"] = False
-
 
 @app.route("/execute", methods=["POST"])
 def execute_cmd():
     body = request.get_json(silent=True) or {}
-    with _lock:
-        intent   = body.get("intent")   or _state["intent"]
-        entities = body.get("entities") or _state["entities"]
-        text     = _state["clean_text"] or _state["raw_voice"]
-        lang     = _state["lang"]
+    with _sessions.session(_session_id(body)) as state:
+        intent = body.get("intent") or state["intent"]
+        text   = state["clean_text"] or state["raw_voice"]
+        lang   = state["lang"]
 
-    if not intent:
-        return jsonify({"success": False, "error": "No intent"}), 400
+        if not intent:
+            return jsonify({"success": False, "error": "No intent"}), 400
 
-    try:
-        execute(intent, _state["entities"], text)
-    except Exception as e:
-        print(f"[SPF] Execute warning (non-fatal): {e}")
+        try:
+            execute(intent, state["entities"], text, state["context"])
+        except Exception as e:
+            print(f"[SPF] Execute warning (non-fatal): {e}")
 
     return jsonify({"success": True, "lang": lang}), 200
 
 
+def _admin_denied():
+    # Off unless a token is configured: the server listens on every interface
+    if not ADMIN_TOKEN:
+        return jsonify({"status": "error", "error": "Admin API disabled (set SPF_ADMIN_TOKEN)"}), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", "").encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"status": "error", "error": "Forbidden"}), 403
+    return None
+
+
+@app.route("/admin/phrases", methods=["POST"])
+def admin_phrases():
+    """
+    Body: { "phrases": [ {"text": "...", "intent": "AC"}, ... ] }
+    (or [["...", "AC"], ...]).  Fine-tunes in the background; poll
+    GET /admin/model for the result.
+    """
+    denied = _admin_denied()
+    if denied:
+        return denied
+    body    = request.get_json(silent=True) or {}
+    phrases = [(p.get("text"), p.get("intent")) if isinstance(p, dict) else tuple(p)[:2]
+               for p in body.get("phrases") or []]
+    try:
+        job = _registry.submit(phrases)
+    except RegistryBusy as e:
+        return jsonify({"status": "busy", "error": str(e)}), 409
+    except RegistryReadOnly as e:
+        return jsonify({"status": "error", "error": str(e)}), 409
+    except (ValueError, TypeError) as e:
+        return jsonify({"status": "error", "error": f"Bad phrases: {e}"}), 400
+    return jsonify({"status": "accepted", "job": job}), 202
+
+
+@app.route("/admin/model", methods=["GET"])
+def admin_model():
+    denied = _admin_denied()
+    if denied:
+        return denied
+    return jsonify(_registry.status()), 200
+
+
+@app.route("/admin/model/rollback", methods=["POST"])
+def admin_rollback():
+    """Body: { "version": N } — or empty for the version before the active one."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    body = request.get_json(silent=True) or {}
+    try:
+        version = _registry.rollback(body.get("version"))
+    except RegistryReadOnly as e:
+        return jsonify({"status": "error", "error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    return jsonify({"status": "ok", "active": version}), 200
+
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    if _ready.is_set():
+        return jsonify({"ready": True}), 200
+    return jsonify({"ready": False}), 503
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text format: stage latency histograms and counters."""
+    cache = translation_cache_stats()
+    extra = {f"translation_cache_{k}_total": cache[k] for k in ("memory_hits", "disk_hits", "misses")}
+    if _keywords is not None:
+        extra["keyword_fastpath_hits_total"] = _keywords.stats()["fast"]
+    batcher = translation_batcher_stats()
+    if batcher is not None:
+        extra.update({f"translation_batcher_{k}_total": batcher[k] for k in ("batches", "sent", "shared")})
+    results = _results.stats()
+    extra.update({f"result_cache_{k}_total": results[k] for k in ("hits", "misses", "stale")})
+    sched = _scheduler.stats()
+    extra.update({f"scheduler_{k}_total": sched[k] for k in ("batches", "requests", "rejected", "errors", "timeouts")})
+    gauges = {"scheduler_queue_depth": sched["queue_depth"], "scheduler_max_queue_depth": sched["max_queue_depth"]}
+    hist   = {"scheduler_batch_size": (BATCH_SIZE_BUCKETS, list(sched["batch_size_hist"].values()), sched["requests"])}
+    return Response(METRICS.render(extra, gauges, hist), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/status", methods=["GET"])
 def status():
+    lang = _sessions.get(_session_id())["lang"]
     with _lock:
         return jsonify({
             "ok":         True,
-            "processing": _state["processing"],
-            "lang":       _state["lang"],
+            "processing": _state["inflight"] > 0,
+            "inflight":   _state["inflight"],
+            "lang":       lang,
+            "sessions":   _sessions.stats(),
+            "scheduler":  _scheduler.stats(),
+            "translation_cache": translation_cache_stats(),
+            "translation_batcher": translation_batcher_stats(),
+            "result_cache":      _results.stats(),
+            "keyword_fastpath":  _keywords.stats() if _keywords else None,
+            "routing":           _router.stats(),
+            "tts":               tts_stats(),
+            "latency":           METRICS.snapshot()["stages"],
         }), 200
 
 
@@ -221,4 +671,7 @@ if __name__ == "__main__":
     print("  SPF Smart Car AI v2  →  http://localhost:5000")
     print(f"  Languages: {len(SUPPORTED_LANGUAGES)} supported (manual selection)")
     print("=" * 60)
-    app.run(host="0.0.0.0", port=5000, debug=False, threaded=True)
+    from werkzeug.serving import make_server
+    server = make_server("0.0.0.0", 5000, app, threaded=True)   # listening from here on
+    start_warm_up()
+    server.serve_forever()
@@ -0,0 +1,195 @@
+"""
+SPF — Smart Car AI  |  asyncio pipeline (ASGI)
+===============================================
+Same request and response fields as api.py's /process, but translation
+runs on a pooled keep-alive HTTP client (async_translate.py) with
+per-call timeouts and optional hedging.  A slow translate call suspends
+only its own request instead of holding a server thread, so concurrency
+is not capped by the thread count.
+
+Intent classification shares the keyword fast path and the
+micro-batching scheduler with api.py; preprocessing and the native
+router run on the default executor, never on the event loop.
+
+Not ported from api.py: sessions (there is no /execute here), the
+result cache, the request deadline and /metrics.  Translation time is
+bounded by the translator's own per-call timeouts instead.
+
+Run:   uvicorn async_api:app --port 5001
+Routes: POST /process   GET /ready   GET /status
+"""
+
+import asyncio
+import json
+import time
+
+import api
+from async_translate import AsyncTranslator
+from entity import extract_entities
+from intent_model import warm_up as warm_up_model
+from language import (
+    SUPPORTED_LANGUAGES,
+    build_response_async,
+    translate_to_english_async,
+    translation_cache_stats,
+)
+from preprocess import preprocess
+from scheduler import QueueFull
+
+_translator = None
+_ready      = asyncio.Event()
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        _translator = AsyncTranslator()
+    return _translator
+
+
+async def _off_loop(fn, *args):
+    """Run a blocking call (NLTK, model load, inference) on the default executor."""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+def _native(raw_lower, lang):
+    clean = preprocess(raw_lower)
+    return clean, api._router.classify(clean, lang)[0]
+
+
+async def _classify(clean):
+    intent = api._keywords.lookup(clean) if api._keywords is not None else None
+    if intent:
+        return intent
+    return await asyncio.wrap_future(api._scheduler.submit(clean))
+
+
+async def process(raw, lang, translator=None):
+    """Run the /process pipeline. Returns (response body, HTTP status)."""
+    translator = translator or get_translator()
+    raw  = (raw or "").strip()
+    lang = (lang or "en").strip()
+
+    if lang not in SUPPORTED_LANGUAGES:
+        print(f"[SPF] Unknown lang '{lang}', defaulting to 'en'")
+        lang = "en"
+
+    if not raw:
+        return {"status": "error", "error": "No text received"}, 400
+
+    try:
+        # 1. Native route for confident romanised commands
+        raw_lower = raw.lower()
+        route, intent = "english" if lang == "en" else "translated", None
+        if lang != "en":
+            clean, intent = await _off_loop(_native, raw_lower, lang)
+        if intent:
+            route, english_text = "native", raw_lower
+        else:
+            # 2. Translate user input → English and classify
+            english_text = await translate_to_english_async(raw_lower, lang, translator.translate)
+            clean        = await _off_loop(preprocess, english_text)
+            intent       = await _classify(clean)
+        entities = extract_entities(clean)
+
+        # 3. Map entities for dashboard
+        dash_entities = api._map_entities_for_dashboard(intent, entities, english_text,
+                                                        native=route == "native")
+
+        # 4. Build response + translate back to selected lang
+        response_text = await build_response_async(intent, dash_entities, lang, translator.translate)
+
+        return {
+            "status":   "ok",
+            "intent":   intent,
+            "heard":    raw,
+            "entities": dash_entities,
+            "lang":     lang,
+            "route":    route,
+            "response": response_text,
+        }, 200
+
+    except QueueFull:
+        return {"status": "busy"}, 409
+
+    except Exception as e:
+        print(f"[SPF] Error: {e}")
+        import traceback; traceback.print_exc()
+        return {"status": "error", "error": str(e)}, 500
+
+
+# ══════════════════════════════════════════════════════════
+#  Minimal ASGI app
+# ══════════════════════════════════════════════════════════
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode("utf-8")
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()),
+                            (b"access-control-allow-origin", b"*")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_json(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    try:
+        return json.loads(b"".join(chunks) or b"{}")
+    except ValueError:
+        return {}
+
+
+async def _warm_up():
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    await loop.run_in_executor(None, warm_up_model)
+    _ready.set()
+    print(f"[SPF] Warm-up complete in {time.perf_counter() - t0:.2f}s — ready")
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            get_translator()
+            asyncio.ensure_future(_warm_up())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _translator is not None:
+                await _translator.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"]
+
+    if method == "POST" and path == "/process":
+        body = await _read_json(receive)
+        payload, status = await process(body.get("text"), body.get("lang"))
+        return await _send_json(send, status, payload)
+
+    if method == "GET" and path == "/ready":
+        ready = _ready.is_set()
+        return await _send_json(send, 200 if ready else 503, {"ready": ready})
+
+    if method == "GET" and path == "/status":
+        return await _send_json(send, 200, {
+            "ok":                True,
+            "scheduler":         api._scheduler.stats(),
+            "translation_cache": translation_cache_stats(),
+            "translator":        get_translator().stats(),
+            "routing":           api._router.stats(),
+        })
+
+    await _send_json(send, 404, {"status": "error", "error": "Not found"})
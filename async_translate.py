@@ -0,0 +1,108 @@
+"""
+SPF Async Translator — pooled, time-bounded Google Translate client
+====================================================================
+Used by the asyncio pipeline (async_api.py).  One aiohttp session is
+shared by every request, so connections to the translate endpoint are
+kept alive and reused instead of opened per call.
+
+• Each call is bounded by a timeout.
+• Optional hedging: if the first request has not answered after
+  SPF_TRANSLATE_HEDGE_MS, a second identical request is sent and the
+  first successful answer wins.
+
+Talks to the same endpoint deep-translator scrapes
+(translate.google.com/m); SPF_TRANSLATE_URL points it at a stub server
+for testing (benchmarks/stub_translator.py).
+
+Install:  pip install aiohttp
+"""
+
+import asyncio
+import html
+import os
+import re
+
+TRANSLATE_URL     = os.environ.get("SPF_TRANSLATE_URL", "https://translate.google.com/m")
+TRANSLATE_TIMEOUT = float(os.environ.get("SPF_TRANSLATE_TIMEOUT", "3.0"))
+HEDGE_AFTER_MS    = float(os.environ.get("SPF_TRANSLATE_HEDGE_MS", "0"))   # 0 = no hedging
+MAX_CONNECTIONS   = int(os.environ.get("SPF_TRANSLATE_MAX_CONNECTIONS", "100"))
+
+_RESULT_RE = re.compile(r'<div[^>]*class="[^"]*result-container[^"]*"[^>]*>(.*?)</div>', re.S)
+
+
+class TranslationError(Exception):
+    pass
+
+
+class AsyncTranslator:
+    def __init__(self, url=TRANSLATE_URL, timeout=TRANSLATE_TIMEOUT,
+                 hedge_after_ms=HEDGE_AFTER_MS, max_connections=MAX_CONNECTIONS):
+        self.url     = url
+        self.timeout = timeout
+        self.hedge   = hedge_after_ms / 1000.0
+        self.max_connections = max_connections
+        self._session = None
+
+        self.requests = 0
+        self.hedged   = 0
+        self.timeouts = 0
+
+    def _get_session(self):
+        # Created on first use: an aiohttp session belongs to the running loop
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                headers={"User-Agent": "Mozilla/5.0"},
+            )
+        return self._session
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def _fetch(self, text, source, target):
+        self.requests += 1
+        params = {"sl": source, "tl": target, "q": text}
+        async with self._get_session().get(self.url, params=params) as resp:
+            if resp.status != 200:
+                raise TranslationError(f"HTTP {resp.status}")
+            body = await resp.text()
+        m = _RESULT_RE.search(body)
+        if not m:
+            raise TranslationError("no translation in response")
+        return html.unescape(m.group(1)).strip()
+
+    async def _hedged(self, text, source, target):
+        first = asyncio.ensure_future(self._fetch(text, source, target))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge)
+        if done:
+            return first.result()
+
+        self.hedged += 1
+        second  = asyncio.ensure_future(self._fetch(text, source, target))
+        pending = {first, second}
+        error   = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def translate(self, text, source, target):
+        """Translate text; raises TranslationError / asyncio.TimeoutError on failure."""
+        call = self._hedged if self.hedge > 0 else self._fetch
+        try:
+            return await asyncio.wait_for(call(text, source, target), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def stats(self):
+        return {"requests": self.requests, "hedged": self.hedged, "timeouts": self.timeouts}
@@ -0,0 +1,123 @@
+"""
+Async pipeline load test
+========================
+Drives async_api.process() against the local stub translator (which
+charges a fixed latency per request) at increasing concurrency, and
+compares it with the thread-per-request model of api.py: a fixed pool
+of worker threads making the same blocking translate calls.
+
+Every request uses a distinct text so the translation cache never hits
+on the input side (response templates are compiled once per run).
+
+Run:  python benchmarks/async_load.py [--delay-ms 200] [--threads 16]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_translator import StubTranslatorServer  # noqa: E402
+
+import async_api  # noqa: E402
+import language  # noqa: E402
+from async_translate import AsyncTranslator  # noqa: E402
+from intent_model import warm_up  # noqa: E402
+
+LEVELS = [1, 16, 64, 256]
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def _quiet(fn, *args):
+    """Run fn with the pipeline's per-request log lines suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def _report(mode, concurrency, wall, latencies):
+    print(f"{mode:>7} {concurrency:>6} {len(latencies) / wall:>10.1f} "
+          f"{_pct(latencies, 50) * 1000:>9.0f} {_pct(latencies, 99) * 1000:>9.0f}")
+
+
+async def _run_async(url, concurrency, rounds):
+    """concurrency requests in flight at a time, concurrency × rounds in total."""
+    translator = AsyncTranslator(url=url, max_connections=concurrency)
+    gate       = asyncio.Semaphore(concurrency)
+    latencies  = []
+
+    async def one(i):
+        async with gate:
+            t0 = time.perf_counter()
+            body, status = await async_api.process(f"khidki kholo {i}", "hi", translator)
+            assert status == 200, body
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(concurrency * rounds)))
+    wall = time.perf_counter() - t0
+    await translator.aclose()
+    return wall, latencies
+
+
+def _run_threads(url, concurrency, rounds, threads):
+    import requests   # what deep-translator uses under the hood
+
+    local = threading.local()
+
+    def blocking_translate(text, source, target):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        r = local.session.get(url, params={"sl": source, "tl": target, "q": text})
+        r.raise_for_status()
+        return r.text
+
+    latencies = []
+
+    def one(i):
+        t0 = time.perf_counter()
+        # One round trip in, one out — what a Flask worker thread blocks on
+        blocking_translate(f"khidki kholo {i}", "hi", "en")
+        blocking_translate(f"Adjusting the window {i}", "en", "hi")
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(concurrency * rounds)))
+    wall = time.perf_counter() - t0
+    return wall, latencies
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--delay-ms", type=float, default=200.0)
+    ap.add_argument("--threads", type=int, default=16, help="worker threads for the threaded baseline")
+    ap.add_argument("--rounds", type=int, default=2)
+    args = ap.parse_args()
+
+    warm_up()
+    with StubTranslatorServer(delay_ms=args.delay_ms) as stub:
+        print(f"stub translator {stub.url}, {args.delay_ms:.0f} ms per request, "
+              f"threaded baseline = {args.threads} threads")
+        print(f"{'mode':>7} {'conc':>6} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        for c in LEVELS:
+            language._cache.clear()
+            language._compiled.clear()
+            _report("async", c, *_quiet(asyncio.run, _run_async(stub.url, c, args.rounds)))
+        for c in LEVELS:
+            _report("threads", c, *_quiet(_run_threads, stub.url, c, args.rounds, args.threads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Capture session check (headless)
+================================
+Replays one synthetic "drive": background noise with spoken commands
+(formant-synthesised, see wakeword_eval.py) 0.8–1.5 s apart.  One
+command runs 8 s with pauses mid-sentence.  The stream goes through
+speech.CaptureSession with a FileSource and a ScriptedRecognizer that
+takes --recognise-ms per utterance.
+
+Reports how many commands were cut as one utterance each, how far the
+cut boundaries are from the truth, whether the long command survived
+whole, and queue / recognition timings.  With --realtime the stream is
+paced like a microphone, and the time from the end of speech to the
+text being available is measured.
+
+Run:  python benchmarks/capture_session.py [--commands N] [--recognise-ms MS] [--realtime]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import speech          # noqa: E402
+import wakeword_eval   # noqa: E402
+
+SR = 16000
+
+WORDS = [["t", "e", "i", "k"], ["m", "i"], ["h", "o", "u", "m"], ["s", "e", "t"],
+         ["p", "l", "e", "i"], ["m", "u", "s", "i", "k"], ["k", "o", "l"], ["a", "s", "f", "a"]]
+
+
+def command(rng, words, pause_s=(0.05, 0.15)):
+    parts = []
+    for w in range(words):
+        parts.append(wakeword_eval.synth(WORDS[rng.integers(len(WORDS))], rng, f0=140, tempo=1.0))
+        parts.append(np.zeros(int(rng.uniform(*pause_s) * SR)))
+    return np.concatenate(parts[:-1]) * 0.3
+
+
+def drive(rng, n, long_at):
+    """(stream, [(start_s, end_s, transcript), ...])"""
+    pieces, truth, pos = [np.zeros(SR)], [], SR
+    for i in range(n):
+        if i == long_at:     # ~8 s with pauses of up to 0.5 s inside the sentence
+            speech_ = command(rng, 14, pause_s=(0.1, 0.5))
+        else:
+            speech_ = command(rng, int(rng.integers(2, 5)))
+        truth.append((pos / SR, (pos + len(speech_)) / SR, f"command {i}"))
+        gap = np.zeros(int(rng.uniform(0.8, 1.5) * SR))
+        pieces += [speech_, gap]
+        pos += len(speech_) + len(gap)
+    stream = np.concatenate(pieces)
+    noise  = wakeword_eval._noise_band(len(stream), 50, 6000, rng) * 0.01
+    return (stream + noise).astype(np.float32), truth
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--commands", type=int, default=12)
+    ap.add_argument("--recognise-ms", type=float, default=400.0)
+    ap.add_argument("--realtime", action="store_true", help="pace the replay like a live microphone")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(11)
+    stream, truth = drive(rng, args.commands, long_at=args.commands // 2)
+    print(f"Stream: {len(stream) / SR:.1f} s, {len(truth)} commands "
+          f"(#{args.commands // 2} is {truth[args.commands // 2][1] - truth[args.commands // 2][0]:.1f} s)")
+
+    source  = speech.FileSource([stream], gap_s=0.0, realtime=args.realtime)
+    # Unpaced replay outruns any recognizer; a live stream cannot, so only
+    # the paced run keeps the real queue bound (and its drop-oldest policy)
+    session = speech.CaptureSession(source, speech.ScriptedRecognizer(
+        [t for _, _, t in truth], args.recognise_ms / 1000.0),
+        max_queue=speech.UTTERANCE_QUEUE if args.realtime else len(truth))
+
+    t0 = time.monotonic()
+    cuts, texts, arrivals = [], [], []
+    orig_enqueue = session._enqueue
+
+    def record_cut(rec):
+        cuts.append((rec.started, rec.ended))
+        orig_enqueue(rec)
+    session._enqueue = record_cut
+
+    while True:
+        text = session.next_text(timeout=60)
+        if text is None:
+            break
+        texts.append(text)
+        arrivals.append(time.monotonic() - t0)
+    elapsed = time.monotonic() - t0
+
+    print(f"\nUtterances cut: {len(cuts)}  (expected {len(truth)})")
+    matched = min(len(cuts), len(truth))
+    if matched:
+        lead    = [(t[0] - c[0]) * 1000 for c, t in zip(cuts, truth)]
+        end_err = [abs(c[1] - t[1]) * 1000 for c, t in zip(cuts, truth)]
+        print(f"  start: cut {statistics.median(lead):.1f} ms before speech (median; "
+              f"pre-roll {speech.PREROLL_MS} ms), range {min(lead):.1f}–{max(lead):.1f} ms")
+        print(f"  end error    median {statistics.median(end_err):6.1f} ms   max {max(end_err):6.1f} ms")
+        li = args.commands // 2
+        if li < matched:
+            print(f"  long command: truth {truth[li][1] - truth[li][0]:.2f} s, "
+                  f"captured {cuts[li][1] - cuts[li][0]:.2f} s as one utterance")
+
+    print(f"\nTexts: {len(texts)}  in order: {texts == [t for _, _, t in truth][:len(texts)]}")
+    stats = session.stats()
+    print(f"  dropped {stats['dropped']}   avg queue wait {stats['avg_queue_wait_ms']} ms   "
+          f"avg recognise {stats['avg_recognise_ms']} ms")
+    if args.realtime and arrivals:
+        lat = [(a - t[1]) * 1000 for a, t in zip(arrivals, truth)]
+        print(f"  end of speech → text  median {statistics.median(lat):.0f} ms "
+              f"(SPF_VAD_END_MS {speech.VAD_END_MS} + recognise {args.recognise_ms:.0f})")
+    print(f"  processed {len(stream) / SR:.1f} s of audio in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
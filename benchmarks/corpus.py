@@ -0,0 +1,28 @@
+"""
+Shared command corpus for the benchmarks: the intent_model training
+phrases plus the README example commands in all four languages.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_model import data  # noqa: E402
+
+# (text, lang) — the "Example Voice Commands" section of README.md
+README_COMMANDS = [
+    ("Set temperature to 24 degrees", "en"), ("Open the window", "en"), ("Play music", "en"),
+    ("Navigate to home", "en"), ("Call mom", "en"),
+    ("Temperature 24 karo", "hi"), ("Khidki kholo", "hi"), ("Gaana bajao", "hi"),
+    ("Ghar chalo", "hi"), ("Maa ko call karo", "hi"),
+    ("Temperature 24 cheyyi", "te"), ("Kiddiki teruvu", "te"), ("Paata veyyi", "te"),
+    ("Illu ki vellu", "te"), ("Amma ki call cheyyi", "te"),
+    ("Pon la temperatura a 24", "es"), ("Abre la ventana", "es"), ("Pon musica", "es"),
+    ("Navega a casa", "es"), ("Llama a mama", "es"),
+]
+
+
+def commands():
+    """Every corpus text: training phrases followed by the README examples."""
+    return [s for s, _ in data] + [s for s, _ in README_COMMANDS]
@@ -0,0 +1,101 @@
+"""
+Latency budget check: /process with a slow or hanging translator
+=================================================================
+Sends commands in hi / te / es that the native route cannot take
+(Devanagari, or words padded to fall below the native threshold), so
+each one needs a network translation.  A stub translator either takes
+--delay-ms or never answers (--hang).  Every command is unique, so
+neither the translation cache nor the result cache hides the delay.
+
+Reports p50 / p99 of the server-side "process" time with no budget and
+with --budget-ms, and how often each degradation mode was used.
+
+Run:  python benchmarks/deadline.py [--requests N] [--budget-ms MS] [--delay-ms MS | --hang]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SPF_TTS_BACKEND", "null")
+os.environ.setdefault("SPF_RESULT_CACHE_SIZE", "0")
+os.environ.pop("SPF_TRANSLATION_CACHE_DB", None)
+
+from stub_translator import stub_translate  # noqa: E402
+
+import api  # noqa: E402
+import deadline  # noqa: E402
+import language  # noqa: E402
+from intent_model import warm_up  # noqa: E402
+
+COMMANDS = [
+    ("गाना बजाओ", "hi"), ("खिड़की खोलो", "hi"), ("तापमान 24 करो", "hi"),
+    ("paata veyyi please konchem", "te"), ("kiddiki teruvu ippudu konchem", "te"),
+    ("pon musica por favor ahora mismo", "es"), ("abre la ventana del coche ya", "es"),
+]
+
+
+def commands(n):
+    """n distinct (text, lang) pairs built from COMMANDS."""
+    return [(f"{text} {i}", lang) for i in range(n // len(COMMANDS) + 1)
+            for text, lang in COMMANDS][:n]
+
+
+def run(client, log, budget_ms):
+    times, modes = [], {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text, lang in log:
+            resp = client.post("/process", json={"text": text, "lang": lang, "timings": True,
+                                                 "budget_ms": budget_ms}).get_json()
+            times.append(resp["timings"]["process"])
+            for mode in resp.get("degraded", []):
+                modes[mode] = modes.get(mode, 0) + 1
+    return times, modes
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=40)
+    ap.add_argument("--budget-ms", type=float, default=500.0)
+    ap.add_argument("--delay-ms", type=float, default=1500.0)
+    ap.add_argument("--hang", action="store_true", help="the translator never answers")
+    args = ap.parse_args()
+
+    never = threading.Event()
+
+    def slow_translate(text, source, target):
+        if args.hang:
+            never.wait(30)
+        else:
+            time.sleep(args.delay_ms / 1000.0)
+        return stub_translate(text, source, target)
+
+    language.set_translator(slow_translate)
+    with contextlib.redirect_stdout(io.StringIO()):
+        warm_up()
+    client = api.app.test_client()
+    delay  = "hangs" if args.hang else f"takes {args.delay_ms:g} ms"
+    print(f"{args.requests} unique commands; the translator {delay}")
+
+    ms = lambda v: f"p50 {statistics.median(v):8.1f} ms   p99 {sorted(v)[int(0.99 * (len(v) - 1))]:8.1f} ms"  # noqa: E731
+    budgets = [args.budget_ms] if args.hang else [0, args.budget_ms]
+    for i, budget in enumerate(budgets):
+        language._cache.clear()
+        times, modes = run(client, commands(args.requests) if i == 0 else
+                           [(t + " again", l) for t, l in commands(args.requests)], budget)
+        label = f"budget {budget:g} ms" if budget else "no budget"
+        print(f"\n{label}:  {ms(times)}   max {max(times):8.1f} ms")
+        print(f"  degraded: {modes or 'none'}   "
+              f"(reply reserve {min(deadline.REPLY_RESERVE_MS, budget / 2):g} ms)")
+    never.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Entity extractor scaling microbenchmark
+=======================================
+Times extract_entities (compiled single-pass matcher) against the
+original per-phrase implementation as the phrase lists grow 1×, 10×
+and 100× with synthetic phrases, over the training + README commands.
+
+Run:  python benchmarks/entity_scaling.py [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import entity  # noqa: E402
+from entity import (EntityMatcher, extract_entities_reference,  # noqa: E402
+                    OPEN_WORDS, CLOSE_WORDS, LOCATION_STRIP, CONTACT_STRIP)
+from corpus import commands  # noqa: E402
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvz" for v in "aeiou"]
+
+
+def _grow(words, factor, rng):
+    """Pad a phrase list to factor × its size with synthetic two-word phrases."""
+    out = list(words)
+    while len(out) < len(words) * factor:
+        w1 = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        w2 = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+        out.append(f"{w1} {w2}")
+    return out
+
+
+def _time(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in texts:
+            fn(t)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(texts) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    texts = commands()
+    rng   = random.Random(0)
+
+    print(f"{'scale':>6} {'phrases':>8} {'reference µs':>13} {'compiled µs':>12} {'speedup':>8}  identical")
+    for factor in (1, 10, 100):
+        lists   = [_grow(w, factor, rng) for w in (OPEN_WORDS, CLOSE_WORDS, LOCATION_STRIP, CONTACT_STRIP)]
+        matcher = EntityMatcher(*lists)
+        ref     = lambda t: extract_entities_reference(t, *lists)
+
+        same = all(matcher.extract(t) == ref(t) for t in texts)
+        t_ref = _time(ref, texts, args.repeat)
+        t_new = _time(matcher.extract, texts, args.repeat)
+        print(f"{factor:>5}× {sum(map(len, lists)):>8} {t_ref:>13.2f} {t_new:>12.2f} "
+              f"{t_ref / t_new:>7.1f}×  {same}")
+
+    assert entity.extract_entities(texts[0]) == extract_entities_reference(texts[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Import-time budget for `import api`
+===================================
+Imports api in fresh interpreters and fails (exit 1) when the best
+time exceeds the budget, or when a heavy dependency is imported
+eagerly.
+
+Run:  python benchmarks/import_time.py [--budget 1.0] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported by `import api` — they load lazily on first use
+HEAVY = ["tensorflow", "keras", "nltk", "deep_translator", "pyttsx3", "speech_recognition"]
+
+PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import api
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed,
+                  "heavy": [m for m in {HEAVY!r} if m in sys.modules]}}))
+"""
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget", type=float,
+                    default=float(os.environ.get("SPF_IMPORT_BUDGET", "1.0")),
+                    help="seconds allowed for `import api` (best of runs)")
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    results = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    best  = min(r["seconds"] for r in results)
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    ok    = best <= args.budget and not heavy
+
+    print(f"import api: best {best * 1000:.1f} ms over {args.runs} runs "
+          f"(budget {args.budget * 1000:.0f} ms)")
+    if heavy:
+        print(f"eagerly imported: {', '.join(heavy)}")
+    print("OK" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Offline pipeline benchmark
+==========================
+Times each stage of the /process pipeline and the full /process route
+(Flask test client) over the shared corpus: the intent_model training
+phrases plus the README examples.  Training phrases are assigned
+en / hi / te / es in turn so every route is exercised.
+
+Translation goes through a deterministic stub (no network): → en is
+the identity, anything else is prefixed with "[<lang>]".  One warm-up
+pass runs first, so the model is loaded and translations are cached.
+
+Results are JSON (throughput and p50/p95/p99 per stage).  With
+--baseline, stages whose p50 or throughput regressed by more than
+--tolerance are listed and the exit code is 1.
+
+Run:  python benchmarks/pipeline.py [--repeat 3] [--out result.json]
+      python benchmarks/pipeline.py --baseline result.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SPF_TTS_BACKEND", "null")
+os.environ.pop("SPF_TRANSLATION_CACHE_DB", None)
+os.environ.setdefault("SPF_RESULT_CACHE_SIZE", "0")   # time the pipeline, not repeat hits
+os.environ.setdefault("SPF_TRANSLATE_BATCH_MS", "0")  # sequential: nothing to batch with
+
+from corpus import README_COMMANDS  # noqa: E402
+from stub_translator import stub_translate  # noqa: E402
+
+import api  # noqa: E402
+import language  # noqa: E402
+from entity import extract_entities  # noqa: E402
+from intent_model import data, predict_intent, warm_up  # noqa: E402
+from preprocess import preprocess  # noqa: E402
+
+LANGS = ["en", "hi", "te", "es"]
+
+
+def corpus():
+    """(text, lang) pairs: training phrases with rotating langs, then the README examples."""
+    return [(text, LANGS[i % len(LANGS)]) for i, (text, _) in enumerate(data)] + README_COMMANDS
+
+
+def _pct(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def _measure(fn, inputs, repeat):
+    latencies = []
+    t_start   = time.perf_counter()
+    for _ in range(repeat):
+        for args in inputs:
+            t0 = time.perf_counter()
+            fn(*args)
+            latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - t_start
+    latencies.sort()
+    us = lambda s: round(s * 1e6, 2)  # noqa: E731
+    return {
+        "calls":          len(latencies),
+        "throughput_per_s": round(len(latencies) / wall, 1),
+        "mean_us":        us(sum(latencies) / len(latencies)),
+        "p50_us":         us(_pct(latencies, 50)),
+        "p95_us":         us(_pct(latencies, 95)),
+        "p99_us":         us(_pct(latencies, 99)),
+    }
+
+
+def run(repeat):
+    language.set_translator(stub_translate)
+    warm_up()
+
+    items   = corpus()
+    client  = api.app.test_client()
+    english = [(language.translate_to_english(t.lower(), l),) for t, l in items]
+    cleaned = [(preprocess(t),) for (t,) in english]
+    intents = [predict_intent(c) for (c,) in cleaned]
+    mapped  = [(i, extract_entities(c), e) for i, (c,), (e,) in zip(intents, cleaned, english)]
+    dash    = [api._map_entities_for_dashboard(*m) for m in mapped]
+
+    def process(text, lang):
+        resp = client.post("/process", json={"text": text, "lang": lang})
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+
+    stages = {
+        "preprocess":       (preprocess, english),
+        "predict_intent":   (predict_intent, cleaned),
+        "extract_entities": (extract_entities, cleaned),
+        "map_entities":     (api._map_entities_for_dashboard, mapped),
+        "build_response":   (language.build_response,
+                             [(i, d, l, e) for i, d, (_, l), (e,) in zip(intents, dash, items, english)]),
+        "process":          (process, items),
+    }
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, (fn, inputs) in stages.items():
+            _measure(fn, inputs, 1)                     # warm-up pass
+            results[name] = _measure(fn, inputs, repeat)
+
+    return {
+        "meta": {
+            "corpus":   len(items),
+            "repeat":   repeat,
+            "python":   platform.python_version(),
+            "machine":  platform.machine(),
+            "backend":  type(__import__("intent_model").get_backend()).__name__,
+            "time":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": results,
+    }
+
+
+def compare(result, baseline, tolerance):
+    """Stages whose p50 rose or throughput fell by more than tolerance."""
+    regressions = []
+    for name, now in result["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before:
+            continue
+        if now["p50_us"] > before["p50_us"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before['p50_us']} → {now['p50_us']} us")
+        if now["throughput_per_s"] < before["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_per_s']} → "
+                               f"{now['throughput_per_s']} /s")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="write the JSON result here (e.g. to save a baseline)")
+    ap.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    args = ap.parse_args()
+
+    result = run(args.repeat)
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 1 if result.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Pre-fork scaling benchmark
+==========================
+Starts serve.py with 1, 2, 4 ... workers (up to the core count) and
+drives /process with English commands (no translation, so the work is
+CPU-bound) from several client processes over keep-alive connections.
+Reports requests/s per worker count and the per-worker request split
+from GET /workers.
+
+The load generator shares the machine, so leave cores free for it
+(--clients) or run it from another host with --url.
+
+Run:  python benchmarks/prefork_scaling.py [--seconds 10] [--clients 4] [--max-workers N]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import README_COMMANDS  # noqa: E402
+
+ROOT     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS = [text for text, lang in README_COMMANDS if lang == "en"]
+
+
+def _client(host, port, seconds, threads, counts):
+    def loop(i):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        n, end = 0, time.monotonic() + seconds
+        while time.monotonic() < end:
+            body = json.dumps({"text": COMMANDS[n % len(COMMANDS)], "lang": "en"})
+            conn.request("POST", "/process", body, {"Content-Type": "application/json"})
+            conn.getresponse().read()
+            n += 1
+        counts.put(n)
+
+    ts = [threading.Thread(target=loop, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+
+
+def _wait_ready(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/ready", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not become ready")
+
+
+def measure(workers, port, seconds, clients, threads):
+    env    = dict(os.environ, SPF_TTS_BACKEND="null")
+    server = subprocess.Popen([sys.executable, "serve.py", "--workers", str(workers),
+                               "--host", "127.0.0.1", "--port", str(port)],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://127.0.0.1:{port}"
+        _wait_ready(url)
+        counts = mp.Queue()
+        procs  = [mp.Process(target=_client, args=("127.0.0.1", port, seconds, threads, counts))
+                  for _ in range(clients)]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        wall  = time.perf_counter() - t0
+        total = sum(counts.get() for _ in range(clients * threads))
+        with urllib.request.urlopen(url + "/workers") as r:
+            split = [w["requests"] for w in json.load(r)["workers"]]
+        return total / wall, split
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--clients", type=int, default=4, help="load-generator processes")
+    ap.add_argument("--threads", type=int, default=4, help="connections per client process")
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--port", type=int, default=5190)
+    args = ap.parse_args()
+
+    levels, n = [], 1
+    while n <= args.max_workers:
+        levels.append(n)
+        n *= 2
+    if levels[-1] != args.max_workers:
+        levels.append(args.max_workers)
+
+    print(f"cores: {os.cpu_count()}   clients: {args.clients} × {args.threads} connections")
+    print(f"{'workers':>7} {'req/s':>9} {'scaling':>8}  per-worker requests")
+    base = None
+    for i, workers in enumerate(levels):
+        rps, split = measure(workers, args.port + i, args.seconds, args.clients, args.threads)
+        base = base or rps
+        print(f"{workers:7d} {rps:9.1f} {rps / base:7.2f}×  {split}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Result cache check: repeated commands through /process
+=======================================================
+Replays a command log in which a few commands dominate (Zipf-like
+weights over the README examples and training phrases, all four
+languages) through the Flask test client, with the result cache on and
+off.  A stub translator charges --delay-ms per network call, but the
+translation cache is warm by the time it matters either way.  The
+difference is the pipeline work itself: NLTK, the intent model, entity
+extraction and template filling.
+
+Reports the hit rate and the server-side "process" stage time (the
+timings field) for hits and misses, leaving out the test client's own
+request handling.
+
+Run:  python benchmarks/result_cache.py [--requests N] [--delay-ms MS]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SPF_TTS_BACKEND", "null")
+os.environ.pop("SPF_TRANSLATION_CACHE_DB", None)
+
+from corpus import README_COMMANDS  # noqa: E402
+from stub_translator import stub_translate  # noqa: E402
+
+import api  # noqa: E402
+import language  # noqa: E402
+from intent_model import data, warm_up  # noqa: E402
+
+LANGS = ["en", "hi", "te", "es"]
+
+
+def command_log(n, seed=0):
+    """n (text, lang) requests; the k-th most common command has weight 1/k."""
+    pool = README_COMMANDS + [(t, LANGS[i % 4]) for i, (t, _) in enumerate(data)]
+    rng  = random.Random(seed)
+    rng.shuffle(pool)
+    weights = [1.0 / (k + 1) for k in range(len(pool))]
+    log = rng.choices(pool, weights, k=n)
+    # the same command as it arrives from different speech front ends
+    return [(t.upper() + "." if rng.random() < 0.1 else t, lang) for t, lang in log]
+
+
+def replay(client, log):
+    hits, misses = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text, lang in log:
+            resp = client.post("/process", json={"text": text, "lang": lang, "timings": True}).get_json()
+            (hits if resp.get("cached") else misses).append(resp["timings"]["process"])
+    return hits, misses
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--delay-ms", type=float, default=100.0)
+    args = ap.parse_args()
+
+    def slow_translate(text, source, target):
+        time.sleep(args.delay_ms / 1000.0)
+        return stub_translate(text, source, target)
+
+    language.set_translator(slow_translate)
+    with contextlib.redirect_stdout(io.StringIO()):
+        warm_up()
+        language.warm_templates(["hi", "te", "es"])
+    client = api.app.test_client()
+    log    = command_log(args.requests)
+    print(f"{len(log)} requests, {len(set((t.lower().rstrip('.'), l) for t, l in log))} distinct commands")
+
+    ms = lambda v: f"p50 {statistics.median(v):8.3f} ms   p99 {sorted(v)[int(0.99 * (len(v) - 1))]:8.3f} ms" if v else "-"  # noqa: E731
+    for label, size in (("cache off", 0), ("cache on", 2048)):
+        api._results.max_size = size
+        api._results.clear()
+        language._cache.clear()
+        t0 = time.perf_counter()
+        hits, misses = replay(client, log)
+        wall = time.perf_counter() - t0
+        print(f"\n{label}: {wall:.2f} s total")
+        print(f"  misses {len(misses):5d}   {ms(misses)}")
+        print(f"  hits   {len(hits):5d}   {ms(hits)}")
+        if size:
+            print(f"  {api._results.stats()}")
+
+
+if __name__ == "__main__":
+    main()
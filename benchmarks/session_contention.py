@@ -0,0 +1,74 @@
+"""
+Session state contention benchmark
+==================================
+Compares the old single global lock with SessionStore's striped locks.
+N threads, one session each, repeatedly do what /process and /execute
+do with session state: read it, update it, and hold the lock for
+--hold-us microseconds of work (time.sleep, so the GIL is released as
+it would be for backend I/O).  Run at 1, 8 and 64 concurrent sessions.
+
+Run:  python benchmarks/session_contention.py [--ops N] [--hold-us US]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session import SessionStore, new_state  # noqa: E402
+
+
+class GlobalLockStore:
+    """The previous design: one state dict per session behind one lock."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._state = {}
+
+    @contextmanager
+    def session(self, sid):
+        with self._lock:
+            yield self._state.setdefault(sid, new_state())
+
+
+def _run(store, sessions, ops, hold):
+    start = threading.Barrier(sessions + 1)
+
+    def worker(sid):
+        start.wait()
+        for i in range(ops):
+            with store.session(sid) as state:
+                state.update(intent="AC", entities={"temperature": i}, lang=state["lang"])
+                if hold:
+                    time.sleep(hold)
+
+    threads = [threading.Thread(target=worker, args=(f"car-{n}",)) for n in range(sessions)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    return sessions * ops / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ops", type=int, default=200, help="operations per session")
+    ap.add_argument("--hold-us", type=float, default=100.0)
+    args = ap.parse_args()
+    hold = args.hold_us / 1e6
+
+    print(f"{'sessions':>8s} {'global ops/s':>14s} {'striped ops/s':>14s} {'speedup':>8s}")
+    for n in (1, 8, 64):
+        g = _run(GlobalLockStore(), n, args.ops, hold)
+        s = _run(SessionStore(), n, args.ops, hold)
+        print(f"{n:8d} {g:14.0f} {s:14.0f} {s / g:7.1f}×")
+
+
+if __name__ == "__main__":
+    main()
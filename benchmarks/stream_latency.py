@@ -0,0 +1,81 @@
+"""
+Streaming /process latency: time to first event vs full response
+================================================================
+Posts commands to /process_stream through the Flask test client with
+a stub translator that charges a fixed delay per call, and records
+when the "nlp" event (intent + dashboard entities) arrives versus the
+final "response" event.  /process is timed on the same commands.
+
+Every command names a new destination or contact, so the reply always
+needs a fresh translation (templates are compiled once, up front).
+
+Run:  python benchmarks/stream_latency.py [--delay-ms 150] [--n 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_translator import stub_translate  # noqa: E402
+
+import api  # noqa: E402
+import language  # noqa: E402
+from intent_model import warm_up  # noqa: E402
+
+
+def _commands(n, tag):
+    forms = [("navigate to {}", "hi"), ("call {}", "te"), ("take me to {}", "es"), ("call {}", "en")]
+    return [(forms[i % len(forms)][0].format(f"{tag}place{i}"), forms[i % len(forms)][1])
+            for i in range(n)]
+
+
+def _stream(client, text, lang):
+    t0    = time.perf_counter()
+    first = None
+    resp  = client.post("/process_stream", json={"text": text, "lang": lang}, buffered=False)
+    for chunk in resp.response:
+        if first is None and b"event: nlp" in chunk:
+            first = time.perf_counter() - t0
+    resp.close()
+    return first, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--delay-ms", type=float, default=150.0)
+    ap.add_argument("--n", type=int, default=20)
+    args = ap.parse_args()
+
+    def slow_translate(text, source, target):
+        time.sleep(args.delay_ms / 1000.0)
+        return stub_translate(text, source, target)
+
+    language.set_translator(slow_translate)
+    warm_up()
+    language.warm_templates(["hi", "te", "es"])
+    client = api.app.test_client()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        streamed = [_stream(client, t, l) for t, l in _commands(args.n, "s")]
+        full = []
+        for text, lang in _commands(args.n, "p"):
+            t0 = time.perf_counter()
+            client.post("/process", json={"text": text, "lang": lang})
+            full.append(time.perf_counter() - t0)
+
+    ms = lambda xs: f"{statistics.median(xs) * 1000:8.1f} ms"  # noqa: E731
+    print(f"translate delay {args.delay_ms:.0f} ms, {args.n} commands (median)")
+    print(f"  /process_stream first event (nlp) {ms([f for f, _ in streamed])}")
+    print(f"  /process_stream last event        {ms([t for _, t in streamed])}")
+    print(f"  /process full response            {ms(full)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Local stub of the Google Translate endpoint
+===========================================
+Answers GET /m?sl=..&tl=..&q=.. the way translate.google.com/m does
+(a <div class="result-container">), after a configurable delay, with
+HTTP/1.1 keep-alive.  Translation is deterministic: text → English is
+returned unchanged, anything else is prefixed with "[<tl>] ".
+
+Standalone:   python benchmarks/stub_translator.py --port 5055 --delay-ms 200
+              SPF_TRANSLATE_URL=http://127.0.0.1:5055/m uvicorn async_api:app
+
+In-process:   with StubTranslatorServer(delay_ms=200) as stub:
+                  AsyncTranslator(url=stub.url)
+"""
+
+import argparse
+import asyncio
+import html
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+
+def stub_translate(text, source, target):
+    return text if target == "en" else f"[{target}] {text}"
+
+
+class StubTranslatorServer:
+    def __init__(self, host="127.0.0.1", port=0, delay_ms=0.0):
+        self.host     = host
+        self.port     = port
+        self.delay    = delay_ms / 1000.0
+        self.requests = 0
+        self._loop    = None
+        self._server  = None
+        self._thread  = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/m"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                target  = request.split(b"\r\n", 1)[0].split(b" ")[1].decode()
+                self.requests += 1
+                q = {k: v[0] for k, v in parse_qs(urlsplit(target).query).items()}
+                await asyncio.sleep(self.delay)
+                text = stub_translate(q.get("q", ""), q.get("sl", "auto"), q.get("tl", "en"))
+                body = f'<html><div class="result-container">{html.escape(text)}</div></html>'.encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start(self):
+        """Run the server on its own event loop in a daemon thread."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="stub-translator", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5055)
+    ap.add_argument("--delay-ms", type=float, default=200.0)
+    args = ap.parse_args()
+
+    stub = StubTranslatorServer(args.host, args.port, args.delay_ms)
+    print(f"Stub translator on {stub.url} (delay {args.delay_ms:.0f} ms)")
+
+    async def run():
+        server = await stub.serve()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
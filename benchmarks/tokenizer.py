@@ -0,0 +1,77 @@
+"""
+Tokenizer equivalence check + benchmark
+=======================================
+Compares preprocess.tokenize (compiled regex) with NLTK on the command
+corpus — as typed, capitalised, and with trailing punctuation — plus
+Devanagari, Telugu and accented Spanish samples, then times both.
+Exits 1 if any sample tokenizes differently.
+
+NLTK's word_tokenize needs the punkt data; without it the check uses
+NLTKWordTokenizer, which is what word_tokenize applies per sentence.
+
+Run:  python benchmarks/tokenizer.py [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocess import tokenize  # noqa: E402
+from corpus import commands  # noqa: E402
+
+EXTRA = [
+    "खिड़की खोलो", "गाना बजाओ", "ठंडा करो", "माँ को कॉल करो",
+    "కిటికీ తెరువు", "పాట వెయ్యి", "అమ్మకి కాల్ చెయ్యి",
+    "llévame a casa", "pon la canción", "¿dónde está la estación?", "sube la calefacción, por favor",
+    "Don't stop the music", "What's the temperature?", "set temp to 22.5", "call mom's phone",
+    "it's 24°c", "navigate to the e-mail address", "play rock'n'roll", "turn it up!",
+]
+
+
+def _nltk_tokenizer():
+    try:
+        from nltk.tokenize import word_tokenize
+        word_tokenize("probe")
+        return word_tokenize, "word_tokenize"
+    except LookupError:
+        from nltk.tokenize import NLTKWordTokenizer
+        return NLTKWordTokenizer().tokenize, "NLTKWordTokenizer (punkt data not installed)"
+
+
+def _time(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in texts:
+            fn(t)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(texts) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    base  = commands() + EXTRA
+    texts = base + [t.capitalize() + p for t in base for p in (".", "!", "?")]
+    nltk_tokenize, name = _nltk_tokenizer()
+
+    mismatches = [(t, tokenize(t), nltk_tokenize(t)) for t in texts if tokenize(t) != nltk_tokenize(t)]
+    for text, ours, theirs in mismatches[:20]:
+        print(f"  {text!r}: regex={ours} nltk={theirs}")
+
+    t_nltk  = _time(nltk_tokenize, texts, args.repeat)
+    t_regex = _time(tokenize, texts, args.repeat)
+    print(f"reference: {name}")
+    print(f"samples: {len(texts)}  mismatches: {len(mismatches)}")
+    print(f"nltk  {t_nltk:8.2f} µs/text")
+    print(f"regex {t_regex:8.2f} µs/text  ({t_nltk / t_regex:.1f}× faster)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Translation batching check: coalesced vs one call per string
+=============================================================
+--clients threads each translate a stream of commands to English and
+their replies back (README commands and training phrases, hi / te / es,
+with repeats across clients as in real traffic).  The stub translator
+charges --latency-ms per request plus a little per character, and
+serves at most --connections requests at once, like a rate-limited API.
+
+Runs once with every string sent on its own (SPF_TRANSLATE_BATCH_MS=0
+behaviour) and once through the TranslationBatcher.  The translation
+cache is cleared per run and per round so every string needs the network.
+Reports network requests made, throughput and per-call latency.
+
+Run:  python benchmarks/translation_batch.py [--clients N] [--rounds N] [--latency-ms MS]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SPF_TTS_BACKEND", "null")
+os.environ.pop("SPF_TRANSLATION_CACHE_DB", None)
+
+from corpus import README_COMMANDS  # noqa: E402
+from stub_translator import stub_translate  # noqa: E402
+
+import language  # noqa: E402
+from intent_model import data  # noqa: E402
+from translation_batcher import TranslationBatcher  # noqa: E402
+
+LANGS   = ["hi", "te", "es"]
+REPLIES = ["Now playing your music.", "Music stopped.", "Opening the window smoothly.",
+           "Starting navigation to home.", "Calling mom now. Connecting."]
+
+
+class StubAPI:
+    """stub_translate behind per-request latency and a connection limit; counts requests."""
+
+    def __init__(self, latency_ms, per_char_ms, connections):
+        self.latency     = latency_ms / 1000.0
+        self.per_char    = per_char_ms / 1000.0
+        self.connections = threading.Semaphore(connections)
+        self.requests    = 0
+        self.strings     = 0
+        self._lock       = threading.Lock()
+
+    def __call__(self, text, source, target):
+        texts = language._split_batch(text, text.count("\n") + 1) or [text]
+        with self._lock:
+            self.requests += 1
+            self.strings  += len(texts)
+        with self.connections:
+            time.sleep(self.latency + self.per_char * len(text))
+        if len(texts) == 1:
+            return stub_translate(text, source, target)
+        return language._join_batch([stub_translate(t, source, target) for t in texts])
+
+
+def workload(clients, per_client, seed=0):
+    pool = [(t, l) for t, l in README_COMMANDS if l != "en"]
+    pool += [(t, LANGS[i % 3]) for i, (t, _) in enumerate(data)]
+    rng  = random.Random(seed)
+    return [[(rng.choice(pool)[0], rng.choice(LANGS), rng.choice(REPLIES)) for _ in range(per_client)]
+            for _ in range(clients)]
+
+
+def run(work, rounds):
+    latencies, lock, barrier = [], threading.Lock(), threading.Barrier(len(work))
+
+    def client(items):
+        for text, lang, reply in items:
+            barrier.wait()                       # commands arrive in waves, like a busy minute
+            t0 = time.perf_counter()
+            language.translate_to_english(text, lang)
+            language.translate_from_english(reply, lang)
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            language._cache.clear()
+            threads = [threading.Thread(target=client, args=(items,)) for items in work]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+    return time.perf_counter() - t0, latencies
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--per-client", type=int, default=5)
+    ap.add_argument("--rounds", type=int, default=2)
+    ap.add_argument("--latency-ms", type=float, default=150.0)
+    ap.add_argument("--per-char-ms", type=float, default=0.02)
+    ap.add_argument("--connections", type=int, default=8)
+    ap.add_argument("--window-ms", type=float, default=10.0)
+    args = ap.parse_args()
+
+    work  = workload(args.clients, args.per_client)
+    calls = args.clients * args.per_client * args.rounds
+    print(f"{args.clients} clients × {args.per_client} commands × {args.rounds} rounds; "
+          f"stub: {args.latency_ms:g} ms/request, {args.connections} connections")
+
+    ms = lambda v: f"p50 {statistics.median(v):7.1f} ms   p99 {sorted(v)[int(0.99 * (len(v) - 1))]:7.1f} ms"  # noqa: E731
+    for label, window in (("one call per string", 0), (f"batched ({args.window_ms:g} ms window)", args.window_ms)):
+        stub = StubAPI(args.latency_ms, args.per_char_ms, args.connections)
+        language.set_translator(stub)
+        language._batcher = TranslationBatcher(language._fetch_many, window_ms=window) if window else None
+        wall, latencies = run(work, args.rounds)
+        print(f"\n{label}:")
+        print(f"  network requests {stub.requests:5d}   strings sent {stub.strings:5d}   "
+              f"({calls * 2} translations asked for)")
+        print(f"  {calls / wall:7.1f} commands/s   per command {ms(latencies)}")
+        if language._batcher is not None:
+            stats = language._batcher.stats()
+            print(f"  shared {stats['shared']}   avg batch {stats['avg_batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+TTS worker queue check (headless)
+=================================
+Drives /execute through the Flask test client with the null TTS backend
+speaking at a simulated rate, and reports how long each request holds
+its thread and how long utterances wait in the TTS queue.
+
+Run:  python benchmarks/tts_queue.py [--requests N] [--ms-per-char MS]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SPF_TTS_BACKEND", "null")
+
+import speech  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=50)
+    ap.add_argument("--ms-per-char", type=float, default=5.0)
+    args = ap.parse_args()
+
+    speech._tts.backend = speech.NullBackend(args.ms_per_char / 1000.0)
+
+    import api
+    client   = api.app.test_client()
+    commands = [("AC", {"temperature": 20 + i % 8}) for i in range(args.requests)]
+
+    latencies = []
+    for intent, entities in commands:
+        t0 = time.perf_counter()
+        client.post("/execute", json={"intent": intent, "entities": entities})
+        latencies.append((time.perf_counter() - t0) * 1000)
+        time.sleep(0.02)
+    speech._tts.idle(timeout=30)
+
+    print(f"/execute latency   median {statistics.median(latencies):.2f} ms   "
+          f"max {max(latencies):.2f} ms   (sentence ≈ {args.ms_per_char * 25:.0f} ms)")
+    for k, v in speech.tts_stats().items():
+        print(f"  {k:18s} {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 context = {}
 
-def update_context(intent, entities):
-    context["last_intent"] = intent
-    context["last_entities"] = entities
+def update_context(intent, entities, ctx=None):
+    # ctx is a session's own context dict (session.py); the module-level
+    # one is kept for single-user use outside the API.
+    ctx = context if ctx is None else ctx
+    ctx["last_intent"] = intent
+    ctx["last_entities"] = entities
@@ -0,0 +1,99 @@
+"""
+SPF Request Deadlines — a latency budget per request
+=====================================================
+Each /process request gets a budget: "budget_ms" in the body, the
+X-Budget-Ms header, or SPF_REQUEST_BUDGET_MS.  While the request runs,
+its Deadline is bound to the thread, so language._translate can see it
+without every caller passing it along.
+
+A network translation waits only for what is left of the budget (minus
+SPF_REPLY_RESERVE_MS when translating the input, which keeps time for
+the reply).  When it does not finish in time the request degrades, in
+this order, and each step taken is listed in the reply's "degraded"
+field and counted as spf_degraded_<mode>_total:
+
+  cached_translation   a stale (expired) cached translation was used
+  repeat_request       no translation, and the native router would not
+                       take the input as-is: intent UNKNOWN, the reply
+                       asks the driver to say the command again
+  english_response     the reply, or part of it, is in English
+
+A translation that times out keeps running in the background and fills
+the translation cache when it returns, so the next request is served.
+
+Configuration (environment):
+  SPF_REQUEST_BUDGET_MS   default budget, 0 = none       (default 2000)
+  SPF_REPLY_RESERVE_MS    kept back for the reply        (default 300)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import METRICS
+
+REQUEST_BUDGET_MS = float(os.environ.get("SPF_REQUEST_BUDGET_MS", "2000"))
+REPLY_RESERVE_MS  = float(os.environ.get("SPF_REPLY_RESERVE_MS", "300"))
+
+BUDGET_HEADER = "X-Budget-Ms"
+
+# Degradation modes, in the order they are tried
+MODES = ("cached_translation", "repeat_request", "english_response")
+
+
+class Deadline:
+    def __init__(self, budget_ms=REQUEST_BUDGET_MS, reserve_ms=REPLY_RESERVE_MS):
+        self.budget_ms = float(budget_ms)
+        self.reserve   = min(reserve_ms, self.budget_ms / 2) / 1000.0
+        self.expires   = time.monotonic() + self.budget_ms / 1000.0
+        self.degraded  = []
+        self.timeouts  = 0       # translations that did not finish in time
+
+    def remaining(self, reply=True):
+        """Seconds left (never negative); input translations leave the reply reserve."""
+        left = self.expires - time.monotonic() - (0.0 if reply else self.reserve)
+        return max(0.0, left)
+
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def split(self):
+        """Same expiry, own degradation record: one item of a batch, run on its own thread."""
+        part = Deadline.__new__(Deadline)
+        part.budget_ms, part.reserve, part.expires = self.budget_ms, self.reserve, self.expires
+        part.degraded, part.timeouts = [], 0
+        return part
+
+    def degrade(self, mode):
+        if mode not in self.degraded:
+            self.degraded.append(mode)
+            METRICS.inc(f"degraded_{mode}_total")
+
+
+_local = threading.local()
+
+
+def current():
+    """The Deadline bound to this thread, or None."""
+    return getattr(_local, "deadline", None)
+
+
+@contextmanager
+def bind(deadline):
+    """Bind deadline (may be None) to this thread for the duration."""
+    previous, _local.deadline = current(), deadline
+    try:
+        yield deadline
+    finally:
+        _local.deadline = previous
+
+
+def from_request(body, headers):
+    """A Deadline from "budget_ms" / X-Budget-Ms / the default, or None for no budget."""
+    raw = body.get("budget_ms", headers.get(BUDGET_HEADER))
+    try:
+        budget = float(raw) if raw is not None else REQUEST_BUDGET_MS
+    except (TypeError, ValueError):
+        budget = REQUEST_BUDGET_MS
+    return Deadline(budget) if budget > 0 else None
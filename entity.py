@@ -1,5 +1,7 @@
 import re
 
+from aho_corasick import AhoCorasick
+
 # ═══════════════════════════════════════════════════════════
 #  Multilingual Entity Extractor
 #  Handles English, Hindi (romanised), Telugu (romanised), Spanish
@@ -55,7 +57,136 @@ CONTACT_STRIP = [
 ]
 
 
-def extract_entities(text):
+# ═══════════════════════════════════════════════════════════
+#  Compiled matcher
+#  All phrase lists are compiled once into one Aho–Corasick
+#  automaton.  A single left-to-right scan finds the temperature,
+#  every direction word and every location/contact phrase; the strip
+#  phrases are then removed by priority (longest first, list order on
+#  ties), which is what the sequential str.replace loop did.
+#  Results are identical to extract_entities_reference().
+# ═══════════════════════════════════════════════════════════
+
+OPEN, CLOSE, LOCATION, CONTACT = 1, 2, 4, 8
+
+
+class EntityMatcher:
+    def __init__(self, open_words, close_words, location_strip, contact_strip):
+        self.lists   = (open_words, close_words, location_strip, contact_strip)
+        self.phrases = []
+        index = {}
+        roles = []
+        for role, words in zip((OPEN, CLOSE, LOCATION, CONTACT), self.lists):
+            for w in words:
+                if w not in index:
+                    index[w] = len(self.phrases)
+                    self.phrases.append(w)
+                    roles.append(0)
+                roles[index[w]] |= role
+        self.roles     = roles
+        self.automaton = AhoCorasick(self.phrases)
+        self.max_len   = max(map(len, self.phrases), default=0)
+
+        # Removal priority, as in sorted(..., key=len, reverse=True)
+        self.location_rank = {index[p]: r for r, p in enumerate(sorted(location_strip, key=len, reverse=True))}
+        self.contact_rank  = {index[p]: r for r, p in enumerate(sorted(contact_strip,  key=len, reverse=True))}
+
+    def extract(self, text):
+        t = text.lower()
+        step, outputs, roles = self.automaton.step, self.automaton.outputs, self.roles
+
+        temperature = None
+        digit_start = -1
+        found = 0
+        location_hits, contact_hits = [], []
+
+        state = 0
+        for i, ch in enumerate(t):
+            if temperature is None:
+                if ch.isdecimal():
+                    if digit_start < 0:
+                        digit_start = i
+                elif digit_start >= 0:
+                    temperature = t[digit_start:i]
+
+            state = step(state, ch)
+            for pid in outputs(state):
+                role   = roles[pid]
+                found |= role
+                if role & (LOCATION | CONTACT):
+                    hit = (i + 1 - len(self.phrases[pid]), i + 1, pid)
+                    if role & LOCATION:
+                        location_hits.append(hit)
+                    if role & CONTACT:
+                        contact_hits.append(hit)
+
+        if temperature is None and digit_start >= 0:
+            temperature = t[digit_start:]
+
+        direction = "down" if found & OPEN else "up" if found & CLOSE else None
+
+        return {
+            "temperature": temperature,
+            "direction":   direction,
+            "location":    self._strip(t, location_hits, self.location_rank, LOCATION, 2),
+            "contact":     self._strip(t, contact_hits,  self.contact_rank,  CONTACT,  3),
+        }
+
+    def _strip(self, t, hits, rank, role, list_index):
+        if not hits:
+            return t.strip()
+
+        # Remove hits in priority order, skipping any that overlap one
+        # already removed — the same result as the sequential replaces,
+        # unless a removal splices its neighbours into a new phrase that
+        # str.replace would then have seen.  Defer to it in that case.
+        hits.sort(key=lambda h: (rank[h[2]], h[0]))
+        removed = []
+        for start, end, _ in hits:
+            if any(start < e and end > s for s, e in removed):
+                continue
+            removed.append((start, end))
+            if self._splices(t, removed, start, end, role):
+                return _strip_sequential(t, self.lists[list_index])
+
+        removed.sort()
+        parts, pos = [], 0
+        for start, end in removed:
+            parts.append(t[pos:start])
+            pos = end
+        parts.append(t[pos:])
+        return "".join(parts).strip()
+
+    def _splices(self, t, removed, start, end, role):
+        """True if a role phrase now spans the gap left by t[start:end]."""
+        n = self.max_len - 1
+        left, p = [], start - 1
+        while p >= 0 and len(left) < n:
+            if not any(s <= p < e for s, e in removed):
+                left.append(t[p])
+            p -= 1
+        right, p = [], end
+        while p < len(t) and len(right) < n:
+            if not any(s <= p < e for s, e in removed):
+                right.append(t[p])
+            p += 1
+        if not left or not right:
+            return False
+        cut = len(left)
+        window = "".join(reversed(left)) + "".join(right)
+        return any(s < cut < e and self.roles[pid] & role
+                   for s, e, pid in self.automaton.finditer(window))
+
+
+def _strip_sequential(t, phrases):
+    for phrase in sorted(phrases, key=len, reverse=True):
+        t = t.replace(phrase, "")
+    return t.strip()
+
+
+def extract_entities_reference(text, open_words=OPEN_WORDS, close_words=CLOSE_WORDS,
+                               location_strip=LOCATION_STRIP, contact_strip=CONTACT_STRIP):
+    """Original per-phrase implementation — kept as the reference for equivalence checks."""
     t = text.lower()
 
     # ── Temperature (digits work in all languages) ──────────
@@ -63,31 +194,26 @@ def extract_entities(text):
 
     # ── Direction ───────────────────────────────────────────
     direction = None
-    for w in OPEN_WORDS:
+    for w in open_words:
         if w in t:
             direction = "down"
             break
     if direction is None:
-        for w in CLOSE_WORDS:
+        for w in close_words:
             if w in t:
                 direction = "up"
                 break
 
-    # ── Location ────────────────────────────────────────────
-    location = t
-    for phrase in sorted(LOCATION_STRIP, key=len, reverse=True):
-        location = location.replace(phrase, "")
-    location = location.strip()
-
-    # ── Contact ─────────────────────────────────────────────
-    contact = t
-    for phrase in sorted(CONTACT_STRIP, key=len, reverse=True):
-        contact = contact.replace(phrase, "")
-    contact = contact.strip()
-
     return {
         "temperature": temps[0] if temps else None,
         "direction":   direction,
-        "location":    location,
-        "contact":     contact,
+        "location":    _strip_sequential(t, location_strip),
+        "contact":     _strip_sequential(t, contact_strip),
     }
+
+
+_matcher = EntityMatcher(OPEN_WORDS, CLOSE_WORDS, LOCATION_STRIP, CONTACT_STRIP)
+
+
+def extract_entities(text):
+    return _matcher.extract(text)
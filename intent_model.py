@@ -1,8 +1,11 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
 import numpy as np
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, LSTM, Dense
 
 # ═══════════════════════════════════════════════════════════
 #  Multilingual Training Data
@@ -226,34 +229,264 @@ data += [
 
 # ═══════════════════════════════════════════════════════════
 #  Build + Train Model
+#  Trained artifacts (weights, tokenizer vocabulary, label_map,
+#  pad length) are stored under MODEL_DIR/<key>, where the key
+#  hashes the training corpus and the hyperparameters.  Startup
+#  loads the matching artifact and only retrains when it is missing.
+#
+#  TensorFlow is imported only to train or to serve with the Keras
+#  backend.  Once `python numpy_engine.py export` has written the
+#  NumPy weights, serving runs without TensorFlow installed.
+#
+#  The serving backend loads on first use, not at import.
+#
+#  Offline training:   python intent_model.py train
+#  Serving backend:    SPF_INTENT_BACKEND = auto | keras | numpy | compact
 # ═══════════════════════════════════════════════════════════
-sentences = [x[0] for x in data]
-labels    = [x[1] for x in data]
+HPARAMS = {
+    "vocab_size": 5000,
+    "embed_dim":  128,
+    "lstm_units": 128,
+    "epochs":     200,
+}
+
+MODEL_DIR = os.environ.get(
+    "SPF_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"),
+)
+INTENT_BACKEND = os.environ.get("SPF_INTENT_BACKEND", "auto")
+
+WEIGHTS_FILE   = "model.weights.h5"
+TOKENIZER_FILE = "tokenizer.json"
+META_FILE      = "meta.json"
+
+
+def artifact_key(samples=None, hparams=None):
+    """Hash of the training corpus + hyperparameters — names the artifact dir."""
+    payload = json.dumps(
+        {"data": samples if samples is not None else data,
+         "hparams": hparams if hparams is not None else HPARAMS},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def artifact_path(key=None):
+    return os.path.join(MODEL_DIR, key or artifact_key())
+
+
+def build_model(n_labels, hparams=HPARAMS):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Embedding, LSTM, Dense
+
+    return Sequential([
+        Embedding(hparams["vocab_size"], hparams["embed_dim"]),
+        LSTM(hparams["lstm_units"]),
+        Dense(n_labels, activation='softmax')
+    ])
+
+
+def train(samples=None, hparams=None):
+    """Train from scratch and save the artifact. Returns (model, tokenizer, label_map, max_len)."""
+    from tensorflow.keras.preprocessing.text import Tokenizer
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+    samples = samples if samples is not None else data
+    hparams = hparams if hparams is not None else HPARAMS
+
+    sentences = [x[0] for x in samples]
+    labels    = [x[1] for x in samples]
+
+    tok = Tokenizer()
+    tok.fit_on_texts(sentences)
+
+    X = tok.texts_to_sequences(sentences)
+    X = pad_sequences(X)
+
+    lmap = {label: i for i, label in enumerate(sorted(set(labels)))}
+    y = np.array([lmap[l] for l in labels])
+
+    m = build_model(len(lmap), hparams)
+    m.compile(loss='sparse_categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+    m.fit(X, y, epochs=hparams["epochs"], verbose=0)
+
+    print(f"[SPF] Intent model trained on {len(samples)} multilingual samples")
+
+    save_artifact(artifact_path(artifact_key(samples, hparams)), m, tok, lmap, X.shape[1], hparams)
+    return m, tok, lmap, X.shape[1]
+
+
+def save_artifact(path, m, tok, lmap, pad_len, hparams=HPARAMS):
+    """Write the artifact to a temp dir, then rename into place."""
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=MODEL_DIR)
+    try:
+        m.save_weights(os.path.join(tmp, WEIGHTS_FILE))
+        with open(os.path.join(tmp, TOKENIZER_FILE), "w", encoding="utf-8") as f:
+            f.write(tok.to_json())
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"label_map": lmap, "max_len": int(pad_len), "hparams": hparams},
+                      f, ensure_ascii=False, indent=2)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    print(f"[SPF] Intent model saved → {path}")
+
+
+def load_artifact(path):
+    """Load a saved artifact. Returns (model, tokenizer, label_map, max_len)."""
+    from tensorflow.keras.preprocessing.text import tokenizer_from_json
+
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(os.path.join(path, TOKENIZER_FILE), encoding="utf-8") as f:
+        tok = tokenizer_from_json(f.read())
+
+    m = build_model(len(meta["label_map"]), meta["hparams"])
+    m.build((None, meta["max_len"]))
+    m.load_weights(os.path.join(path, WEIGHTS_FILE))
+
+    print(f"[SPF] Intent model loaded ← {path}")
+    return m, tok, meta["label_map"], meta["max_len"]
+
+
+def load_or_train():
+    path = artifact_path()
+    if os.path.exists(os.path.join(path, META_FILE)):
+        try:
+            return load_artifact(path)
+        except Exception as e:
+            print(f"[SPF] Could not load intent model ({e}) — retraining")
+    return train()
+
+
+class KerasBackend:
+    """Serves the Keras model. Same predict_proba() interface as NumpyIntentEngine."""
+
+    def __init__(self, model, tokenizer, label_map, max_len):
+        self.model      = model
+        self.tokenizer  = tokenizer
+        self.word_index = tokenizer.word_index
+        self.label_map  = label_map
+        self.max_len    = max_len
+
+    def predict_proba(self, texts):
+        from tensorflow.keras.preprocessing.sequence import pad_sequences
 
-tokenizer = Tokenizer()
-tokenizer.fit_on_texts(sentences)
+        seq = self.tokenizer.texts_to_sequences(list(texts))
+        seq = pad_sequences(seq, maxlen=self.max_len)
+        return self.model(seq, training=False).numpy()
 
-X = tokenizer.texts_to_sequences(sentences)
-X = pad_sequences(X)
 
-label_map   = {label: i for i, label in enumerate(set(labels))}
-reverse_map = {i: label for label, i in label_map.items()}
-y = np.array([label_map[l] for l in labels])
+def serving_path():
+    """The model registry's active version when it was built on this corpus, else artifact_path()."""
+    import model_registry
+    return model_registry.active_path() or artifact_path()
 
-model = Sequential([
-    Embedding(5000, 128),
-    LSTM(128),
-    Dense(len(label_map), activation='softmax')
-])
 
-model.compile(loss='sparse_categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
-model.fit(X, y, epochs=200, verbose=0)
+def load_backend(kind=INTENT_BACKEND, path=None):
+    """Load the serving backend: 'numpy', 'compact', 'keras', or 'auto' (numpy if exported)."""
+    import numpy_engine
 
-print(f"[SPF] Intent model trained on {len(data)} multilingual samples")
+    path = path or serving_path()
+    if kind == "compact":
+        import quantize
+        return quantize.load(path)
+    if kind == "numpy" or (kind == "auto" and numpy_engine.is_exported(path)):
+        return numpy_engine.load(path)
+    if path != artifact_path():
+        return KerasBackend(*load_artifact(path))
+    return KerasBackend(*load_or_train())
+
+
+# ── Serving ──────────────────────────────────────────────────
+# The backend is loaded on first use (or by warm_up()), so importing
+# this module is cheap.
+
+_serving      = None    # (backend, index → label), swapped as one reference
+_generation   = 0       # bumped on every install; results computed earlier are stale
+_backend_lock = threading.Lock()
+
+
+def _install(backend):
+    # Called with _backend_lock held.  Callers that already read
+    # _serving keep using the old pair until they finish.
+    global _serving, _generation
+    _serving     = (backend, {i: label for label, i in backend.label_map.items()})
+    _generation += 1
+
+
+def _current():
+    if _serving is None:
+        with _backend_lock:
+            if _serving is None:
+                _install(load_backend())
+    return _serving
+
+
+def get_backend():
+    return _current()[0]
+
+
+def set_backend(backend):
+    """Replace the serving backend (reload, pre-fork parent, model registry swap)."""
+    with _backend_lock:
+        _install(backend)
+
+
+def is_loaded():
+    return _serving is not None
+
+
+def generation():
+    """Changes whenever a different model is installed (0 before the first)."""
+    return _generation
+
+
+def warm_up():
+    """Load the backend and run one dummy inference."""
+    predict_intents(["warm up"])
 
 
 def predict_intent(text):
-    seq = tokenizer.texts_to_sequences([text])
-    seq = pad_sequences(seq, maxlen=X.shape[1])
-    pred = model.predict(seq, verbose=0)
-    return reverse_map[np.argmax(pred)]
+    return predict_intents([text])[0]
+
+
+def predict_intents(texts):
+    """Classify a list of texts in a single forward pass."""
+    if not texts:
+        return []
+    backend, labels = _current()
+    pred = backend.predict_proba(texts)
+    return [labels[i] for i in np.argmax(pred, axis=1)]
+
+
+def predict_intents_with_confidence(texts):
+    """Like predict_intents, but returns (intent, probability) pairs."""
+    if not texts:
+        return []
+    backend, labels = _current()
+    pred = backend.predict_proba(texts)
+    best = np.argmax(pred, axis=1)
+    return [(labels[i], float(pred[row, i])) for row, i in enumerate(best)]
+
+
+def vocabulary():
+    """Word → index mapping the model was trained with."""
+    return get_backend().word_index
+
+
+def main(argv):
+    if argv == ["train"]:
+        train()
+        return 0
+    print(f"usage: python intent_model.py train\n  artifact key: {artifact_key()}")
+    return 2
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+"""
+SPF Keyword Fast Path — trigger words in front of the LSTM
+===========================================================
+Many commands contain a word (or word pair) that only ever appears
+under one intent in the training data: "ventana", "gaana", "navigate",
+"llama a" ...  Those triggers are compiled into one Aho–Corasick
+automaton over words.  A text is classified in a single pass when all
+its triggers point at the same intent and they cover at least
+MIN_COVERAGE of its words; anything ambiguous, weakly covered or
+without a trigger falls back to the model.
+
+Configuration (environment):
+  SPF_KEYWORD_FASTPATH      0 disables the fast path          (default 1)
+  SPF_KEYWORD_MIN_SUPPORT   training phrases a trigger needs  (default 2)
+  SPF_KEYWORD_MIN_COVERAGE  share of words triggers must hit  (default 0.5)
+
+Check agreement with the LSTM over the whole training corpus:
+  python keyword_intent.py check
+"""
+
+import os
+import threading
+from collections import defaultdict
+
+from aho_corasick import AhoCorasick
+
+FASTPATH_ENABLED = os.environ.get("SPF_KEYWORD_FASTPATH", "1") != "0"
+MIN_SUPPORT      = int(os.environ.get("SPF_KEYWORD_MIN_SUPPORT", "2"))
+MIN_COVERAGE     = float(os.environ.get("SPF_KEYWORD_MIN_COVERAGE", "0.5"))
+MAX_NGRAM        = 2
+
+PATHS = ("fast", "ambiguous", "weak", "miss")
+
+
+class KeywordClassifier:
+    def __init__(self, samples, min_support=MIN_SUPPORT, max_ngram=MAX_NGRAM,
+                 min_coverage=MIN_COVERAGE):
+        self.min_coverage = min_coverage
+
+        support = defaultdict(lambda: defaultdict(int))   # n-gram → intent → phrases
+        for phrase, intent in samples:
+            words = phrase.lower().split()
+            grams = {tuple(words[i:i + n])
+                     for n in range(1, max_ngram + 1)
+                     for i in range(len(words) - n + 1)}
+            for gram in grams:
+                support[gram][intent] += 1
+
+        # A trigger is an n-gram seen under exactly one intent, often enough
+        self.triggers = {
+            gram: next(iter(by_intent))
+            for gram, by_intent in support.items()
+            if len(by_intent) == 1 and sum(by_intent.values()) >= min_support
+        }
+        self._grams     = list(self.triggers)
+        self._automaton = AhoCorasick(self._grams)
+
+        self._lock  = threading.Lock()
+        self._stats = dict.fromkeys(PATHS, 0)
+
+    def match(self, text):
+        """Return (intent, "fast") or (None, "ambiguous" | "weak" | "miss")."""
+        words   = text.lower().split()
+        found   = None
+        covered = set()
+        for start, end, pid in self._automaton.finditer(words):
+            intent = self.triggers[self._grams[pid]]
+            if found is None:
+                found = intent
+            elif intent != found:
+                return None, "ambiguous"
+            covered.update(range(start, end))
+        if found is None:
+            return None, "miss"
+        if len(covered) < self.min_coverage * len(words):
+            return None, "weak"
+        return found, "fast"
+
+    def classify_batch(self, texts, fallback):
+        """Classify texts, sending only the unmatched ones to fallback(list)."""
+        results, pending = [None] * len(texts), []
+        counts = dict.fromkeys(PATHS, 0)
+        for i, text in enumerate(texts):
+            intent, path = self.match(text)
+            counts[path] += 1
+            if intent:
+                results[i] = intent
+            else:
+                pending.append(i)
+        if pending:
+            for i, intent in zip(pending, fallback([texts[i] for i in pending])):
+                results[i] = intent
+        with self._lock:
+            for path, n in counts.items():
+                self._stats[path] += n
+        return results
+
+    def lookup(self, text):
+        """match() and count the path taken. Returns the intent or None."""
+        intent, path = self.match(text)
+        with self._lock:
+            self._stats[path] += 1
+        return intent
+
+    def classify(self, text, fallback):
+        """Classify one text; fallback(text) is called only when no clean match."""
+        return self.lookup(text) or fallback(text)
+
+    def stats(self):
+        with self._lock:
+            total = sum(self._stats.values())
+            return {
+                **self._stats,
+                "triggers":  len(self.triggers),
+                "fast_rate": round(self._stats["fast"] / total, 4) if total else 0.0,
+            }
+
+    def agreement(self, samples, predict_batch):
+        """Compare the fast path with the model on every sample it claims."""
+        claimed = [(text, label, self.match(text)[0]) for text, label in samples]
+        claimed = [(text, label, fast) for text, label, fast in claimed if fast]
+        model   = predict_batch([text for text, _, _ in claimed]) if claimed else []
+        disagreements = [(text, fast, m) for (text, _, fast), m in zip(claimed, model) if fast != m]
+        n = len(claimed)
+        return {
+            "samples":         len(samples),
+            "fast_coverage":   round(n / len(samples), 4) if samples else 0.0,
+            "model_agreement": round(1 - len(disagreements) / n, 4) if n else 1.0,
+            "label_accuracy":  round(sum(f == l for _, l, f in claimed) / n, 4) if n else 1.0,
+            "disagreements":   disagreements,
+        }
+
+
+def main(argv):
+    import intent_model
+
+    if argv == ["check"]:
+        clf    = KeywordClassifier(intent_model.data)
+        report = clf.agreement(intent_model.data, intent_model.predict_intents)
+        for text, fast, model in report.pop("disagreements"):
+            print(f"  '{text}': fast={fast} model={model}")
+        for k, v in report.items():
+            print(f"  {k:16s} {v}")
+        return 0
+    print("usage: python keyword_intent.py check")
+    return 2
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))
@@ -3,13 +3,33 @@ SPF Language Module — Manual Selection + Translation
 =====================================================
 • The user picks the language manually from the UI dropdown.
 • Input text (non-English) is translated TO English before NLP.
-• The English response is translated BACK to the user's language.
+• Responses come from a fixed set of English templates, each translated
+  once per language with its slots protected (see RESPONSE_TEMPLATES).
+  `python language.py warm` precompiles all of them.
+  `python language.py check-batch` checks batched calls against the
+  real translator.
 
 Translation powered by `deep-translator` (Google Translate).
 Install:  pip install deep-translator
+
+Results are cached per (text, source, target) — see translation_cache.py.
+Network calls from concurrent requests are coalesced into one call per
+language pair, each text tagged with a numbered marker that must come
+back intact — see translation_batcher.py.
 """
 
-from deep_translator import GoogleTranslator
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from deadline import current as current_deadline
+from metrics import METRICS
+from translation_batcher import TranslationBatcher, BatcherFull, TRANSLATE_BATCH_MS
+from translation_cache import TranslationCache
 
 # ── Supported languages ───────────────────────────────────────
 SUPPORTED_LANGUAGES = {
@@ -50,12 +70,205 @@ SPEECH_RECOGNITION_LANGS = [
 
 # ── Translation helpers ───────────────────────────────────────
 
+_cache = TranslationCache()
+
+
+# (text, source, target) → str used instead of deep-translator when set
+_translator = None
+
+# Per-thread count of failed translations, so a request can tell whether
+# its result used a fallback (see thread_translation_failures)
+_local = threading.local()
+
+
+def set_translator(fn) -> None:
+    """Swap the network translate call (e.g. for a stub); None restores deep-translator."""
+    global _translator
+    _translator = fn
+
+
+# Network calls made under a request deadline run on this pool so the
+# request can stop waiting; at most TRANSLATE_WORKERS × 4 may be pending
+TRANSLATE_WORKERS = int(os.environ.get("SPF_TRANSLATE_WORKERS", "8"))
+
+_pool      = None
+_pool_lock = threading.Lock()
+_pending   = 0
+
+
+class TranslationTimeout(Exception):
+    """The request's deadline passed before the translation arrived."""
+
+
+def _network(text: str, source: str, target: str) -> str:
+    if _translator is not None:
+        return _translator(text, source, target)
+    from deep_translator import GoogleTranslator   # imported on first network call
+    return GoogleTranslator(source=source, target=target).translate(text)
+
+
+# Each text in a batched call is sent as "{n} text" on its own line
+_BATCH_RE = re.compile(r"\{\s*(\d+)\s*\}")
+
+
+def _join_batch(texts) -> str:
+    return "\n".join(f"{{{i}}} {t}" for i, t in enumerate(texts))
+
+
+def _split_batch(reply: str, count: int):
+    """Per-text translations from a batched reply, or None unless markers 0..count-1 came back in order."""
+    parts = _BATCH_RE.split(reply or "")
+    items = [p.strip() for p in parts[2::2]]
+    if parts[0].strip() or [int(n) for n in parts[1::2]] != list(range(count)) or not all(items):
+        return None
+    return items
+
+
+def _fetch_many(texts, source: str, target: str) -> list:
+    """
+    Translate texts in one network call, each behind a numbered marker;
+    caches the results.  Falls back to a call per text when a text has
+    braces or line breaks of its own, or the markers do not all come back.
+    """
+    try:
+        translated = None
+        if len(texts) > 1 and not any(c in t for t in texts for c in "{}\n"):
+            translated = _split_batch(_network(_join_batch(texts), source, target), len(texts))
+            if translated is None:
+                print(f"[SPF] Batch of {len(texts)} ({source}→{target}) came back without "
+                      f"its markers — translating one by one")
+        if translated is None:
+            translated = [_network(t, source, target) for t in texts]
+    except Exception:
+        METRICS.inc("translation_failures_total", len(texts))
+        raise
+    for text, result in zip(texts, translated):
+        if result:
+            _cache.put(text, source, target, result)
+    return translated
+
+
+# Coalesces _fetch calls from concurrent requests (None when SPF_TRANSLATE_BATCH_MS=0)
+_batcher = TranslationBatcher(_fetch_many, workers=TRANSLATE_WORKERS) if TRANSLATE_BATCH_MS > 0 else None
+if _batcher is not None and hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_batcher.after_fork)
+
+
+def _fetch(text: str, source: str, target: str) -> str:
+    """One network translation, batched with concurrent ones when enabled; caches the result."""
+    if _batcher is not None:
+        return _batcher.translate(text, source, target)
+    return _fetch_many([text], source, target)[0]
+
+
+def _release(_future) -> None:
+    global _pending
+    with _pool_lock:
+        _pending -= 1
+
+
+def _fetch_within(deadline, text: str, source: str, target: str) -> str:
+    """_fetch, waiting no longer than the deadline allows; a late result still fills the cache."""
+    global _pool, _pending
+    wait = deadline.remaining(reply=source == "en")
+    if _batcher is not None and wait > 0:
+        try:
+            future = _batcher.submit(text, source, target)
+        except BatcherFull:
+            raise TranslationTimeout(f"{source}→{target}: translation queue full") from None
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeout:
+            raise TranslationTimeout(f"{source}→{target}: no reply within {wait * 1000:.0f} ms") from None
+    with _pool_lock:
+        if wait <= 0 or _pending >= TRANSLATE_WORKERS * 4:
+            raise TranslationTimeout(f"{source}→{target}: no time left")
+        if _pool is None:
+            _pool = ThreadPoolExecutor(TRANSLATE_WORKERS, thread_name_prefix="spf-translate")
+        _pending += 1
+    future = _pool.submit(_fetch, text, source, target)
+    future.add_done_callback(_release)
+    try:
+        return future.result(timeout=wait)
+    except FutureTimeout:
+        raise TranslationTimeout(f"{source}→{target}: no reply within {wait * 1000:.0f} ms") from None
+
+
+def _translate(text: str, source: str, target: str) -> str:
+    """
+    Cached translation. Raises on failure; failures are never cached.
+    Under a request deadline (deadline.py) the network call is bounded
+    by the time left, and a stale cached translation beats none.
+    """
+    cached = _cache.get(text, source, target)
+    if cached is not None:
+        return cached
+    deadline = current_deadline()
+    try:
+        if deadline is None:
+            return _fetch(text, source, target)
+        return _fetch_within(deadline, text, source, target)
+    except TranslationTimeout:
+        stale = _cache.get_stale(text, source, target)
+        if stale is not None:
+            deadline.degrade("cached_translation")
+            return stale
+        deadline.timeouts += 1
+        METRICS.inc("translation_timeouts_total")
+        _local.failures = getattr(_local, "failures", 0) + 1
+        raise
+    except Exception:
+        _local.failures = getattr(_local, "failures", 0) + 1
+        raise
+
+
+def thread_translation_failures() -> int:
+    """Failed translations so far on this thread; compare before/after a request."""
+    return getattr(_local, "failures", 0)
+
+
+def translation_cache_stats() -> dict:
+    return _cache.stats()
+
+
+def translation_batcher_stats():
+    return _batcher.stats() if _batcher is not None else None
+
+
+async def _translate_async(text: str, source: str, target: str, translate) -> str:
+    """_translate for the asyncio pipeline; translate is the async network call."""
+    cached = _cache.get(text, source, target)
+    if cached is not None:
+        return cached
+    try:
+        translated = await translate(text, source, target)
+    except Exception:
+        METRICS.inc("translation_failures_total")
+        raise
+    if translated:
+        _cache.put(text, source, target, translated)
+    return translated
+
+
+async def translate_to_english_async(text: str, source_lang: str, translate) -> str:
+    """translate_to_english for the asyncio pipeline."""
+    if not text or source_lang == "en":
+        return text
+    try:
+        translated = await _translate_async(text, source_lang, "en", translate)
+        print(f"[SPF] → EN: '{text}' ⟶ '{translated}'")
+        return translated or text
+    except Exception as e:
+        print(f"[SPF] translate_to_english failed ({e!r}) — using original")
+        return text
+
+
 def translate_to_english(text: str, source_lang: str) -> str:
     """Translate user input → English for NLP processing."""
     if not text or source_lang == "en":
         return text
     try:
-        translated = GoogleTranslator(source=source_lang, target="en").translate(text)
+        translated = _translate(text, source_lang, "en")
         print(f"[SPF] → EN: '{text}' ⟶ '{translated}'")
         return translated or text
     except Exception as e:
@@ -68,7 +281,7 @@ def translate_from_english(text: str, target_lang: str) -> str:
     if not text or target_lang == "en":
         return text
     try:
-        translated = GoogleTranslator(source="en", target=target_lang).translate(text)
+        translated = _translate(text, "en", target_lang)
         print(f"[SPF] → {target_lang}: '{text}' ⟶ '{translated}'")
         return translated or text
     except Exception as e:
@@ -76,43 +289,236 @@ def translate_from_english(text: str, target_lang: str) -> str:
         return text
 
 
-# ── English response builder ─────────────────────────────────
+# ── Response templates ──────────────────────────────────────
+# Every reply is one of a small set of English templates.  Each
+# template is translated once per language with its {slots} protected
+# by numbered markers; at request time only the slot values are
+# filled in (and translated through the cache when needed).
 
-def build_response(intent: str, entities: dict, lang: str, raw: str) -> str:
-    """Build English response then translate to the user's selected language."""
-    english = _build_english_response(intent, entities)
-    return translate_from_english(english, lang)
+WINDOW_POSITIONS = ["Driver", "Passenger", "All Windows"]
 
+# Intent of a command that could not be understood in time; asks to repeat
+UNKNOWN_INTENT = "UNKNOWN"
 
-def _build_english_response(intent: str, entities: dict) -> str:
+RESPONSE_TEMPLATES = {
+    "AC.set":          "Temperature set to {temperature} degrees Celsius. Climate control is adjusting.",
+    "AC.adjust":       "Temperature adjusted. Climate control is adjusting.",
+    "MEDIA.play":      "Now playing {track} by {artist}. Enjoy the ride.",
+    "MEDIA.stop":      "Music stopped.",
+    "NAVIGATION.dest": "Starting navigation to {destination}.",
+    "NAVIGATION.none": "Starting navigation to your destination.",
+    "CALL.contact":    "Calling {contact} now. Connecting.",
+    "CALL.none":       "Calling your contact now. Connecting.",
+    "DEFAULT":         "Command received and executed.",
+    "UNKNOWN":         "Sorry, I did not catch that. Please say the command again.",
+}
+for _pos in [""] + WINDOW_POSITIONS:
+    _label = _pos + " " if _pos else ""
+    RESPONSE_TEMPLATES[f"WINDOW.down.{_pos}"]   = f"Opening the {_label}window smoothly."
+    RESPONSE_TEMPLATES[f"WINDOW.up.{_pos}"]     = f"Closing the {_label}window."
+    RESPONSE_TEMPLATES[f"WINDOW.adjust.{_pos}"] = f"Adjusting the {_label}window."
+
+# Changes whenever a template does; cached whole-pipeline results key on it
+TEMPLATES_VERSION = hashlib.sha1(
+    json.dumps(RESPONSE_TEMPLATES, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+# Slots copied verbatim; all other slot values are translated
+VERBATIM_SLOTS = {"temperature"}
+
+_SLOT_RE   = re.compile(r"\{(\w+)\}")
+_MARKER_RE = re.compile(r"\[\s*(\d+)\s*\]")
+
+# A template whose slot markers came back damaged is retried after this
+# many seconds (0 = on every use) rather than given up on for good
+TEMPLATE_RETRY_S = float(os.environ.get("SPF_TEMPLATE_RETRY_S", "600"))
+
+_compiled = {}   # lang → {template key → format string, or None if unusable}
+_failed   = {}   # (lang, template key) → time.monotonic() its compile came back unusable
+
+
+def _select_template(intent: str, entities: dict):
+    """Return (template key, slot values) or (None, None) if no template fits."""
     if intent == "AC":
         t = entities.get("temperature")
-        return f"Temperature set to {t} degrees Celsius. Climate control is adjusting." if t else \
-               "Temperature adjusted. Climate control is adjusting."
+        return ("AC.set", {"temperature": t}) if t else ("AC.adjust", {})
 
     if intent == "WINDOW":
         d   = entities.get("direction")
         pos = entities.get("position", "")
-        label = pos + " " if pos else ""
-        if d == "down": return f"Opening the {label}window smoothly."
-        if d == "up":   return f"Closing the {label}window."
-        return f"Adjusting the {label}window."
+        if pos and pos not in WINDOW_POSITIONS:
+            return None, None
+        kind = "down" if d == "down" else "up" if d == "up" else "adjust"
+        return f"WINDOW.{kind}.{pos}", {}
 
     if intent == "MEDIA":
-        track  = entities.get("track",  "your music")
-        artist = entities.get("artist", "the artist")
-        return f'Now playing {track} by {artist}. Enjoy the ride.' \
-               if entities.get("action") == "play" else "Music stopped."
+        if entities.get("action") != "play":
+            return "MEDIA.stop", {}
+        return "MEDIA.play", {"track":  entities.get("track",  "your music"),
+                              "artist": entities.get("artist", "the artist")}
 
     if intent == "NAVIGATION":
-        dest = entities.get("destination") or entities.get("location") or "your destination"
-        return f"Starting navigation to {dest}."
+        dest = entities.get("destination") or entities.get("location")
+        return ("NAVIGATION.dest", {"destination": dest}) if dest else ("NAVIGATION.none", {})
 
     if intent == "CALL":
-        contact = entities.get("contact") or "your contact"
-        return f"Calling {contact} now. Connecting."
+        contact = entities.get("contact")
+        return ("CALL.contact", {"contact": contact}) if contact else ("CALL.none", {})
+
+    if intent == UNKNOWN_INTENT:
+        return "UNKNOWN", {}
+
+    return "DEFAULT", {}
+
+
+def _mark_slots(template: str):
+    """Replace {slot} fields with numbered [n] markers. Returns (marked, slot names)."""
+    slots = _SLOT_RE.findall(template)
+    return _SLOT_RE.sub(lambda m: f"[{slots.index(m.group(1))}]", template), slots
+
+
+def _unmark_slots(translated: str, slots, lang: str):
+    """Turn a translated marked template back into a format string, or None if markers were lost."""
+    if not translated:
+        raise ValueError("empty translation")
+
+    # Every marker must survive exactly once, otherwise the template is unusable
+    found = [int(n) for n in _MARKER_RE.findall(translated)]
+    if sorted(found) != list(range(len(slots))):
+        print(f"[SPF] Template for {lang} lost its slots: '{translated}'")
+        return None
+    escaped = translated.replace("{", "{{").replace("}", "}}")
+    return _MARKER_RE.sub(lambda m: "{" + slots[int(m.group(1))] + "}", escaped)
+
+
+def _compile_template(template: str, lang: str):
+    """Translate one template with protected slots. Raises if translation fails."""
+    marked, slots = _mark_slots(template)
+    return _unmark_slots(_translate(marked, "en", lang), slots, lang)
+
+
+def _lookup_template(key: str, lang: str):
+    """(True, compiled) if key has a compile result for lang, (False, None) if it needs one."""
+    table = _compiled.setdefault(lang, {})
+    if key not in table:
+        return False, None
+    template = table[key]
+    if template is None and time.monotonic() - _failed.get((lang, key), 0.0) >= TEMPLATE_RETRY_S:
+        table.pop(key, None)
+        return False, None
+    return True, template
+
+
+def _store_template(key: str, lang: str, template):
+    """Record a compile result; a damaged one is dropped from the cache so a retry refetches it."""
+    _compiled.setdefault(lang, {})[key] = template
+    if template is None:
+        _failed[(lang, key)] = time.monotonic()
+        _cache.discard(_mark_slots(RESPONSE_TEMPLATES[key])[0], "en", lang)
+    return template
+
+
+def _template_for(key: str, lang: str):
+    """Compiled template for lang, compiling it on first use (and again once a failure is old)."""
+    hit, template = _lookup_template(key, lang)
+    if hit:
+        return template
+    return _store_template(key, lang, _compile_template(RESPONSE_TEMPLATES[key], lang))
+
 
-    return "Command received and executed."
+def compile_templates(lang: str) -> int:
+    """Precompile every response template for lang. Returns how many are usable."""
+    if lang == "en":
+        return len(RESPONSE_TEMPLATES)
+    if _batcher is not None:
+        # Queue every missing template at once: one batched call, not one each
+        marked  = [_mark_slots(t)[0] for key, t in RESPONSE_TEMPLATES.items()
+                   if not _lookup_template(key, lang)[0]]
+        pending = [_batcher.submit(m, "en", lang) for m in marked if _cache.get(m, "en", lang) is None]
+        for future in pending:
+            try:
+                future.result()
+            except Exception:
+                pass   # reported per template below
+    ok = 0
+    for key in RESPONSE_TEMPLATES:
+        try:
+            ok += _template_for(key, lang) is not None
+        except Exception as e:
+            print(f"[SPF] Template '{key}' for {lang} failed ({e})")
+    return ok
+
+
+def warm_templates(langs=None) -> dict:
+    """Precompile templates for all (or the given) supported languages."""
+    return {lang: compile_templates(lang) for lang in (langs or SUPPORTED_LANGUAGES)}
+
+
+# ── Response builder ─────────────────────────────────────────
+
+def build_response(intent: str, entities: dict, lang: str, raw: str) -> str:
+    """Fill the precompiled template for lang; translate the full sentence if none fits."""
+    english = _build_english_response(intent, entities)
+    if lang == "en":
+        return english
+
+    key, slots = _select_template(intent, entities)
+    try:
+        template = _template_for(key, lang) if key else None
+    except Exception as e:
+        print(f"[SPF] Template '{key}' for {lang} failed ({e})")
+        template = None
+    if template is None:
+        return translate_from_english(english, lang)
+
+    values = {name: value if name in VERBATIM_SLOTS else translate_from_english(str(value), lang)
+              for name, value in slots.items()}
+    return template.format(**values)
+
+
+async def build_response_async(intent: str, entities: dict, lang: str, translate) -> str:
+    """
+    build_response for the asyncio pipeline.  translate is an
+    async (text, source, target) → str that raises on failure; results
+    go through the same cache and compiled-template table.
+    """
+    english = _build_english_response(intent, entities)
+    if lang == "en":
+        return english
+
+    async def from_english(text):
+        try:
+            return await _translate_async(text, "en", lang, translate) or text
+        except Exception as e:
+            print(f"[SPF] translate_from_english failed ({e}) — returning English")
+            return text
+
+    key, slots = _select_template(intent, entities)
+    hit, template = _lookup_template(key, lang) if key else (True, None)
+    if not hit:
+        marked, names = _mark_slots(RESPONSE_TEMPLATES[key])
+        try:
+            translated = await _translate_async(marked, "en", lang, translate)
+            template   = _store_template(key, lang, _unmark_slots(translated, names, lang))
+        except Exception as e:
+            print(f"[SPF] Template '{key}' for {lang} failed ({e})")
+    if template is None:
+        return await from_english(english)
+
+    values = {name: value if name in VERBATIM_SLOTS else await from_english(str(value))
+              for name, value in slots.items()}
+    return template.format(**values)
+
+
+def _build_english_response(intent: str, entities: dict) -> str:
+    key, slots = _select_template(intent, entities)
+    if key is None:
+        # Unknown window position — same sentence shape, position as given
+        d   = entities.get("direction")
+        label = entities.get("position", "") + " "
+        if d == "down": return f"Opening the {label}window smoothly."
+        if d == "up":   return f"Closing the {label}window."
+        return f"Adjusting the {label}window."
+    return RESPONSE_TEMPLATES[key].format(**slots)
 
 
 # ── TTS language hint ────────────────────────────────────────
@@ -122,3 +528,37 @@ TTS_LANG_HINTS = {
     "ar": "ar-SA", "zh-CN": "zh-CN", "ja": "ja-JP", "ko": "ko-KR",
     "ru": "ru-RU", "kn": "kn-IN", "ml": "ml-IN", "bn": "bn-IN",
 }
+
+
+def check_batch(langs=None) -> bool:
+    """
+    Send every marked response template to the real translator as one
+    batch per language, and once more one by one.  Prints how many
+    batched results match; returns False if any batch lost its markers.
+    """
+    texts, ok = [_mark_slots(t)[0] for t in RESPONSE_TEMPLATES.values()], True
+    for lang in langs or [code for code in SUPPORTED_LANGUAGES if code != "en"]:
+        try:
+            batched = _split_batch(_network(_join_batch(texts), "en", lang), len(texts))
+        except Exception as e:
+            print(f"  {lang:6s} FAIL  {type(e).__name__}: {e}")
+            ok = False
+            continue
+        if batched is None:
+            print(f"  {lang:6s} FAIL  markers did not survive")
+            ok = False
+            continue
+        same = sum(b == _network(t, "en", lang).strip() for b, t in zip(batched, texts))
+        print(f"  {lang:6s} OK    {same}/{len(texts)} identical to one-by-one")
+    return ok
+
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:] == ["warm"]:
+        for code, n in warm_templates().items():
+            print(f"  {code:6s} {n}/{len(RESPONSE_TEMPLATES)} templates")
+    elif sys.argv[1:2] == ["check-batch"]:
+        sys.exit(0 if check_batch(sys.argv[2:]) else 1)
+    else:
+        print("usage: python language.py warm | check-batch [lang ...]")
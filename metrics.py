@@ -0,0 +1,155 @@
+"""
+SPF Metrics — per-stage latency histograms and counters
+========================================================
+Fixed-bucket histograms (no per-sample storage) and plain counters,
+rendered in the Prometheus text format by GET /metrics.
+
+    with METRICS.time("preprocess", timings):
+        clean = preprocess(text)
+
+observes the stage's latency and, when timings is a dict, also records
+it there in milliseconds for the per-request breakdown.  A stage costs
+two perf_counter() calls, a bisect and one uncontended lock.
+
+Quantiles (p50/p95/p99) are estimated from the buckets by linear
+interpolation, so they are only as precise as the bucket layout.
+"""
+
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Upper bounds in milliseconds; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts  = [0] * (len(self.buckets) + 1)
+        self.sum     = 0.0
+        self.count   = 0
+        self._lock   = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum       += value
+            self.count     += 1
+
+    def quantile(self, q):
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return 0.0
+        rank, seen = q * total, 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                if i == len(self.buckets):      # +Inf bucket: report its lower bound
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            count, total = self.count, self.sum
+        return {
+            "count":   count,
+            "mean_ms": round(total / count, 4) if count else 0.0,
+            **{f"p{int(q * 100)}_ms": round(self.quantile(q), 4) for q in QUANTILES},
+        }
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "timings", "t0")
+
+    def __init__(self, metrics, stage, timings):
+        self.metrics, self.stage, self.timings = metrics, stage, timings
+
+    def __enter__(self):
+        self.t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (perf_counter() - self.t0) * 1000.0
+        self.metrics.observe(self.stage, ms)
+        if self.timings is not None:
+            self.timings[self.stage] = round(self.timings.get(self.stage, 0.0) + ms, 3)
+        return False
+
+
+class Metrics:
+    def __init__(self, prefix="spf"):
+        self.prefix      = prefix
+        self._histograms = {}
+        self._counters   = {}
+        self._lock       = threading.Lock()
+
+    def time(self, stage, timings=None):
+        """Context manager timing one stage; see the module docstring."""
+        return _Timer(self, stage, timings)
+
+    def observe(self, stage, ms):
+        hist = self._histograms.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(stage, Histogram())
+        hist.observe(ms)
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            hists, counters = dict(self._histograms), dict(self._counters)
+        return {"stages": {k: h.snapshot() for k, h in sorted(hists.items())},
+                "counters": counters}
+
+    def render(self, extra=None, gauges=None, histograms=None):
+        """
+        Prometheus text format.  Owned elsewhere: extra {name: count}
+        counters, gauges {name: value} and histograms {name: (upper
+        bounds, per-bucket counts with +Inf last, sum)}.
+        """
+        p = self.prefix
+        with self._lock:
+            hists, counters = dict(self._histograms), dict(self._counters)
+        counters.update(extra or {})
+
+        lines = [f"# HELP {p}_stage_latency_ms Pipeline stage latency in milliseconds.",
+                 f"# TYPE {p}_stage_latency_ms histogram"]
+        for stage, h in sorted(hists.items()):
+            with h._lock:
+                counts, total, count = list(h.counts), h.sum, h.count
+            cumulative = 0
+            for bound, n in zip(h.buckets + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f'{p}_stage_latency_ms_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{p}_stage_latency_ms_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{p}_stage_latency_ms_count{{stage="{stage}"}} {count}')
+
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE {p}_{name} counter")
+            lines.append(f"{p}_{name} {value}")
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name} {value}")
+        for name, (bounds, counts, total) in sorted((histograms or {}).items()):
+            lines.append(f"# TYPE {p}_{name} histogram")
+            cumulative = 0
+            for bound, n in zip(tuple(bounds) + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f'{p}_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{p}_{name}_sum {total}")
+            lines.append(f"{p}_{name}_count {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by api.py and language.py
+METRICS = Metrics()
@@ -0,0 +1,380 @@
+"""
+SPF Model Registry — versioned intent models with incremental fine-tuning
+==========================================================================
+New labelled phrases (e.g. a new dialect) no longer require editing
+intent_model.py and retraining from scratch:
+
+  1. submit() starts a background job that fine-tunes the active model
+     on the base corpus + every phrase added so far, with the new ones
+     repeated so they are learned quickly.  Unseen words get fresh
+     tokenizer indices (existing ones never move) and the embedding
+     grows if they do not fit; a new intent label adds an output unit.
+  2. The result is validated: accuracy on the existing corpus must not
+     drop more than SPF_FINETUNE_TOLERANCE below the active model, and
+     at least SPF_FINETUNE_MIN_NEW of the new phrases must be right.
+  3. The new version is saved (Keras weights + NumPy engine), then
+     swapped in with intent_model.set_backend().  Requests already
+     inside the model finish on the old one.
+
+Versions live in models/registry/v<N>/; the newest SPF_MODEL_KEEP are
+kept for rollback.  Version 0 is the base artifact built from
+intent_model.data.  The active version survives restarts as long as
+intent_model.data is unchanged (a new base corpus starts a fresh
+registry).
+
+Fine-tuning needs TensorFlow; it is meant for the single-process
+server (api.py).  serve.py marks its registry read-only, because each
+worker would otherwise allocate versions from its own copy of the
+manifest and swap only itself: fine-tune with api.py on the same
+models/ directory, then send the serve.py parent SIGHUP.  The reload
+re-reads the manifest (refresh()) and the new workers start on the
+active version with matching keyword triggers.
+"""
+
+import json
+import os
+import random
+import shutil
+import threading
+import time
+
+import numpy as np
+
+import intent_model
+
+REGISTRY_DIR       = os.path.join(intent_model.MODEL_DIR, "registry")
+MANIFEST_FILE      = "registry.json"
+PHRASES_FILE       = "phrases.json"
+KEEP_VERSIONS      = int(os.environ.get("SPF_MODEL_KEEP", "5"))
+FINETUNE_EPOCHS    = int(os.environ.get("SPF_FINETUNE_EPOCHS", "30"))
+FINETUNE_REPEAT    = int(os.environ.get("SPF_FINETUNE_REPEAT", "8"))
+FINETUNE_TOLERANCE = float(os.environ.get("SPF_FINETUNE_TOLERANCE", "0.01"))
+FINETUNE_MIN_NEW   = float(os.environ.get("SPF_FINETUNE_MIN_NEW", "0.8"))
+
+
+class RegistryBusy(Exception):
+    """A fine-tuning job is already running."""
+
+
+class ValidationFailed(Exception):
+    pass
+
+
+class RegistryReadOnly(Exception):
+    """Model changes are disabled in this process (serve.py workers)."""
+
+
+def active_path(root=REGISTRY_DIR):
+    """Path of the active registry version for the current base corpus, or None."""
+    try:
+        with open(os.path.join(root, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("base") != intent_model.artifact_key() or not manifest.get("active"):
+        return None
+    path = os.path.join(root, f"v{manifest['active']}")
+    return path if os.path.isdir(path) else None
+
+
+def accuracy(predict, samples):
+    if not samples:
+        return 1.0
+    pred = predict([s for s, _ in samples])
+    return float(np.mean([p == l for p, (_, l) in zip(pred, samples)]))
+
+
+# ═══════════════════════════════════════════════════════════
+#  Fine-tuning (TensorFlow)
+# ═══════════════════════════════════════════════════════════
+
+def extend_tokenizer(tok, texts):
+    """Give unseen words the next free indices; existing indices never move. Returns them."""
+    from tensorflow.keras.preprocessing.text import text_to_word_sequence
+
+    added = []
+    next_index = max(tok.word_index.values(), default=0) + 1
+    for text in texts:
+        for w in text_to_word_sequence(text, filters=tok.filters, lower=tok.lower, split=tok.split):
+            tok.word_counts[w] = tok.word_counts.get(w, 0) + 1
+            if w not in tok.word_index:
+                tok.word_index[w]          = next_index
+                tok.index_word[next_index] = w
+                tok.word_docs[w]           = tok.word_docs.get(w, 0) + 1
+                added.append(w)
+                next_index += 1
+    return added
+
+
+def grow_model(model, hparams, n_words, label_map, max_len):
+    """
+    Copy model into a fresh one with room for n_words tokens and every
+    label in label_map; new embedding rows / output units start from
+    the fresh model's random init.  The serving model is not touched.
+    """
+    hparams = dict(hparams, vocab_size=max(hparams["vocab_size"], n_words + 1))
+    grown   = intent_model.build_model(len(label_map), hparams)
+    grown.build((None, max_len))
+
+    (emb,), (k, rk, b), (dk, db) = (layer.get_weights() for layer in model.layers)
+    new_emb, = grown.layers[0].get_weights()
+    new_dk, new_db = grown.layers[2].get_weights()
+    new_emb[:emb.shape[0]]      = emb
+    new_dk[:, :dk.shape[1]]     = dk
+    new_db[:db.shape[0]]        = db
+    grown.layers[0].set_weights([new_emb])
+    grown.layers[1].set_weights([k, rk, b])
+    grown.layers[2].set_weights([new_dk, new_db])
+    return grown, hparams
+
+
+def fine_tune(path, corpus, new_phrases, epochs=FINETUNE_EPOCHS, repeat=FINETUNE_REPEAT):
+    """Fine-tune the artifact at path. Returns (model, tokenizer, label_map, max_len, hparams)."""
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+    model, tok, lmap, max_len = intent_model.load_artifact(path)
+    with open(os.path.join(path, intent_model.META_FILE), encoding="utf-8") as f:
+        hparams = json.load(f)["hparams"]
+
+    added = extend_tokenizer(tok, [s for s, _ in new_phrases])
+    lmap  = dict(lmap)
+    for _, label in new_phrases:
+        lmap.setdefault(label, len(lmap))
+
+    samples = list(corpus) + list(new_phrases) * repeat
+    random.Random(0).shuffle(samples)
+    seqs    = tok.texts_to_sequences([s for s, _ in samples])
+    max_len = max(max_len, max(len(s) for s in seqs))
+    X = pad_sequences(seqs, maxlen=max_len)
+    y = np.array([lmap[l] for _, l in samples])
+
+    model, hparams = grow_model(model, hparams, len(tok.word_index), lmap, max_len)
+    model.compile(loss="sparse_categorical_crossentropy", optimizer="adam", metrics=["accuracy"])
+    model.fit(X, y, epochs=epochs, verbose=0)
+    print(f"[SPF] Fine-tuned on {len(samples)} samples, {len(added)} new words, "
+          f"vocab {len(tok.word_index)}, labels {len(lmap)}")
+    return model, tok, lmap, max_len, hparams
+
+
+# ═══════════════════════════════════════════════════════════
+#  Registry
+# ═══════════════════════════════════════════════════════════
+
+class ModelRegistry:
+    def __init__(self, root=REGISTRY_DIR, keep=KEEP_VERSIONS, base_samples=None):
+        self.root         = root
+        self.keep         = max(1, int(keep))
+        self.base_samples = list(base_samples if base_samples is not None else intent_model.data)
+
+        self.read_only  = False
+        self._lock      = threading.Lock()
+        self._job       = None
+        self._callbacks = []
+        self._manifest  = self._load_manifest()
+
+    # ── Public API ─────────────────────────────────────────
+    def on_swap(self, callback):
+        """callback(samples) runs after every swap with the corpus the new model knows."""
+        self._callbacks.append(callback)
+
+    def corpus(self, version=None):
+        """Base corpus + phrases added up to version (default: active)."""
+        return self.base_samples + self._phrases(self._active() if version is None else version)
+
+    def status(self):
+        with self._lock:
+            return {
+                "active":   self._active(),
+                "versions": list(self._manifest["versions"]),
+                "job":      dict(self._job) if self._job else None,
+            }
+
+    def submit(self, phrases):
+        """Start fine-tuning on [(text, intent), ...] in the background. Returns the job."""
+        phrases = [(str(t).strip().lower(), str(l).strip()) for t, l in phrases if str(t).strip() and l]
+        if not phrases:
+            raise ValueError("no phrases")
+        self._check_writable()
+        with self._lock:
+            if self._job and self._job["state"] == "running":
+                raise RegistryBusy(f"job {self._job['id']} is still running")
+            self._job = {"id": int(time.time() * 1000), "state": "running",
+                         "phrases": len(phrases), "started": time.time()}
+            job = self._job
+        threading.Thread(target=self._run, args=(job, phrases), name="spf-finetune", daemon=True).start()
+        return dict(job)
+
+    def wait(self, timeout=None):
+        """Block until the current job is done (for scripts). Returns its final state."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                job = dict(self._job) if self._job else None
+            if not job or job["state"] != "running":
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                return job
+            time.sleep(0.2)
+
+    def rollback(self, version=None):
+        """Activate version (default: the one before the active one)."""
+        self._check_writable()
+        with self._lock:
+            versions = [v["version"] for v in self._manifest["versions"]]
+            if version is None:
+                older = [v for v in versions if v < self._active()]
+                if not older:
+                    raise ValueError("no older version to roll back to")
+                version = older[-1]
+            if version not in versions:
+                raise ValueError(f"unknown version {version}")
+        self.activate(version)
+        return version
+
+    def activate(self, version, backend=None):
+        backend = backend or self._load_backend(self._path(version))
+        intent_model.set_backend(backend)
+        with self._lock:
+            self._manifest["active"] = version
+            self._save_manifest()
+        print(f"[SPF] Intent model v{version} active")
+        self._notify(version)
+
+    def refresh(self):
+        """
+        Re-read the manifest written by another process; the swap
+        callbacks run if the active version changed.  The caller loads
+        the model itself (serve.py's SIGHUP reload).
+        """
+        manifest = self._load_manifest()
+        with self._lock:
+            changed, self._manifest = manifest["active"] != self._active(), manifest
+        if changed:
+            self._notify(manifest["active"])
+        return changed
+
+    def _notify(self, version):
+        samples = self.corpus(version)
+        for callback in self._callbacks:
+            try:
+                callback(samples)
+            except Exception as e:
+                print(f"[SPF] Model swap callback failed: {e}")
+
+    def _check_writable(self):
+        if self.read_only:
+            raise RegistryReadOnly("model changes are disabled under serve.py: fine-tune with "
+                                   "api.py on the same models/ directory, then SIGHUP the serve.py parent")
+
+    # ── Job ────────────────────────────────────────────────
+    def _run(self, job, phrases):
+        try:
+            update = dict(state="done", **self._train_version(phrases))
+        except ValidationFailed as e:
+            update = dict(state="rejected", error=str(e))
+            print(f"[SPF] Fine-tune rejected: {e}")
+        except Exception as e:
+            update = dict(state="failed", error=str(e))
+            print(f"[SPF] Fine-tune failed: {e}")
+        with self._lock:
+            job.update(update, finished=time.time())
+
+    def _train_version(self, phrases):
+        import numpy_engine
+
+        base     = self._active()
+        corpus   = self.corpus(base)
+        previous = self._phrases(base)
+        known    = set(previous) | set(self.base_samples)
+        new      = [p for p in phrases if p not in known]
+        if not new:
+            raise ValidationFailed("all phrases are already in the corpus")
+
+        before = accuracy(intent_model.predict_intents, corpus)
+        model, tok, lmap, max_len, hparams = fine_tune(self._path(base), corpus, new)
+
+        version = max(v["version"] for v in self._manifest["versions"]) + 1
+        path    = self._path(version)
+        os.makedirs(self.root, exist_ok=True)
+        intent_model.save_artifact(path, model, tok, lmap, max_len, hparams)
+        numpy_engine.export(path, model, tok, lmap, max_len)
+        with open(os.path.join(path, PHRASES_FILE), "w", encoding="utf-8") as f:
+            json.dump(previous + new, f, ensure_ascii=False, indent=1)
+
+        candidate = self._load_backend(path)
+        labels    = {i: label for label, i in candidate.label_map.items()}
+        predict   = lambda texts: [labels[i] for i in np.argmax(candidate.predict_proba(texts), axis=1)]  # noqa: E731
+        after     = accuracy(predict, corpus)
+        new_acc   = accuracy(predict, new)
+        report    = {"version": version, "parent": base, "added": len(new),
+                     "corpus_accuracy_before": round(before, 4),
+                     "corpus_accuracy": round(after, 4), "new_accuracy": round(new_acc, 4)}
+
+        if after < before - FINETUNE_TOLERANCE or new_acc < FINETUNE_MIN_NEW:
+            shutil.rmtree(path, ignore_errors=True)
+            raise ValidationFailed(f"corpus accuracy {before:.4f} → {after:.4f}, "
+                                   f"new phrases {new_acc:.4f}")
+
+        with self._lock:
+            self._manifest["versions"].append({**report, "created": time.time()})
+            self._save_manifest()
+        self.activate(version, candidate)
+        self._prune()
+        return report
+
+    # ── Storage ────────────────────────────────────────────
+    def _active(self):
+        return self._manifest["active"]
+
+    def _path(self, version):
+        return intent_model.artifact_path() if version == 0 else os.path.join(self.root, f"v{version}")
+
+    def _phrases(self, version):
+        if version == 0:
+            return []
+        with open(os.path.join(self._path(version), PHRASES_FILE), encoding="utf-8") as f:
+            return [tuple(p) for p in json.load(f)]
+
+    def _load_backend(self, path):
+        import numpy_engine
+
+        kind = intent_model.INTENT_BACKEND
+        if kind == "compact":
+            import quantize
+            if not quantize.is_exported(path):
+                quantize.export(path, self.base_samples)
+        elif kind == "keras" or not numpy_engine.is_exported(path):
+            kind = "keras"
+        else:
+            kind = "numpy"
+        return intent_model.load_backend(kind, path)
+
+    def _load_manifest(self):
+        fresh = {"base": intent_model.artifact_key(), "active": 0,
+                 "versions": [{"version": 0, "parent": None, "added": 0, "created": None}]}
+        try:
+            with open(os.path.join(self.root, MANIFEST_FILE), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return fresh
+        return manifest if manifest.get("base") == fresh["base"] else fresh
+
+    def _save_manifest(self):
+        # Called with self._lock held; written atomically
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, MANIFEST_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp, os.path.join(self.root, MANIFEST_FILE))
+
+    def _prune(self):
+        """Keep version 0, the active one and the newest `keep` versions."""
+        with self._lock:
+            versions = self._manifest["versions"]
+            newest   = {v["version"] for v in versions[-self.keep:]}
+            keep     = newest | {0, self._active()}
+            dropped  = [v["version"] for v in versions if v["version"] not in keep]
+            self._manifest["versions"] = [v for v in versions if v["version"] in keep]
+            self._save_manifest()
+        for version in dropped:
+            shutil.rmtree(self._path(version), ignore_errors=True)
@@ -0,0 +1,226 @@
+"""
+SPF NumPy Intent Engine — TensorFlow-free inference
+====================================================
+Runs the forward pass of the intent model
+    Embedding → LSTM → Dense(softmax)
+with NumPy only, so serving nodes do not need TensorFlow.
+
+Export the weights + tokenizer vocabulary of the current artifact
+(requires TensorFlow, run once after training):
+    python numpy_engine.py export
+
+Check the engine against Keras on the training corpus:
+    python numpy_engine.py parity
+"""
+
+import json
+import os
+
+import numpy as np
+
+ENGINE_WEIGHTS = "engine.npz"
+ENGINE_META    = "engine.json"
+
+PARITY_TOLERANCE = 1e-4
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+ACTIVATIONS = {
+    "sigmoid":      _sigmoid,
+    "hard_sigmoid": _hard_sigmoid,
+    "tanh":         np.tanh,
+    "linear":       lambda x: x,
+}
+
+
+class NumpyIntentEngine:
+    """Batched NumPy forward pass with the same predict_proba() as KerasBackend."""
+
+    def __init__(self, weights, meta):
+        self.embedding    = weights["embedding"]
+        self.kernel       = weights["lstm_kernel"]
+        self.recurrent    = weights["lstm_recurrent_kernel"]
+        self.bias         = weights["lstm_bias"]
+        self.dense_kernel = weights["dense_kernel"]
+        self.dense_bias   = weights["dense_bias"]
+
+        self.word_index = meta["word_index"]
+        self.label_map  = meta["label_map"]
+        self.max_len    = meta["max_len"]
+        self.units      = self.recurrent.shape[0]
+        self.mask_zero  = meta.get("mask_zero", False)
+
+        tok = meta["tokenizer"]
+        self.lower     = tok["lower"]
+        self.split     = tok["split"]
+        self.num_words = tok["num_words"]
+        self.oov_index = self.word_index.get(tok["oov_token"]) if tok["oov_token"] else None
+        self._filter   = str.maketrans({c: tok["split"] for c in tok["filters"]})
+
+        self.activation           = ACTIVATIONS[meta["activation"]]
+        self.recurrent_activation = ACTIVATIONS[meta["recurrent_activation"]]
+
+    # ── Tokenization (mirrors keras Tokenizer + pad_sequences) ──
+    def texts_to_sequences(self, texts):
+        seqs = []
+        for text in texts:
+            if self.lower:
+                text = text.lower()
+            seq = []
+            for w in text.translate(self._filter).split(self.split):
+                if not w:
+                    continue
+                i = self.word_index.get(w)
+                if i is not None and not (self.num_words and i >= self.num_words):
+                    seq.append(i)
+                elif self.oov_index is not None:
+                    seq.append(self.oov_index)
+            seqs.append(seq)
+        return seqs
+
+    def pad(self, seqs):
+        """Pre-pad / pre-truncate to max_len, like pad_sequences defaults."""
+        out = np.zeros((len(seqs), self.max_len), dtype=np.int32)
+        for row, seq in enumerate(seqs):
+            seq = seq[-self.max_len:]
+            if seq:
+                out[row, -len(seq):] = seq
+        return out
+
+    # ── Forward pass ───────────────────────────────────────
+    def forward(self, ids):
+        """ids: int array (batch, steps) → softmax probabilities (batch, labels)."""
+        batch, steps = ids.shape
+        u = self.units
+
+        # Input projections for every step at once: (batch, steps, 4u)
+        x = self.embedding[ids] @ self.kernel + self.bias
+        h = np.zeros((batch, u), dtype=np.float32)
+        c = np.zeros((batch, u), dtype=np.float32)
+        mask = ids != 0 if self.mask_zero else None
+
+        for t in range(steps):
+            z = x[:, t] + h @ self.recurrent
+            i = self.recurrent_activation(z[:, :u])
+            f = self.recurrent_activation(z[:, u:2 * u])
+            g = self.activation(z[:, 2 * u:3 * u])
+            o = self.recurrent_activation(z[:, 3 * u:])
+            c_new = f * c + i * g
+            h_new = o * self.activation(c_new)
+            if mask is None:
+                h, c = h_new, c_new
+            else:
+                # Padded steps carry the previous state through unchanged
+                m = mask[:, t:t + 1]
+                h = np.where(m, h_new, h)
+                c = np.where(m, c_new, c)
+
+        logits = h @ self.dense_kernel + self.dense_bias
+        logits -= logits.max(axis=1, keepdims=True)
+        e = np.exp(logits)
+        return e / e.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts):
+        return self.forward(self.pad(self.texts_to_sequences(texts)))
+
+
+# ═══════════════════════════════════════════════════════════
+#  Export / load
+# ═══════════════════════════════════════════════════════════
+
+def is_exported(path):
+    return (os.path.exists(os.path.join(path, ENGINE_WEIGHTS))
+            and os.path.exists(os.path.join(path, ENGINE_META)))
+
+
+def load(path):
+    with open(os.path.join(path, ENGINE_META), encoding="utf-8") as f:
+        meta = json.load(f)
+    with np.load(os.path.join(path, ENGINE_WEIGHTS)) as npz:
+        weights = {k: npz[k] for k in npz.files}
+    print(f"[SPF] NumPy intent engine loaded ← {path}")
+    return NumpyIntentEngine(weights, meta)
+
+
+def export(path, model, tokenizer, label_map, max_len):
+    """Dump a Keras intent model + tokenizer into path as engine.npz / engine.json."""
+    emb, lstm, dense = model.layers
+    kernel, recurrent, bias = lstm.get_weights()
+    dense_kernel, dense_bias = dense.get_weights()
+    lstm_cfg = lstm.get_config()
+
+    weights = {
+        "embedding":             emb.get_weights()[0],
+        "lstm_kernel":           kernel,
+        "lstm_recurrent_kernel": recurrent,
+        "lstm_bias":             bias,
+        "dense_kernel":          dense_kernel,
+        "dense_bias":            dense_bias,
+    }
+    meta = {
+        "word_index": tokenizer.word_index,
+        "label_map":  label_map,
+        "max_len":    int(max_len),
+        "mask_zero":  bool(emb.get_config().get("mask_zero", False)),
+        "activation":           lstm_cfg["activation"],
+        "recurrent_activation": lstm_cfg["recurrent_activation"],
+        "tokenizer": {
+            "filters":   tokenizer.filters,
+            "lower":     tokenizer.lower,
+            "split":     tokenizer.split,
+            "num_words": tokenizer.num_words,
+            "oov_token": tokenizer.oov_token,
+        },
+    }
+
+    np.savez(os.path.join(path, ENGINE_WEIGHTS),
+             **{k: np.asarray(v, dtype=np.float32) for k, v in weights.items()})
+    with open(os.path.join(path, ENGINE_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    print(f"[SPF] NumPy intent engine exported → {path}")
+
+
+def check_parity(engine, keras_backend, texts, tol=PARITY_TOLERANCE):
+    """Compare engine vs Keras probabilities. Returns (ok, max_abs_diff, intent_agreement).
+
+    ok is True when no probability differs by more than tol and every
+    phrase gets the same intent from both.
+    """
+    ours   = engine.predict_proba(texts)
+    theirs = keras_backend.predict_proba(texts)
+    diff   = float(np.max(np.abs(ours - theirs)))
+    agree  = float(np.mean(np.argmax(ours, axis=1) == np.argmax(theirs, axis=1)))
+    return diff <= tol and agree == 1.0, diff, agree
+
+
+def main(argv):
+    import intent_model
+
+    path = intent_model.artifact_path()
+    if argv == ["export"]:
+        export(path, *intent_model.load_or_train())
+        return 0
+    if argv == ["parity"]:
+        keras_backend = intent_model.KerasBackend(*intent_model.load_or_train())
+        if not is_exported(path):
+            export(path, keras_backend.model, keras_backend.tokenizer,
+                   keras_backend.label_map, keras_backend.max_len)
+        texts = [s for s, _ in intent_model.data]
+        ok, diff, agree = check_parity(load(path), keras_backend, texts)
+        print(f"[SPF] parity on {len(texts)} phrases: max |Δp| = {diff:.2e}, "
+              f"intent agreement = {agree:.2%} → {'OK' if ok else 'FAIL'}")
+        return 0 if ok else 1
+    print("usage: python numpy_engine.py export | parity")
+    return 2
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))
@@ -1,12 +1,59 @@
-import nltk
-from nltk.tokenize import word_tokenize
+import os
+import re
 import string
 
+# ═══════════════════════════════════════════════════════════
+#  Tokenizer
+#  One compiled regex reproduces what NLTK's word_tokenize does to
+#  short voice commands: punctuation is split off, English clitics
+#  become their own tokens ("don't" → "do n't", "it's" → "it 's"),
+#  and numbers like 22.5 / 1,000 stay whole.  Any non-space,
+#  non-punctuation character is a word character, so Devanagari and
+#  Telugu vowel signs and accented Spanish letters stay inside words.
+#
+#  Deliberate differences from NLTK: double quotes are dropped instead
+#  of becoming `` / '' tokens, the Devanagari danda (। ॥) is treated as
+#  punctuation, and a period followed by a space always ends a word
+#  (NLTK keeps "st." together mid-sentence).
+#
+#  SPF_TOKENIZER=nltk switches back to NLTK (optional dependency).
+# ═══════════════════════════════════════════════════════════
+
+TOKENIZER = os.environ.get("SPF_TOKENIZER", "regex")
+
+_EXTRA_PUNCT = "«»“”‘’।॥"    # not in string.punctuation, dropped as well
+
+_PUNCT   = re.escape('!"#$%&()*+,./:;<=>?@[\\]^`{|}~' + _EXTRA_PUNCT)
+_WORD    = rf"[^\s{_PUNCT}'’-]"
+_CLITIC  = r"['’](?:s|m|d|ll|re|ve)\b"
+
+TOKEN_RE = re.compile(rf"""
+      {_WORD}+(?=n['’]t\b)                  # do|n't, ca|n't
+    | n['’]t\b
+    | {_CLITIC}
+    | {_WORD}+                              # word, with joiners inside:
+      (?: (?: -                             #   e-mail
+            | [.](?={_WORD})                #   22.5, e.g
+            | [,:](?=\d)                    #   1,000
+            | ['’](?!(?:s|m|d|ll|re|ve)\b)(?={_WORD})   # o'clock
+          ) {_WORD}+ )*
+    | \.\.\. | --                           # kept as single tokens, like NLTK
+    | \S                                    # any other symbol on its own
+""", re.VERBOSE | re.IGNORECASE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text)
+
 
 def preprocess(text):
 
-    tokens = word_tokenize(text)
+    if TOKENIZER == "nltk":
+        from nltk.tokenize import word_tokenize
+        tokens = word_tokenize(text)
+    else:
+        tokens = tokenize(text)
 
-    tokens = [word for word in tokens if word not in string.punctuation]
+    tokens = [word for word in tokens if word not in string.punctuation and word not in _EXTRA_PUNCT]
 
     return " ".join(tokens)
@@ -0,0 +1,258 @@
+"""
+SPF Compact Intent Engine — trimmed vocabulary + int8 weights
+=============================================================
+The model declares Embedding(vocab_size=5000, …) but the tokenizer only
+knows a few hundred words, so most of the embedding table is never
+read.  This export, built from the NumPy engine (numpy_engine.py):
+
+  • trims the embedding to the rows the tokenizer can produce
+  • optionally stores the embedding, LSTM and dense kernels as int8
+    with one float32 scale per channel (per embedding row, per output
+    column of each kernel); biases stay float32
+
+int8 weights stay int8 in memory (Int8Weights): an embedding lookup
+dequantizes only the rows it reads, and a matmul scales its result by
+the per-column scale, so the forward pass is otherwise the NumPy
+engine's.  An int8 export is refused if its intent accuracy on the
+training corpus falls below the float model's.
+
+  python quantize.py export [--dtype int8|float32] [--force]
+  python quantize.py report        # size / load time / latency / accuracy
+
+Serve it with SPF_INTENT_BACKEND=compact.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+import numpy_engine
+from numpy_engine import NumpyIntentEngine
+
+COMPACT_WEIGHTS = "engine.compact.npz"
+COMPACT_META    = "engine.compact.json"
+
+# weight name → axis the per-channel scale runs along (the reduced axis is the other one)
+QUANTIZED = {
+    "embedding":             1,   # one scale per row (token)
+    "lstm_kernel":           0,   # one scale per output column
+    "lstm_recurrent_kernel": 0,
+    "dense_kernel":          0,
+}
+
+
+def quantize_per_channel(w, axis):
+    """Symmetric int8: returns (q, scale) with w ≈ q * scale, scale reduced over axis."""
+    scale = np.max(np.abs(w), axis=axis, keepdims=True) / 127.0
+    scale = np.where(scale == 0, 1.0, scale).astype(np.float32)
+    q     = np.clip(np.round(w / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+class Int8Weights:
+    """
+    An int8 matrix with per-channel float32 scales that behaves like the
+    float one where NumpyIntentEngine uses it: w[ids] (embedding rows)
+    and x @ w (kernels).
+    """
+
+    __array_ufunc__ = None   # makes ndarray @ Int8Weights call __rmatmul__
+
+    def __init__(self, q, scale):
+        self.q     = q
+        self.scale = scale
+
+    @property
+    def shape(self):
+        return self.q.shape
+
+    @property
+    def nbytes(self):
+        return self.q.nbytes + self.scale.nbytes
+
+    def __getitem__(self, ids):
+        # Per-row scale: dequantize just the rows looked up
+        return self.q[ids].astype(np.float32) * self.scale[ids]
+
+    def __rmatmul__(self, x):
+        # Per-column scale: x @ (q * s) == (x @ q) * s
+        return (x @ self.q.astype(np.float32)) * self.scale
+
+
+def trim_embedding(embedding, meta):
+    """Keep rows 0..max token index (row 0 is padding)."""
+    tok   = meta["tokenizer"]
+    top   = max(meta["word_index"].values(), default=0)
+    if tok["num_words"]:
+        top = min(top, tok["num_words"] - 1)
+    return embedding[:top + 1]
+
+
+# ═══════════════════════════════════════════════════════════
+#  Export / load
+# ═══════════════════════════════════════════════════════════
+
+def is_exported(path):
+    return (os.path.exists(os.path.join(path, COMPACT_WEIGHTS))
+            and os.path.exists(os.path.join(path, COMPACT_META)))
+
+
+def _float_weights(path):
+    with np.load(os.path.join(path, numpy_engine.ENGINE_WEIGHTS)) as npz:
+        return {k: npz[k] for k in npz.files}
+
+
+def _float_meta(path):
+    with open(os.path.join(path, numpy_engine.ENGINE_META), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build(weights, meta, dtype="int8"):
+    """Return (arrays to save, compact meta) from float engine weights."""
+    weights = dict(weights, embedding=trim_embedding(weights["embedding"], meta))
+    arrays  = {}
+    for name, w in weights.items():
+        if dtype == "int8" and name in QUANTIZED:
+            q, scale = quantize_per_channel(w, QUANTIZED[name])
+            arrays[name]            = q
+            arrays[name + ".scale"] = scale
+        else:
+            arrays[name] = np.asarray(w, dtype=np.float32)
+    meta = dict(meta, quantization=dtype, vocab_rows=int(weights["embedding"].shape[0]))
+    return arrays, meta
+
+
+def resident(arrays):
+    """Engine weights from saved arrays: int8 ones wrapped in Int8Weights, the rest as is."""
+    return {name: Int8Weights(w, arrays[name + ".scale"]) if name + ".scale" in arrays else w
+            for name, w in arrays.items() if not name.endswith(".scale")}
+
+
+def load(path):
+    with open(os.path.join(path, COMPACT_META), encoding="utf-8") as f:
+        meta = json.load(f)
+    with np.load(os.path.join(path, COMPACT_WEIGHTS)) as npz:
+        arrays = {k: npz[k] for k in npz.files}
+    print(f"[SPF] Compact ({meta['quantization']}) intent engine loaded ← {path}")
+    return NumpyIntentEngine(resident(arrays), meta)
+
+
+def accuracy(engine, samples):
+    texts  = [s for s, _ in samples]
+    labels = {i: label for label, i in engine.label_map.items()}
+    pred   = np.argmax(engine.predict_proba(texts), axis=1)
+    return float(np.mean([labels[p] == l for p, (_, l) in zip(pred, samples)]))
+
+
+def export(path, samples, dtype="int8", force=False):
+    """Write the compact engine next to the float one. Returns (float_acc, compact_acc)."""
+    weights, meta = _float_weights(path), _float_meta(path)
+    arrays, cmeta = build(weights, meta, dtype)
+
+    float_acc   = accuracy(NumpyIntentEngine(weights, meta), samples)
+    compact_acc = accuracy(NumpyIntentEngine(resident(arrays), cmeta), samples)
+    if compact_acc < float_acc and not force:
+        raise ValueError(f"{dtype} accuracy {compact_acc:.4f} is below float {float_acc:.4f}")
+
+    np.savez(os.path.join(path, COMPACT_WEIGHTS), **arrays)
+    with open(os.path.join(path, COMPACT_META), "w", encoding="utf-8") as f:
+        json.dump(cmeta, f, ensure_ascii=False)
+    print(f"[SPF] Compact ({dtype}) intent engine exported → {path}  "
+          f"(embedding {weights['embedding'].shape[0]} → {cmeta['vocab_rows']} rows)")
+    return float_acc, compact_acc
+
+
+# ═══════════════════════════════════════════════════════════
+#  Report
+# ═══════════════════════════════════════════════════════════
+
+def _median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return sorted(times)[len(times) // 2]
+
+
+def report(path, samples, repeat=20):
+    """Float vs trimmed float32 vs int8: on-disk size, load time, latency, accuracy."""
+    import contextlib
+    import io
+    import tempfile
+
+    texts    = [s for s, _ in samples]
+    weights  = _float_weights(path)
+    meta     = _float_meta(path)
+    float_files   = [numpy_engine.ENGINE_WEIGHTS, numpy_engine.ENGINE_META]
+    compact_files = [COMPACT_WEIGHTS, COMPACT_META]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = [("float (full)", path, float_files, numpy_engine.load)]
+        for dtype in ("float32", "int8"):
+            d = os.path.join(tmp, dtype)
+            os.makedirs(d)
+            arrays, cmeta = build(weights, meta, dtype)
+            np.savez(os.path.join(d, COMPACT_WEIGHTS), **arrays)
+            with open(os.path.join(d, COMPACT_META), "w", encoding="utf-8") as f:
+                json.dump(cmeta, f, ensure_ascii=False)
+            variants.append((f"trimmed {dtype}", d, compact_files, load))
+
+        for name, where, files, loader in variants:
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine  = loader(where)
+                load_ms = _median_time(lambda: loader(where), repeat) * 1000
+            resident = sum(getattr(engine, a).nbytes for a in
+                           ("embedding", "kernel", "recurrent", "bias", "dense_kernel", "dense_bias"))
+            rows.append({
+                "variant":    name,
+                "disk_kb":    round(sum(os.path.getsize(os.path.join(where, f)) for f in files) / 1024, 1),
+                "weights_kb": round(resident / 1024, 1),
+                "load_ms":    round(load_ms, 2),
+                "single_ms":  round(_median_time(lambda: engine.predict_proba([texts[0]]), repeat * 5) * 1000, 3),
+                "batch_ms":   round(_median_time(lambda: engine.predict_proba(texts), max(3, repeat // 4)) * 1000, 2),
+                "accuracy":   round(accuracy(engine, samples), 4),
+            })
+    return rows
+
+
+def main(argv):
+    import argparse
+
+    import intent_model
+
+    ap = argparse.ArgumentParser(prog="python quantize.py")
+    ap.add_argument("command", choices=["export", "report"])
+    ap.add_argument("--dtype", choices=["int8", "float32"], default="int8")
+    ap.add_argument("--force", action="store_true", help="export even if accuracy drops")
+    args = ap.parse_args(argv)
+
+    path = intent_model.artifact_path()
+    if not numpy_engine.is_exported(path):
+        print("[SPF] Export the float engine first: python numpy_engine.py export")
+        return 1
+
+    if args.command == "export":
+        try:
+            float_acc, compact_acc = export(path, intent_model.data, args.dtype, args.force)
+        except ValueError as e:
+            print(f"[SPF] Not exported: {e}")
+            return 1
+        print(f"[SPF] accuracy on {len(intent_model.data)} phrases: float {float_acc:.4f}, "
+              f"{args.dtype} {compact_acc:.4f}")
+        return 0
+
+    rows = report(path, intent_model.data)
+    cols = list(rows[0])
+    print("  ".join(f"{c:>14s}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{row[c]!s:>14s}" for c in cols))
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))
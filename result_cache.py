@@ -0,0 +1,105 @@
+"""
+SPF Result Cache — whole-pipeline memoization for repeated commands
+====================================================================
+Most traffic is a handful of commands said over and over.  For a given
+(text, lang) the pipeline (translate → preprocess → intent → entities →
+reply) is deterministic, so /process keeps its finished result here and
+answers a repeat without running any of it.
+
+• Keys are the normalized text (lower case, single spaces, no
+  surrounding punctuation) and the language.
+• Every entry records the version it was computed under, e.g. (model
+  generation, template version).  An entry from another version is a
+  miss and is dropped, so a model swap or template change needs no
+  explicit flush.  Callers read the version before computing and put()
+  with it, so a result that raced a swap is never served as current.
+• At most SPF_RESULT_CACHE_SIZE entries, least recently used evicted.
+• Only clean results belong here: callers must not put() a result built
+  on a failed translation.
+
+Configuration (environment):
+  SPF_RESULT_CACHE_SIZE   max entries, 0 disables the cache   (default 2048)
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+RESULT_CACHE_SIZE = int(os.environ.get("SPF_RESULT_CACHE_SIZE", "2048"))
+
+_EDGE_PUNCT = re.compile(r"^[\s.,!?;:'\"¿¡।]+|[\s.,!?;:'\"¿¡।]+$")
+
+
+def normalize(text):
+    return _EDGE_PUNCT.sub("", " ".join(text.lower().split()))
+
+
+class ResultCache:
+    def __init__(self, max_size=RESULT_CACHE_SIZE, version=None):
+        self.max_size = int(max_size)
+        self.version  = version or (lambda: None)
+
+        self._lru  = OrderedDict()   # (normalized text, lang) → (version, value)
+        self._lock = threading.Lock()
+
+        self.hits      = 0
+        self.misses    = 0
+        self.stale     = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    # ── Public API ─────────────────────────────────────────
+    def get(self, text, lang):
+        """The stored value for (text, lang) under the current version, or None."""
+        if not self.enabled:
+            return None
+        key     = (normalize(text), lang)
+        current = self.version()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and entry[0] != current:
+                del self._lru[key]
+                self.stale += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, text, lang, value, version):
+        """Store value computed under version (read with .version() before computing)."""
+        if not self.enabled or version != self.version():
+            return
+        key = (normalize(text), lang)
+        with self._lock:
+            self._lru[key] = (version, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size":      len(self._lru),
+                "max_size":  self.max_size,
+                "hits":      self.hits,
+                "misses":    self.misses,
+                "stale":     self.stale,
+                "evictions": self.evictions,
+                "hit_rate":  round(self.hits / lookups, 4) if lookups else 0.0,
+            }
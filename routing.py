@@ -0,0 +1,138 @@
+"""
+SPF Native Routing — skip translation when the model already understands
+=========================================================================
+The intent model is trained on romanised Hindi, Telugu and Spanish, so
+for those languages the raw text is classified first.  Translation is
+only needed when that fails:
+
+  unsupported_lang    lang not in NATIVE_LANGS
+  unsupported_script  letters outside the Latin script (e.g. Devanagari)
+  unknown_words       too few words the model's vocabulary knows
+  low_confidence      model probability below NATIVE_THRESHOLD
+  free_text_entity    the intent's entity is free text (FREE_TEXT_INTENTS)
+  extra_words         words outside the intent's training phrases
+
+A keyword fast-path hit (keyword_intent.py) counts as confident.
+
+The entity extractor and the dashboard mapping only turn English words
+into labels ("conductor" is not "Driver", "aeropuerto de madrid" is not
+"Madrid Airport").  So a confident intent stays native only when its
+entities need nothing from the words: a destination or contact always
+needs translating, and so does any word the intent's own training
+phrases never use (a track name, a window position), digits aside.
+
+Configuration (environment):
+  SPF_NATIVE_LANGS       comma-separated codes       (default hi,te,es)
+  SPF_NATIVE_THRESHOLD   min model probability       (default 0.9)
+  SPF_NATIVE_MIN_KNOWN   min share of known words    (default 0.5)
+"""
+
+import os
+import threading
+import unicodedata
+
+import intent_model
+
+NATIVE_LANGS     = set(os.environ.get("SPF_NATIVE_LANGS", "hi,te,es").split(","))
+NATIVE_THRESHOLD = float(os.environ.get("SPF_NATIVE_THRESHOLD", "0.9"))
+MIN_KNOWN_WORDS  = float(os.environ.get("SPF_NATIVE_MIN_KNOWN", "0.5"))
+
+# Intents whose entity is free text the dashboard needs in English
+FREE_TEXT_INTENTS = {"NAVIGATION", "CALL"}
+
+
+def is_latin(text):
+    """True if every letter in text is Latin (accents included)."""
+    return all(not ch.isalpha() or unicodedata.name(ch, "").startswith("LATIN")
+               for ch in text)
+
+
+def command_words(samples):
+    """intent → every word its training phrases use."""
+    words = {}
+    for phrase, intent in samples:
+        words.setdefault(intent, set()).update(phrase.lower().split())
+    return words
+
+
+class NativeRouter:
+    def __init__(self, keywords=None, samples=(), threshold=NATIVE_THRESHOLD,
+                 langs=NATIVE_LANGS, min_known=MIN_KNOWN_WORDS):
+        self.keywords  = keywords
+        self.words     = command_words(samples)
+        self.threshold = threshold
+        self.langs     = set(langs)
+        self.min_known = min_known
+
+        self._lock  = threading.Lock()
+        self._stats = {}
+
+    def _precheck(self, clean, lang):
+        """Cheap checks before the model. Returns a reason to translate, or None."""
+        if lang not in self.langs:
+            return "unsupported_lang"
+        if not is_latin(clean):
+            return "unsupported_script"
+        words = clean.split()
+        vocab = intent_model.vocabulary()
+        if not words or sum(w in vocab for w in words) < self.min_known * len(words):
+            return "unknown_words"
+        return None
+
+    def _postcheck(self, clean, intent):
+        """Whether the entities of intent can be read from untranslated text. Returns a reason, or None."""
+        if intent in FREE_TEXT_INTENTS:
+            return "free_text_entity"
+        known = self.words.get(intent, set())
+        if any(w not in known and not w.isdigit() for w in clean.split()):
+            return "extra_words"
+        return None
+
+    def classify_batch(self, cleans, langs):
+        """
+        For each (clean text, lang) return (intent or None, reason, confidence).
+        intent is set when the native route can be taken; reason is
+        "keyword" / "model" then, otherwise why translation is needed.
+        """
+        results = [None] * len(cleans)
+        pending = []
+        for i, (clean, lang) in enumerate(zip(cleans, langs)):
+            reason = self._precheck(clean, lang)
+            if reason:
+                results[i] = (None, reason, 0.0)
+                continue
+            intent = self.keywords.match(clean)[0] if self.keywords else None
+            if intent:
+                results[i] = (intent, "keyword", 1.0)
+            else:
+                pending.append(i)
+
+        if pending:
+            scored = intent_model.predict_intents_with_confidence([cleans[i] for i in pending])
+            for i, (intent, conf) in zip(pending, scored):
+                results[i] = (intent, "model", conf) if conf >= self.threshold \
+                             else (None, "low_confidence", conf)
+
+        for i, (intent, reason, conf) in enumerate(results):
+            if intent:
+                blocked = self._postcheck(cleans[i], intent)
+                if blocked:
+                    results[i] = (None, blocked, conf)
+
+        with self._lock:
+            for _, reason, _ in results:
+                self._stats[reason] = self._stats.get(reason, 0) + 1
+        return results
+
+    def classify(self, clean, lang):
+        return self.classify_batch([clean], [lang])[0]
+
+    def stats(self):
+        with self._lock:
+            native = self._stats.get("keyword", 0) + self._stats.get("model", 0)
+            total  = sum(self._stats.values())
+            return {
+                **self._stats,
+                "native_rate": round(native / total, 4) if total else 0.0,
+                "threshold":   self.threshold,
+            }
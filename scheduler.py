@@ -0,0 +1,171 @@
+"""
+SPF Inference Scheduler — micro-batching in front of the intent model
+======================================================================
+Concurrent /process requests are queued instead of rejected.  A single
+worker thread drains the queue: everything that arrives within a short
+window (or until the batch is full) is classified in one
+predict_intents() call and each caller gets its own result back.
+
+Tuning (environment):
+  SPF_BATCH_WINDOW_MS   how long to wait for more requests   (default 5)
+  SPF_MAX_BATCH_SIZE    max texts per model call             (default 64)
+  SPF_MAX_QUEUE_DEPTH   pending requests before rejecting    (default 1024)
+  SPF_PREDICT_TIMEOUT   predict() wait without a deadline, s (default 30)
+
+predict() waits no longer than the request deadline allows (deadline.py),
+but at least PREDICT_MIN_WAIT_MS so a nearly spent budget can still get
+its (fast) answer.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from deadline import current as current_deadline
+
+BATCH_WINDOW_MS = float(os.environ.get("SPF_BATCH_WINDOW_MS", "5"))
+MAX_BATCH_SIZE  = int(os.environ.get("SPF_MAX_BATCH_SIZE", "64"))
+MAX_QUEUE_DEPTH = int(os.environ.get("SPF_MAX_QUEUE_DEPTH", "1024"))
+PREDICT_TIMEOUT = float(os.environ.get("SPF_PREDICT_TIMEOUT", "30"))
+
+PREDICT_MIN_WAIT_MS = 50
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the scheduler is at MAX_QUEUE_DEPTH."""
+
+
+class PredictTimeout(QueueFull):
+    """Raised by predict() when the answer does not come in time; a busy server, like QueueFull."""
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, window_ms=BATCH_WINDOW_MS,
+                 max_batch=MAX_BATCH_SIZE, max_queue=MAX_QUEUE_DEPTH):
+        self.predict_fn = predict_fn
+        self.window     = window_ms / 1000.0
+        self.max_batch  = max(1, int(max_batch))
+        self.max_queue  = max(1, int(max_queue))
+
+        self._queue  = deque()
+        self._cond   = threading.Condition()
+        self._thread = None
+
+        self._batches   = 0
+        self._requests  = 0
+        self._rejected  = 0
+        self._errors    = 0
+        self._timeouts  = 0
+        self._last_size = 0
+        self._max_depth = 0
+        self._size_hist = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    # ── Public API ─────────────────────────────────────────
+    def submit(self, text):
+        """Queue one text for classification. Returns a Future[str]."""
+        fut = Future()
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._rejected += 1
+                raise QueueFull(f"{len(self._queue)} requests pending")
+            self._ensure_worker()
+            self._queue.append((text, fut))
+            self._max_depth = max(self._max_depth, len(self._queue))
+            self._cond.notify()
+        return fut
+
+    def predict(self, text, timeout=None):
+        """Blocking helper: submit and wait for the intent, bounded by the request deadline."""
+        if timeout is None:
+            budget  = current_deadline()
+            timeout = PREDICT_TIMEOUT if budget is None else \
+                max(budget.remaining(), PREDICT_MIN_WAIT_MS / 1000.0)
+        fut = self.submit(text)
+        try:
+            return fut.result(timeout)
+        except FutureTimeout:
+            fut.cancel()                      # dropped from its batch if not started yet
+            with self._cond:
+                self._timeouts += 1
+            raise PredictTimeout(f"no intent within {timeout * 1000:.0f} ms") from None
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth":     len(self._queue),
+                "max_queue_depth": self._max_depth,
+                "batches":         self._batches,
+                "requests":        self._requests,
+                "rejected":        self._rejected,
+                "errors":          self._errors,
+                "timeouts":        self._timeouts,
+                "last_batch_size": self._last_size,
+                "avg_batch_size":  round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "batch_size_hist": {
+                    **{f"le_{b}": n for b, n in zip(BATCH_SIZE_BUCKETS, self._size_hist)},
+                    "gt_" + str(BATCH_SIZE_BUCKETS[-1]): self._size_hist[-1],
+                },
+                "window_ms":       self.window * 1000.0,
+                "max_batch_size":  self.max_batch,
+            }
+
+    # ── Worker ─────────────────────────────────────────────
+    def _ensure_worker(self):
+        # Called with self._cond held.  The thread starts on first use so
+        # importing this module never spawns anything.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="spf-batcher", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            n = min(len(self._queue), self.max_batch)
+            batch = [self._queue.popleft() for _ in range(n)]
+        # Callers that gave up (predict() timed out) are left out
+        return [(text, fut) for text, fut in batch if fut.set_running_or_notify_cancel()]
+
+    def _record(self, size, failed):
+        with self._cond:
+            self._batches   += 1
+            self._requests  += size
+            self._last_size  = size
+            self._errors    += size if failed else 0
+            for i, bound in enumerate(BATCH_SIZE_BUCKETS):
+                if size <= bound:
+                    self._size_hist[i] += 1
+                    break
+            else:
+                self._size_hist[-1] += 1
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            try:
+                intents = list(self.predict_fn(texts))
+                if len(intents) != len(texts):
+                    raise ValueError(f"{len(intents)} intents for {len(texts)} texts")
+            except Exception as e:
+                print(f"[SPF] Batch of {len(batch)} failed: {e}")
+                self._record(len(batch), failed=True)
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            self._record(len(batch), failed=False)
+            for (_, fut), intent in zip(batch, intents):
+                fut.set_result(intent)
@@ -0,0 +1,378 @@
+"""
+SPF — Smart Car AI  |  pre-fork production server
+==================================================
+One process is limited to one core by the GIL.  serve.py prepares
+everything read-only once in a parent process and forks N workers that
+share those pages copy-on-write:
+
+  • the NumPy intent engine (TensorFlow never loads in the parent, it
+    does not survive fork(); the engine is exported first if needed)
+  • the translation cache, preloaded from SQLite when configured, and
+    optionally the compiled response templates
+  • the keyword automaton and entity matcher built at import
+
+gc.freeze() moves all of it out of the collector's reach, so garbage
+collection in a worker does not write to (and un-share) those pages.
+
+Workers accept on one shared listening socket, so consecutive requests
+of one vehicle can land on different workers.  Sessions (last intent,
+entities, context) therefore live in one SQLite file all workers share
+(session.SqliteSessionStore): SPF_SESSION_DB, or a temporary file that
+is removed on shutdown.  Everything else stays per worker: the result
+cache and the in-memory translation cache each warm up separately (the
+SQLite translation cache is shared when configured), and background
+threads (micro-batcher, translation batcher, TTS) start lazily, so each
+worker starts its own.
+
+Signals to the parent:
+  SIGHUP           reload the model, then replace workers one by one;
+                   each old worker stops accepting and finishes its
+                   in-flight requests (up to SPF_GRACEFUL_TIMEOUT s)
+
+The model registry is read-only here (POST /admin/phrases and
+/admin/model/rollback answer 409): fine-tune with api.py on the same
+models/ directory, then SIGHUP.  The reload re-reads the registry
+manifest and rebuilds the keyword triggers for the active version.
+  SIGTERM/SIGINT   graceful shutdown
+
+A worker that dies is replaced.  Per-worker counters live in a shared
+memory block; GET /workers (answered by any worker) reports them all.
+
+Run:   python serve.py [--workers N] [--host 0.0.0.0] [--port 5000] [--warm-templates]
+"""
+
+import argparse
+import gc
+import mmap
+import os
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+WORKERS          = int(os.environ.get("SPF_WORKERS", str(os.cpu_count() or 1)))
+GRACEFUL_TIMEOUT = float(os.environ.get("SPF_GRACEFUL_TIMEOUT", "30"))
+SESSION_DB       = os.environ.get("SPF_SESSION_DB")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ══════════════════════════════════════════════════════════
+#  Per-worker stats in shared memory
+# ══════════════════════════════════════════════════════════
+
+class WorkerStats:
+    """
+    Fixed slots of int64 counters in an anonymous shared mapping created
+    before fork(), so the parent and every worker see the same memory.
+    Each worker writes only its own slot.
+    """
+
+    FIELDS = ("pid", "started_ms", "requests", "busy", "errors", "latency_us", "generation")
+
+    def __init__(self, slots):
+        self.slots = slots
+        self._fmt  = struct.Struct(f"{len(self.FIELDS)}q")
+        self._mem  = mmap.mmap(-1, self._fmt.size * slots)
+        self._lock = threading.Lock()   # per process; guards this worker's slot
+
+    def _read(self, slot):
+        return dict(zip(self.FIELDS, self._fmt.unpack_from(self._mem, slot * self._fmt.size)))
+
+    def _write(self, slot, values):
+        self._fmt.pack_into(self._mem, slot * self._fmt.size, *(values[f] for f in self.FIELDS))
+
+    def claim(self, slot, pid, generation):
+        self._lock = threading.Lock()
+        self._write(slot, dict.fromkeys(self.FIELDS, 0) | {
+            "pid": pid, "started_ms": int(time.time() * 1000), "generation": generation})
+
+    def release(self, slot):
+        self._write(slot, dict.fromkeys(self.FIELDS, 0))
+
+    def record(self, slot, status, seconds):
+        with self._lock:
+            values = self._read(slot)
+            values["requests"]   += 1
+            values["busy"]       += status == 409
+            values["errors"]     += status >= 500
+            values["latency_us"] += int(seconds * 1e6)
+            self._write(slot, values)
+
+    def free_slot(self):
+        for slot in range(self.slots):
+            if self._read(slot)["pid"] == 0:
+                return slot
+        return None
+
+    @staticmethod
+    def _memory_kb(pid):
+        """Shared / private resident memory of pid (Linux), or {} if unavailable."""
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            return {}
+        kb = lambda name: int(fields.get(name, "0 kB").split()[0])  # noqa: E731
+        return {"shared_kb":  kb("Shared_Clean") + kb("Shared_Dirty"),
+                "private_kb": kb("Private_Clean") + kb("Private_Dirty")}
+
+    def snapshot(self):
+        out = []
+        for slot in range(self.slots):
+            v = self._read(slot)
+            if v["pid"]:
+                out.append({
+                    "slot":           slot,
+                    "pid":            v["pid"],
+                    "generation":     v["generation"],
+                    "uptime_s":       round(time.time() - v["started_ms"] / 1000, 1),
+                    "requests":       v["requests"],
+                    "busy":           v["busy"],
+                    "errors":         v["errors"],
+                    "avg_latency_ms": round(v["latency_us"] / v["requests"] / 1000, 3) if v["requests"] else 0.0,
+                    **self._memory_kb(v["pid"]),
+                })
+        return out
+
+
+# ══════════════════════════════════════════════════════════
+#  Parent: prepare shared state
+# ══════════════════════════════════════════════════════════
+
+def load_model():
+    """Load the NumPy engine, exporting it in a subprocess (TensorFlow stays out of this one)."""
+    import intent_model
+    import numpy_engine
+
+    if not numpy_engine.is_exported(intent_model.serving_path()):
+        print("[SPF] Exporting the NumPy engine for pre-fork serving ...")
+        subprocess.run([sys.executable, os.path.join(BASE_DIR, "numpy_engine.py"), "export"], check=True)
+    kind = "compact" if intent_model.INTENT_BACKEND == "compact" else "numpy"
+    intent_model.set_backend(intent_model.load_backend(kind))
+    intent_model.warm_up()
+
+
+def prepare(warm_templates=False):
+    import api
+    import language
+    from entity import extract_entities
+    from preprocess import preprocess
+
+    api._registry.read_only = True   # inherited by every worker
+    load_model()
+    extract_entities(preprocess("warm up"))
+    rows = language._cache.preload()
+    if warm_templates:
+        language.warm_templates()
+    api._ready.set()
+    print(f"[SPF] Parent ready: model loaded, {rows} cached translations preloaded")
+
+    gc.collect()
+    gc.freeze()
+
+
+# ══════════════════════════════════════════════════════════
+#  Worker
+# ══════════════════════════════════════════════════════════
+
+def _install_hooks(app, stats, slot_ref):
+    from flask import g, jsonify, request
+
+    @app.before_request
+    def _start_timer():
+        g.spf_t0 = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        if request.path != "/workers":
+            stats.record(slot_ref[0], response.status_code, time.perf_counter() - g.spf_t0)
+        return response
+
+    @app.route("/workers", methods=["GET"])
+    def workers():
+        return jsonify({"worker": os.getpid(), "workers": stats.snapshot()}), 200
+
+
+def _drain(api, deadline):
+    while time.monotonic() < deadline:
+        with api._lock:
+            if api._state["inflight"] == 0:
+                return True
+        time.sleep(0.05)
+    return False
+
+
+def run_worker(sock, stats, slot, generation, slot_ref, session_db):
+    """Worker main loop; never returns."""
+    import api
+    import language
+    from session import SqliteSessionStore
+    from werkzeug.serving import make_server
+
+    slot_ref[0] = slot
+    stats.claim(slot, os.getpid(), generation)
+    language._cache.reopen()
+    api._sessions = SqliteSessionStore(session_db)
+
+    server = make_server(sock.getsockname()[0], sock.getsockname()[1], api.app,
+                         threaded=True, fd=sock.fileno())
+
+    def on_term(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, on_term)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)     # the parent decides
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    code = 0
+    try:
+        server.serve_forever()
+        if not _drain(api, time.monotonic() + GRACEFUL_TIMEOUT):
+            print(f"[SPF] Worker {os.getpid()} stopped with requests still in flight")
+    except Exception as e:
+        print(f"[SPF] Worker {os.getpid()} crashed: {e}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        os._exit(code)
+
+
+# ══════════════════════════════════════════════════════════
+#  Parent: supervise workers
+# ══════════════════════════════════════════════════════════
+
+class Supervisor:
+    def __init__(self, workers, host, port, warm_templates=False):
+        self.n              = max(1, int(workers))
+        self.warm_templates = warm_templates
+        self.stats          = WorkerStats(self.n * 2)   # room for replacements during restart
+        self.slot_ref       = [0]                       # this process's slot (set in the child)
+        self.sock           = socket.create_server((host, port), backlog=1024)
+        self.sock.set_inheritable(True)
+        self.workers        = {}                        # pid → (slot, generation)
+        self.generation     = 0
+        self._reload        = False
+        self._stop          = False
+
+        # Sessions shared by all workers; a temporary file lives as long as the parent
+        self.session_db     = SESSION_DB or os.path.join(tempfile.gettempdir(), f"spf-sessions-{os.getpid()}.db")
+        self._own_db        = SESSION_DB is None
+
+        import api
+        from session import SqliteSessionStore
+        _install_hooks(api.app, self.stats, self.slot_ref)
+        SqliteSessionStore(self.session_db)             # creates the table before any worker
+
+    def spawn(self):
+        slot = self.stats.free_slot()
+        pid  = os.fork()
+        if pid == 0:
+            run_worker(self.sock, self.stats, slot, self.generation, self.slot_ref, self.session_db)
+        self.stats.claim(slot, pid, self.generation)   # visible before the child gets to it
+        self.workers[pid] = (slot, self.generation)
+        return pid
+
+    def _reap(self, block=False):
+        """Collect exited workers. Returns their pids."""
+        gone = []
+        while self.workers:
+            try:
+                pid, _ = os.waitpid(-1, 0 if block and not gone else os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            slot, _ = self.workers.pop(pid, (None, None))
+            if slot is not None:
+                self.stats.release(slot)
+            gone.append(pid)
+        return gone
+
+    def _stop_worker(self, pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while pid in self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        if pid in self.workers:
+            os.kill(pid, signal.SIGKILL)
+            self._reap(block=True)
+
+    def rolling_restart(self):
+        """Reload the model, then start a new worker before stopping each old one."""
+        import api
+
+        try:
+            gc.unfreeze()
+            load_model()
+            api._registry.refresh()     # keyword triggers follow the active version
+            gc.collect()
+            gc.freeze()
+        except Exception as e:
+            print(f"[SPF] Reload failed, keeping current workers: {e}")
+            return
+        self.generation += 1
+        old = [pid for pid, (_, gen) in self.workers.items() if gen < self.generation]
+        for pid in old:
+            self.spawn()
+            self._stop_worker(pid)
+        print(f"[SPF] Rolling restart done — generation {self.generation}, {len(self.workers)} workers")
+
+    def run(self):
+        host, port = self.sock.getsockname()[:2]
+        print("=" * 60)
+        print(f"  SPF Smart Car AI v2  →  http://{host}:{port}  ({self.n} workers)")
+        print("=" * 60)
+        for _ in range(self.n):
+            self.spawn()
+
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stop", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stop", True))
+
+        while not self._stop:
+            if self._reload:
+                self._reload = False
+                self.rolling_restart()
+            for pid in self._reap():
+                if not self._stop:
+                    print(f"[SPF] Worker {pid} exited — starting a replacement")
+                    self.spawn()
+            time.sleep(0.2)
+
+        print("[SPF] Shutting down workers ...")
+        for pid in list(self.workers):
+            self._stop_worker(pid)
+        self.sock.close()
+        if self._own_db:
+            for suffix in ("", "-wal", "-shm", ".lock"):
+                try:
+                    os.remove(self.session_db + suffix)
+                except OSError:
+                    pass
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pre-fork SPF server")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=5000)
+    ap.add_argument("--warm-templates", action="store_true",
+                    help="compile response templates for every language before forking")
+    args = ap.parse_args(argv)
+
+    prepare(args.warm_templates)
+    Supervisor(args.workers, args.host, args.port, args.warm_templates).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
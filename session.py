@@ -0,0 +1,309 @@
+"""
+SPF Session Store — per-vehicle state with striped locks
+=========================================================
+Each client (vehicle) has its own state: last intent, entities, text,
+language and conversation context.  The session id comes from the
+X-Session-Id header or the "session_id" body field; requests without
+one share the "default" session, as before.
+
+• Sessions are guarded by a fixed set of striped locks, so requests for
+  different vehicles rarely wait on each other.
+• At most SPF_MAX_SESSIONS are kept in memory (least recently used are
+  evicted first); sessions idle longer than SPF_SESSION_TTL expire.
+• An optional backend receives evicted sessions and is asked for
+  sessions not in memory.  MemoryBackend is an in-process stand-in for
+  an external store (anything with get / put / delete).  Each session
+  is stored with its last-use time, so a copy older than the TTL is
+  deleted instead of revived; a session that expires in memory is
+  deleted from the backend too.
+• SqliteSessionStore has the same interface over one SQLite file, for
+  processes that must see the same sessions (serve.py workers).
+
+Configuration (environment):
+  SPF_MAX_SESSIONS      sessions kept in memory      (default 10000)
+  SPF_SESSION_TTL       idle seconds before expiry   (default 3600)
+  SPF_SESSION_STRIPES   number of lock stripes       (default 64)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:      # Windows: no serve.py workers, so one process only
+    fcntl = None
+
+MAX_SESSIONS    = int(os.environ.get("SPF_MAX_SESSIONS", "10000"))
+SESSION_TTL     = float(os.environ.get("SPF_SESSION_TTL", "3600"))
+SESSION_STRIPES = int(os.environ.get("SPF_SESSION_STRIPES", "64"))
+
+SESSION_HEADER  = "X-Session-Id"
+DEFAULT_SESSION = "default"
+
+
+def new_state():
+    return {
+        "intent":     "",
+        "entities":   {},
+        "raw_voice":  "",
+        "clean_text": "",
+        "lang":       "en",
+        "context":    {},
+    }
+
+
+class MemoryBackend:
+    """In-process stand-in for an external session store."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            return self._data.get(sid)
+
+    def put(self, sid, state):
+        with self._lock:
+            self._data[sid] = state
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SessionStore:
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL,
+                 stripes=SESSION_STRIPES, backend=None):
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl          = ttl
+        self.backend      = backend
+
+        self._stripes  = [threading.Lock() for _ in range(max(1, int(stripes)))]
+        self._sessions = OrderedDict()     # sid → (state, last_used); LRU first
+        self._index    = threading.Lock()  # guards _sessions, held only briefly
+
+        self._stats = dict.fromkeys(("created", "loaded", "evicted", "expired"), 0)
+
+    # ── Public API ─────────────────────────────────────────
+    def lock_for(self, sid):
+        return self._stripes[hash(sid) % len(self._stripes)]
+
+    @contextmanager
+    def session(self, sid=None):
+        """Hold the session's stripe lock and yield its mutable state dict."""
+        sid = sid or DEFAULT_SESSION
+        with self.lock_for(sid):
+            yield self._state(sid)
+
+    def get(self, sid=None):
+        """Snapshot of a session's state."""
+        with self.session(sid) as state:
+            return dict(state)
+
+    def update(self, sid=None, **fields):
+        with self.session(sid) as state:
+            state.update(fields)
+
+    def drop(self, sid):
+        with self.lock_for(sid), self._index:
+            self._sessions.pop(sid, None)
+        if self.backend is not None:
+            self.backend.delete(sid)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._index:
+            return {**self._stats, "active": len(self._sessions),
+                    "max_sessions": self.max_sessions, "stripes": len(self._stripes)}
+
+    # ── Internals ──────────────────────────────────────────
+    def _state(self, sid):
+        # Called with the session's stripe lock held
+        now = time.monotonic()
+        with self._index:
+            entry = self._sessions.get(sid)
+            stale = entry is not None and now - entry[1] > self.ttl
+            if stale:
+                del self._sessions[sid]
+                self._stats["expired"] += 1
+            elif entry is not None:
+                self._sessions[sid] = (entry[0], now)
+                self._sessions.move_to_end(sid)
+                return entry[0]
+
+        if stale and self.backend is not None:
+            self.backend.delete(sid)   # may still hold the copy it was loaded from
+        state = self._load(sid)
+        with self._index:
+            self._stats["created" if state is None else "loaded"] += 1
+            state = state if state is not None else new_state()
+            self._sessions[sid] = (state, now)
+            evicted, expired = self._evict(now)
+
+        if self.backend is not None:
+            wall = time.time() - now
+            for old_sid, old_state, last_used in evicted:
+                self.backend.put(old_sid, {"state": old_state, "last_used": wall + last_used})
+            for old_sid in expired:
+                self.backend.delete(old_sid)
+        return state
+
+    def _load(self, sid):
+        """The backend's copy of sid, or None (deleting it there if it has expired)."""
+        if self.backend is None:
+            return None
+        record = self.backend.get(sid)
+        if record is None:
+            return None
+        if time.time() - record["last_used"] > self.ttl:
+            self.backend.delete(sid)
+            with self._index:
+                self._stats["expired"] += 1
+            return None
+        return record["state"]
+
+    def _evict(self, now):
+        # Called with self._index held; returns the evicted (sid, state, last_used)s
+        # and the ids that expired, for the backend
+        evicted, expired = [], []
+        while self._sessions:
+            sid, (state, last_used) = next(iter(self._sessions.items()))
+            if now - last_used > self.ttl:
+                self._stats["expired"] += 1
+                expired.append(sid)
+            elif len(self._sessions) > self.max_sessions:
+                self._stats["evicted"] += 1
+                evicted.append((sid, state, last_used))
+            else:
+                break
+            del self._sessions[sid]
+        return evicted, expired
+
+
+class SqliteSessionStore:
+    """
+    Sessions in one SQLite file shared by several processes, so a
+    /process in one worker and the /execute after it in another see the
+    same state.  session() holds the session's stripe — a thread lock
+    plus a byte-range lock on <path>.lock, the same stripe in every
+    process — so two requests for a session never interleave, while
+    other sessions go ahead.  The state is read without a transaction;
+    the write lock on the database is taken only to write it back.
+    """
+
+    def __init__(self, path, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL, stripes=SESSION_STRIPES):
+        self.path         = path
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl          = ttl
+
+        self._stripes  = [threading.Lock() for _ in range(max(1, int(stripes)))]
+        self._local    = threading.local()   # one connection per thread (and process)
+        self._lock     = threading.Lock()
+        self._lockfile = None                # one per process: closing any fd drops its fcntl locks
+        self._lock_pid = None
+        self._stats = dict.fromkeys(("created", "loaded", "evicted", "expired"), 0)
+        self._db().execute("CREATE TABLE IF NOT EXISTS sessions "
+                           "(sid TEXT PRIMARY KEY, state TEXT NOT NULL, last_used REAL NOT NULL)")
+
+    # ── Public API ─────────────────────────────────────────
+    @contextmanager
+    def session(self, sid=None):
+        """Lock the session (in every process) and yield its mutable state dict."""
+        sid = sid or DEFAULT_SESSION
+        db  = self._db()
+        with self._stripe(sid):
+            now = time.time()
+            row = db.execute("SELECT state, last_used FROM sessions WHERE sid = ?", (sid,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._count("expired")
+                row = None
+            state = json.loads(row[0]) if row is not None else new_state()
+            self._count("loaded" if row is not None else "created")
+            yield state
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                           (sid, json.dumps(state, default=str), now))
+                if row is None:
+                    self._evict(db, now)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def get(self, sid=None):
+        """Snapshot of a session's state."""
+        with self.session(sid) as state:
+            return dict(state)
+
+    def update(self, sid=None, **fields):
+        with self.session(sid) as state:
+            state.update(fields)
+
+    def drop(self, sid):
+        with self._stripe(sid):
+            self._db().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def __len__(self):
+        return self._db().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "active": len(self), "max_sessions": self.max_sessions,
+                    "shared": self.path}
+
+    # ── Internals ──────────────────────────────────────────
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def _stripe_file(self):
+        with self._lock:
+            if fcntl is not None and self._lock_pid != os.getpid():
+                self._lockfile = open(self.path + ".lock", "a+b")
+                self._lock_pid = os.getpid()
+            return self._lockfile
+
+    @contextmanager
+    def _stripe(self, sid):
+        # crc32, not hash(): every process must pick the same stripe
+        n = zlib.crc32(sid.encode("utf-8")) % len(self._stripes)
+        with self._stripes[n]:
+            lockfile = self._stripe_file()
+            if lockfile is None:
+                yield
+                return
+            fcntl.lockf(lockfile, fcntl.LOCK_EX, 1, n)
+            try:
+                yield
+            finally:
+                fcntl.lockf(lockfile, fcntl.LOCK_UN, 1, n)
+
+    def _evict(self, db, now):
+        # Called inside the write transaction, after a session was created
+        expired = db.execute("DELETE FROM sessions WHERE last_used < ?", (now - self.ttl,)).rowcount
+        over    = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_sessions
+        if over > 0:
+            db.execute("DELETE FROM sessions WHERE sid IN "
+                       "(SELECT sid FROM sessions ORDER BY last_used LIMIT ?)", (over,))
+        with self._lock:
+            self._stats["expired"] += max(0, expired)
+            self._stats["evicted"] += max(0, over)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
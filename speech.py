@@ -1,15 +1,269 @@
-import speech_recognition as sr
-import pyttsx3
+import os
+import queue
+import threading
+import time
+from collections import deque, namedtuple
 
-engine = pyttsx3.init()
+# speech_recognition, pyaudio and pyttsx3 are imported on first use, so
+# importing this module (e.g. via action → api) does not touch audio devices.
 
-def speak(text):
-    print("Car:", text)
-    engine.say(text)
-    engine.runAndWait()
+# ═══════════════════════════════════════════════════════════
+#  Text-to-speech worker
+#  pyttsx3 is not thread-safe and runAndWait() blocks for the whole
+#  sentence, so one worker thread owns the engine and speaks from a
+#  bounded queue.  speak() returns an Utterance handle at once.
+#
+#  • preempt=True cancels everything queued and stops the sentence
+#    being spoken, so a newer reply is not stuck behind stale ones.
+#  • Utterances that waited longer than SPF_TTS_MAX_AGE_MS are stale
+#    and skipped.
+#  • speak() of a text that is already queued returns the queued handle.
+#  • When the queue is full the oldest queued utterance is dropped.
+#
+#  Configuration (environment):
+#    SPF_TTS_BACKEND      pyttsx3 | null               (default pyttsx3)
+#    SPF_TTS_QUEUE_SIZE   max queued utterances        (default 16)
+#    SPF_TTS_MAX_AGE_MS   skip older utterances, 0=off (default 10000)
+# ═══════════════════════════════════════════════════════════
+
+TTS_BACKEND    = os.environ.get("SPF_TTS_BACKEND", "pyttsx3")
+TTS_QUEUE_SIZE = int(os.environ.get("SPF_TTS_QUEUE_SIZE", "16"))
+TTS_MAX_AGE_MS = float(os.environ.get("SPF_TTS_MAX_AGE_MS", "10000"))
+
+_engine      = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                import pyttsx3
+                _engine = pyttsx3.init()
+    return _engine
+
+
+class Pyttsx3Backend:
+    """Speaks through pyttsx3; must only be used from the TTS worker thread."""
+
+    def __init__(self):
+        self._should_stop = None
+
+    def _on_word(self, name, location, length):
+        if self._should_stop and self._should_stop():
+            get_engine().stop()
+
+    def speak(self, text, should_stop):
+        engine = get_engine()
+        if self._should_stop is None:
+            engine.connect("started-word", self._on_word)
+        self._should_stop = should_stop
+        engine.say(text)
+        engine.runAndWait()
+
+
+class NullBackend:
+    """Headless backend: records what would be said, optionally taking time."""
+
+    def __init__(self, seconds_per_char=0.0):
+        self.seconds_per_char = seconds_per_char
+        self.spoken = []
+
+    def speak(self, text, should_stop):
+        end = time.monotonic() + self.seconds_per_char * len(text)
+        while time.monotonic() < end:
+            if should_stop():
+                return
+            time.sleep(min(0.005, end - time.monotonic()))
+        self.spoken.append(text)
+
+
+class Utterance:
+    """Handle returned by speak(); state is queued → speaking → done (or skipped)."""
+
+    # Final states
+    DONE, CANCELLED, DROPPED, STALE, FAILED = "done", "cancelled", "dropped", "stale", "failed"
+
+    def __init__(self, text, lock=None):
+        self.text        = text
+        self.state       = "queued"
+        self._lock       = lock or threading.RLock()   # the TTS worker's, shared with its decisions
+        self.enqueued_at = time.monotonic()
+        self.started_at  = None
+        self.finished_at = None
+        self._done       = threading.Event()
+
+    def cancel(self):
+        """Skip this utterance, or stop it if it is being spoken."""
+        with self._lock:
+            if self.state in ("queued", "speaking"):
+                self.state = self.CANCELLED
+                if self.started_at is None:
+                    self._finish(self.CANCELLED)
+
+    def wait(self, timeout=None):
+        """Block until spoken or skipped. Returns True if it finished."""
+        return self._done.wait(timeout)
+
+    def done(self):
+        return self._done.is_set()
+
+    def _finish(self, state):
+        self.state       = state
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+
+class TTSWorker:
+    def __init__(self, backend=None, max_queue=TTS_QUEUE_SIZE, max_age_ms=TTS_MAX_AGE_MS):
+        self.backend   = backend
+        self.max_queue = max(1, int(max_queue))
+        self.max_age   = max_age_ms / 1000.0
+
+        self._queue   = deque()
+        self._cond    = threading.Condition()
+        self._thread  = None
+        self._current = None
+
+        self._counts = dict.fromkeys(
+            ("queued", "spoken", "merged", "preempted", "dropped", "stale", "failed"), 0)
+        self._wait_total = 0.0
+        self._wait_max   = 0.0
+        self._speak_total = 0.0
+
+    # ── Public API ─────────────────────────────────────────
+    def speak(self, text, preempt=False):
+        """Queue text to be spoken. Returns an Utterance immediately."""
+        with self._cond:
+            same = self._pending(text)
+            if preempt:
+                # Everything else goes; the same reply already on its way stays
+                self._preempt(keep=same)
+            if same is not None:
+                self._counts["merged"] += 1
+                return same
+
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()._finish(Utterance.DROPPED)
+                self._counts["dropped"] += 1
+
+            utt = Utterance(text, self._cond)
+            self._queue.append(utt)
+            self._counts["queued"] += 1
+            self._ensure_worker()
+            self._cond.notify_all()
+        return utt
+
+    def stats(self):
+        with self._cond:
+            spoken = self._counts["spoken"]
+            return {
+                **self._counts,
+                "queue_depth":      len(self._queue),
+                "speaking":         self._current is not None,
+                "avg_queue_wait_ms": round(self._wait_total / spoken * 1000, 2) if spoken else 0.0,
+                "max_queue_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_speak_ms":     round(self._speak_total / spoken * 1000, 2) if spoken else 0.0,
+            }
+
+    def idle(self, timeout=None):
+        """Wait until nothing is queued or being spoken. Returns True if idle."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._current is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    # ── Worker ─────────────────────────────────────────────
+    def _pending(self, text):
+        # Called with self._cond held: the utterance of text being spoken or queued, if any
+        if self._current is not None and self._current.text == text and self._current.state == "speaking":
+            return self._current
+        for queued in self._queue:
+            if queued.text == text and queued.state == "queued":
+                return queued
+        return None
+
+    def _preempt(self, keep=None):
+        # Called with self._cond held
+        for utt in list(self._queue):
+            if utt is not keep:
+                self._queue.remove(utt)
+                utt._finish(Utterance.CANCELLED)
+                self._counts["preempted"] += 1
+        if self._current is not None and self._current is not keep and self._current.state == "speaking":
+            self._current.state = Utterance.CANCELLED
+            self._counts["preempted"] += 1
+
+    def _ensure_worker(self):
+        # Called with self._cond held; starts on first speak()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="spf-tts", daemon=True)
+            self._thread.start()
+
+    def _next(self):
+        with self._cond:
+            while True:
+                while not self._queue:
+                    self._cond.wait()
+                utt = self._queue.popleft()
+                if utt.state != "queued":
+                    continue
+                waited = time.monotonic() - utt.enqueued_at
+                if self.max_age and waited > self.max_age:
+                    utt._finish(Utterance.STALE)
+                    self._counts["stale"] += 1
+                    continue
+                utt.state, utt.started_at = "speaking", time.monotonic()
+                self._current = utt
+                return utt, waited
+
+    def _run(self):
+        if self.backend is None:
+            self.backend = NullBackend() if TTS_BACKEND == "null" else Pyttsx3Backend()
+        while True:
+            utt, waited = self._next()
+            print("Car:", utt.text)
+            state = Utterance.DONE
+            try:
+                self.backend.speak(utt.text, lambda: utt.state == Utterance.CANCELLED)
+            except Exception as e:
+                print(f"[SPF] TTS failed: {e}")
+                state = Utterance.FAILED
+            with self._cond:
+                if utt.state == Utterance.CANCELLED:
+                    state = Utterance.CANCELLED
+                elif state == Utterance.DONE:
+                    self._counts["spoken"] += 1
+                    self._wait_total  += waited
+                    self._wait_max     = max(self._wait_max, waited)
+                    self._speak_total += time.monotonic() - utt.started_at
+                else:
+                    self._counts["failed"] += 1
+                utt._finish(state)
+                self._current = None
+                self._cond.notify_all()
+
+
+_tts = TTSWorker()
+
+
+def speak(text, preempt=False):
+    """Speak text on the TTS worker. Returns an Utterance; call .wait() to block."""
+    return _tts.speak(text, preempt=preempt)
+
+
+def tts_stats():
+    return _tts.stats()
 
 
 def get_best_mic():
+    import speech_recognition as sr
+
     mics = sr.Microphone.list_microphone_names()
 
     for i, mic in enumerate(mics):
@@ -24,31 +278,424 @@ def get_best_mic():
     return None
 
 
-def get_voice():
+# ═══════════════════════════════════════════════════════════
+#  Speech capture session
+#  Opening the microphone, building a Recognizer and calibrating for
+#  every command costs device-open latency, and a fixed listen timeout
+#  cuts long commands.  One CaptureSession instead keeps the stream
+#  open for the life of the process:
+#
+#  • ambient noise is calibrated once, from the first
+#    SPF_CAPTURE_CALIBRATE_MS of audio (the energy gate in wakeword.py
+#    then keeps tracking the noise floor)
+#  • an utterance starts after SPF_VAD_START_MS of speech and ends
+#    after SPF_VAD_END_MS of silence, or at SPF_MAX_UTTERANCE_S
+#  • finished utterances go onto a bounded queue; a recognizer thread
+#    turns them into text while capture carries on, so a slow
+#    recognizer does not drop the start of the next command
+#  • with wake_word=True only the utterance after "hey spf" is kept
+#
+#  Sources: MicrophoneSource, or FileSource to replay WAV files / arrays
+#  headless.  Recognizers: anything with recognize(pcm, sample_rate) →
+#  text; GoogleRecognizer (speech_recognition) or ScriptedRecognizer.
+#
+#  Configuration (environment):
+#    SPF_STT_BACKEND            google | null           (default google)
+#    SPF_CAPTURE_CALIBRATE_MS   ambient calibration     (default 500)
+#    SPF_VAD_START_MS           speech that opens one   (default 60)
+#    SPF_VAD_END_MS             silence that ends one   (default 700)
+#    SPF_MAX_UTTERANCE_S        longest utterance       (default 15)
+#    SPF_UTTERANCE_QUEUE        queued utterances       (default 8)
+#    SPF_LISTEN_TIMEOUT_S       get_voice() wait for    (default 5)
+#                               speech to start
+# ═══════════════════════════════════════════════════════════
 
-    r = sr.Recognizer()
+STT_BACKEND          = os.environ.get("SPF_STT_BACKEND", "google")
+CAPTURE_CALIBRATE_MS = int(os.environ.get("SPF_CAPTURE_CALIBRATE_MS", "500"))
+VAD_START_MS         = int(os.environ.get("SPF_VAD_START_MS", "60"))
+VAD_END_MS           = int(os.environ.get("SPF_VAD_END_MS", "700"))
+MAX_UTTERANCE_S      = float(os.environ.get("SPF_MAX_UTTERANCE_S", "15"))
+UTTERANCE_QUEUE      = int(os.environ.get("SPF_UTTERANCE_QUEUE", "8"))
+LISTEN_TIMEOUT_S     = float(os.environ.get("SPF_LISTEN_TIMEOUT_S", "5"))
 
-    mic_index = get_best_mic()
+PREROLL_MS = 200    # audio kept from before the start was detected
 
-    if mic_index is None:
-        print("No mic found")
-        return ""
+# pcm: int16 array; started / ended: stream position in seconds; queued_at: monotonic
+Recording = namedtuple("Recording", "pcm sample_rate started ended queued_at")
+
+
+class MicrophoneSource:
+    """
+    One open input stream; read() returns int16 frames, None once closed.
+    read() and close() must be called from the same (capture) thread.
+    """
+
+    def __init__(self, device_index=None, sample_rate=16000, frame_ms=10):
+        self.device_index = device_index
+        self.sample_rate  = sample_rate
+        self.frame_ms     = frame_ms
+        self.frame_len    = sample_rate * frame_ms // 1000
+        self._frames      = None
+
+    def read(self):
+        import wakeword
+
+        if self._frames is None:
+            self._frames = wakeword.microphone_frames(self.device_index, self.sample_rate, self.frame_ms)
+        return next(self._frames, None)
+
+    def close(self):
+        if self._frames is not None:
+            self._frames.close()
 
-    try:
-        with sr.Microphone(device_index=mic_index) as source:
 
-            print("Listening...")
+class FileSource:
+    """
+    Replays WAV paths or int16/float arrays as one stream, with gap_s of
+    silence between them.  realtime=True paces frames like a live device.
+    """
 
-            audio = r.listen(source, timeout=5)
+    def __init__(self, clips, sample_rate=16000, frame_ms=10, gap_s=1.0, realtime=False):
+        import numpy as np
+        import wakeword
 
+        self.sample_rate = sample_rate
+        self.frame_len   = sample_rate * frame_ms // 1000
+        self.realtime    = realtime
+        gap    = np.zeros(int(gap_s * sample_rate), dtype=np.int16)
+        parts  = [gap]
+        for clip in clips:
+            pcm = wakeword.read_wav(clip, sample_rate) if isinstance(clip, str) else np.asarray(clip)
+            if pcm.dtype != np.int16:
+                pcm = np.clip(pcm * 32768.0, -32768, 32767).astype(np.int16)
+            parts += [pcm, gap]
+        self._pcm    = np.concatenate(parts)
+        self._pos    = 0
+        self._t0     = None
+        self._closed = False
+
+    def read(self):
+        if self._closed or self._pos + self.frame_len > len(self._pcm):
+            return None
+        if self.realtime:
+            if self._t0 is None:
+                self._t0 = time.monotonic()
+            ahead = self._t0 + self._pos / self.sample_rate - time.monotonic()
+            if ahead > 0:
+                time.sleep(ahead)
+        frame = self._pcm[self._pos:self._pos + self.frame_len]
+        self._pos += self.frame_len
+        return frame
+
+    def close(self):
+        self._closed = True
+
+
+class GoogleRecognizer:
+    """speech_recognition's Google Web Speech API; returns "" when nothing is understood."""
+
+    def __init__(self):
+        import speech_recognition as sr
+        self._sr         = sr
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, pcm, sample_rate):
+        audio = self._sr.AudioData(pcm.tobytes(), sample_rate, 2)
+        try:
+            return self._recognizer.recognize_google(audio)
+        except self._sr.UnknownValueError:
+            return ""
+
+
+class ScriptedRecognizer:
+    """Headless stand-in: returns the given transcripts in order, taking latency_s each."""
+
+    def __init__(self, transcripts=(), latency_s=0.0):
+        self.transcripts = deque(transcripts)
+        self.latency_s   = latency_s
+
+    def recognize(self, pcm, sample_rate):
+        time.sleep(self.latency_s)
+        return self.transcripts.popleft() if self.transcripts else ""
+
+
+class Endpointer:
+    """
+    Cuts a frame stream into utterances with the energy gate from
+    wakeword.py.  push() returns a finished (pcm, start_sample,
+    end_sample) or None.
+    """
+
+    def __init__(self, sample_rate=16000, frame_len=160, calibrate_ms=CAPTURE_CALIBRATE_MS,
+                 start_ms=VAD_START_MS, end_ms=VAD_END_MS, max_s=MAX_UTTERANCE_S):
+        import wakeword
+
+        frames = lambda ms: max(1, int(ms * sample_rate / 1000) // frame_len)   # noqa: E731
+        self.vad          = wakeword.EnergyVAD()
+        self.frame_len    = frame_len
+        self._calibrate   = frames(calibrate_ms)
+        self._start_after = frames(start_ms)
+        self._end_after   = frames(end_ms)
+        self._max_frames  = frames(max_s * 1000)
+        self._preroll     = deque(maxlen=frames(PREROLL_MS) + self._start_after)
+
+        self._calibration = []
+        self._frames      = []     # current utterance; empty while idle
+        self._voiced      = 0      # consecutive speech frames while idle
+        self._silent      = 0      # consecutive silent frames inside one
+        self.position     = 0      # samples seen
+
+    @property
+    def calibrated(self):
+        return self._calibration is None
+
+    @property
+    def active(self):
+        """True while an utterance is being collected."""
+        return bool(self._frames)
+
+    def push(self, frame):
+        import numpy as np
+
+        self.position += len(frame)
+        if not self.calibrated:
+            self._calibration.append(frame)
+            if len(self._calibration) >= self._calibrate:
+                pcm = np.concatenate(self._calibration).astype(np.float32) / 32768.0
+                self.vad.noise_db  = 10.0 * np.log10(float(np.dot(pcm, pcm)) / len(pcm) + 1e-12)
+                self._calibration = None
+            return None
+
+        speech = self.vad.is_speech(frame.astype(np.float32) / 32768.0)
+        if not self._frames:
+            self._preroll.append(frame)
+            self._voiced = self._voiced + 1 if speech else 0
+            if self._voiced >= self._start_after:
+                self._frames = list(self._preroll)
+                self._preroll.clear()
+                self._silent = 0
+            return None
+
+        self._frames.append(frame)
+        self._silent = 0 if speech else self._silent + 1
+        if self._silent < self._end_after and len(self._frames) < self._max_frames:
+            return None
+
+        frames = self._frames[:len(self._frames) - self._silent] or self._frames
+        self._frames, self._voiced = [], 0
+        end   = self.position - self._silent * self.frame_len
+        pcm   = np.concatenate(frames)
+        return pcm, end - len(pcm), end
+
+    def reset(self):
+        """Drop any utterance in progress (keeps the calibration)."""
+        self._frames, self._voiced = [], 0
+        self._preroll.clear()
+
+
+class CaptureSession:
+    """
+    Long-lived capture: a reader thread endpoints the source into a
+    queue of Recordings, a recognizer thread turns them into text.
+    next_text() returns the next recognised command.
+    """
+
+    def __init__(self, source=None, recognizer=None, wake_word=False, max_queue=UTTERANCE_QUEUE):
+        self.source     = source
+        self.recognizer = recognizer
+        self.wake_word  = wake_word
+        self.max_queue  = max(1, int(max_queue))
+
+        self.recordings = queue.Queue(maxsize=self.max_queue)
+        self.texts      = queue.Queue()
+
+        self._lock    = threading.Lock()
+        self._threads = []
+        self._stop    = threading.Event()
+        self._hearing     = False    # capture: an utterance is being collected
+        self._outstanding = 0        # utterances queued or being recognised
+        self._counts  = dict.fromkeys(("utterances", "recognised", "empty", "dropped",
+                                       "wake_words", "failed"), 0)
+        self._audio_s     = 0.0
+        self._recog_total = 0.0
+        self._wait_total  = 0.0
+
+    # ── Public API ─────────────────────────────────────────
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return self
+            if self.source is None:
+                self.source = MicrophoneSource(get_best_mic())
+            if self.recognizer is None:
+                self.recognizer = ScriptedRecognizer() if STT_BACKEND == "null" else GoogleRecognizer()
+            self._threads = [threading.Thread(target=self._capture, name="spf-capture", daemon=True),
+                             threading.Thread(target=self._recognize, name="spf-recognize", daemon=True)]
+            for t in self._threads:
+                t.start()
+        return self
+
+    def next_text(self, timeout=None):
+        """
+        Next recognised text (lower case).  None if no speech starts within
+        timeout (a command already being heard or recognised is waited
+        for), or once the source has ended.
+        """
+        self.start()
+        until = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = None if until is None else until - time.monotonic()
+            if wait is not None and wait <= 0:
+                if not self._busy():
+                    return None
+                wait = 0.05
+            try:
+                text = self.texts.get(timeout=wait)
+                break
+            except queue.Empty:
+                continue
+        if text is None:
+            self.texts.put(None)     # keep signalling the end to later callers
+        return text
+
+    def stop(self):
+        """
+        Stop capturing.  Returns once the capture thread has closed the
+        source, so a new session can open the device straight away.
+        """
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=None if t.name == "spf-capture" else 2)
+
+    def stats(self):
+        with self._lock:
+            done = self._counts["recognised"] + self._counts["empty"]
+            return {
+                **self._counts,
+                "queue_depth":       self.recordings.qsize(),
+                "audio_s":           round(self._audio_s, 2),
+                "avg_queue_wait_ms": round(self._wait_total / done * 1000, 2) if done else 0.0,
+                "avg_recognise_ms":  round(self._recog_total / done * 1000, 2) if done else 0.0,
+            }
+
+    def _busy(self):
+        return self._hearing or self._outstanding > 0
+
+    # ── Threads ────────────────────────────────────────────
+    def _capture(self):
+        rate, flen = self.source.sample_rate, self.source.frame_len
+        endpointer = Endpointer(rate, flen)
+        detector   = None
+        if self.wake_word:
+            import wakeword
+            detector = wakeword.WakeWordDetector.load(frame_ms=flen * 1000 // rate)
+        armed = not self.wake_word
+
+        try:
+            while not self._stop.is_set():
+                frame = self.source.read()
+                if frame is None:
+                    break
+                if not armed:
+                    endpointer.push(frame)           # keeps calibrating / tracking the noise floor
+                    if detector.feed(frame):
+                        armed = True
+                        endpointer.reset()
+                        self._count("wake_words")
+                    continue
+
+                cut = endpointer.push(frame)
+                if cut is None:
+                    self._hearing = endpointer.active
+                    continue
+                pcm, start, end = cut
+                self._enqueue(Recording(pcm, rate, start / rate, end / rate, time.monotonic()))
+                self._hearing = False
+                armed = not self.wake_word
+        except Exception as e:
+            print(f"[SPF] Capture stopped: {e}")
+        finally:
+            try:
+                self.source.close()
+            except Exception as e:
+                print(f"[SPF] Closing the audio source failed: {e}")
+            self._hearing = False
+            self.recordings.put(None)
+
+    def _enqueue(self, recording):
+        while True:
+            try:
+                self.recordings.put_nowait(recording)
+                break
+            except queue.Full:
+                try:
+                    self.recordings.get_nowait()      # oldest command is the least useful
+                    self._count("dropped")
+                    self._finished()
+                except queue.Empty:
+                    pass
+        with self._lock:
+            self._counts["utterances"] += 1
+            self._outstanding += 1
+            self._audio_s += len(recording.pcm) / recording.sample_rate
+
+    def _recognize(self):
+        while True:
+            rec = self.recordings.get()
+            if rec is None:
+                self.texts.put(None)
+                return
+            t0 = time.monotonic()
+            try:
+                text = (self.recognizer.recognize(rec.pcm, rec.sample_rate) or "").strip().lower()
+            except Exception as e:
+                print(f"[SPF] Recognition failed: {e}")
+                self._count("failed")
+                self._finished()
+                continue
+            with self._lock:
+                self._counts["recognised" if text else "empty"] += 1
+                self._wait_total  += t0 - rec.queued_at
+                self._recog_total += time.monotonic() - t0
+            if text:
+                print("Heard:", text)
+                self.texts.put(text)
+            self._finished()             # only now, so next_text() never sees a gap
+
+    def _finished(self):
+        with self._lock:
+            self._outstanding -= 1
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+
+_capture      = None
+_capture_lock = threading.Lock()
+
+
+def get_capture_session(wake_word=False):
+    """The process-wide capture session, started on first use."""
+    global _capture
+    with _capture_lock:
+        if _capture is None or _capture.wake_word != wake_word:
+            if _capture is not None:
+                _capture.stop()
+            _capture = CaptureSession(wake_word=wake_word)
+        return _capture.start()
+
+
+def get_voice(wake_word=False, timeout=LISTEN_TIMEOUT_S):
+    """
+    Next recognised command (lower case), or "" if nobody starts
+    speaking within timeout seconds (None waits indefinitely).  The
+    microphone stays open between calls; wake_word=True only returns
+    what is said after "hey spf".
+    """
+    try:
+        text = get_capture_session(wake_word).next_text(timeout)
     except Exception as e:
         print("Mic Error:", e)
         return ""
-
-    try:
-        text = r.recognize_google(audio)
-        print("Heard:", text)
-        return text.lower()
-    except:
-        print("Nothing recognized")
-        return ""
\ No newline at end of file
+    return text or ""
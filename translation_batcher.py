@@ -0,0 +1,175 @@
+"""
+SPF Translation Batcher — coalesced network translation
+========================================================
+Concurrent requests each need one or two short translations (input →
+English, reply slots → the user's language), and every one of them
+used to be its own HTTP round trip.  The batcher queues them per
+(source, target) pair instead.  A single worker thread flushes a pair
+once its oldest string has waited the window, or as soon as the pair
+has a full batch, as one translate_many(texts, source, target) call.
+Each caller gets its own string back through a Future.
+
+• An identical (text, source, target) already queued or in flight is
+  not sent again: the second caller shares the first caller's Future.
+• Flushes run on a small pool, so a slow pair never holds up another.
+• A failed batch fails every caller in it; nothing is retried here.
+
+Tuning (environment):
+  SPF_TRANSLATE_BATCH_MS      how long a string waits for company   (default 10, 0 = off)
+  SPF_TRANSLATE_BATCH_SIZE    max strings per call                   (default 32)
+  SPF_TRANSLATE_BATCH_CHARS   max characters per call                (default 4000)
+  SPF_TRANSLATE_QUEUE_DEPTH   strings pending before rejecting       (default 512)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+TRANSLATE_BATCH_MS    = float(os.environ.get("SPF_TRANSLATE_BATCH_MS", "10"))
+TRANSLATE_BATCH_SIZE  = int(os.environ.get("SPF_TRANSLATE_BATCH_SIZE", "32"))
+TRANSLATE_BATCH_CHARS = int(os.environ.get("SPF_TRANSLATE_BATCH_CHARS", "4000"))   # Google takes 5000
+TRANSLATE_QUEUE_DEPTH = int(os.environ.get("SPF_TRANSLATE_QUEUE_DEPTH", "512"))
+
+
+class BatcherFull(Exception):
+    """Raised by submit() when TRANSLATE_QUEUE_DEPTH strings are pending."""
+
+
+class TranslationBatcher:
+    def __init__(self, translate_many, window_ms=TRANSLATE_BATCH_MS, max_batch=TRANSLATE_BATCH_SIZE,
+                 max_chars=TRANSLATE_BATCH_CHARS, max_pending=TRANSLATE_QUEUE_DEPTH, workers=8):
+        self.translate_many = translate_many
+        self.window      = window_ms / 1000.0
+        self.max_batch   = max(1, int(max_batch))
+        self.max_chars   = max(1, int(max_chars))
+        self.max_pending = max(1, int(max_pending))
+        self.workers     = max(1, int(workers))
+        self._reset()
+
+        self._batches  = 0
+        self._sent     = 0       # strings sent over the network
+        self._requests = 0       # submit() calls
+        self._shared   = 0       # submit() calls answered by an in-flight string
+        self._rejected = 0
+        self._errors   = 0
+
+    def _reset(self):
+        self._queues   = {}      # (source, target) → [first queued at, [texts], chars]
+        self._inflight = {}      # (text, source, target) → Future, until delivered
+        self._cond     = threading.Condition()
+        self._thread   = None
+        self._pool     = None
+
+    # ── Public API ─────────────────────────────────────────
+    def submit(self, text, source, target):
+        """Queue one translation. Returns a Future[str], shared with identical pending calls."""
+        key = (text, source, target)
+        with self._cond:
+            self._requests += 1
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self._shared += 1
+                return fut
+            if len(self._inflight) >= self.max_pending:
+                self._rejected += 1
+                raise BatcherFull(f"{len(self._inflight)} translations pending")
+            self._ensure_worker()
+            fut = self._inflight[key] = Future()
+            queue = self._queues.setdefault((source, target), [time.monotonic(), [], 0])
+            queue[1].append(text)
+            queue[2] += len(text) + 1
+            self._cond.notify()
+        return fut
+
+    def translate(self, text, source, target, timeout=None):
+        """Blocking helper: submit and wait for the translation."""
+        return self.submit(text, source, target).result(timeout)
+
+    def after_fork(self):
+        """Drop the worker and pool inherited from the parent (call in a forked child)."""
+        self._reset()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pending":        len(self._inflight),
+                "requests":       self._requests,
+                "shared":         self._shared,
+                "sent":           self._sent,
+                "batches":        self._batches,
+                "rejected":       self._rejected,
+                "errors":         self._errors,
+                "avg_batch_size": round(self._sent / self._batches, 2) if self._batches else 0.0,
+                "window_ms":      self.window * 1000.0,
+                "max_batch_size": self.max_batch,
+            }
+
+    # ── Worker ─────────────────────────────────────────────
+    def _ensure_worker(self):
+        # Called with self._cond held; nothing starts until first use
+        if self._thread is None or not self._thread.is_alive():
+            self._pool   = ThreadPoolExecutor(self.workers, thread_name_prefix="spf-translate-batch")
+            self._thread = threading.Thread(target=self._run, name="spf-translate-batcher", daemon=True)
+            self._thread.start()
+
+    def _due(self, now):
+        """Pairs ready to flush, and how long until the next one is."""
+        due, wait = [], None
+        for pair, (since, texts, chars) in self._queues.items():
+            left = since + self.window - now
+            if left <= 0 or len(texts) >= self.max_batch or chars >= self.max_chars:
+                due.append(pair)
+            else:
+                wait = left if wait is None else min(wait, left)
+        return due, wait
+
+    def _take(self, pair):
+        """Up to one batch of pair's queued texts; the rest stay queued (already due)."""
+        since, texts, _ = self._queues[pair]
+        batch, chars = [], 0
+        while texts and len(batch) < self.max_batch and (not batch or chars + len(texts[0]) < self.max_chars):
+            chars += len(texts[0]) + 1
+            batch.append(texts.pop(0))
+        if texts:
+            self._queues[pair] = [since, texts, sum(len(t) + 1 for t in texts)]
+        else:
+            del self._queues[pair]
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    due, wait = self._due(time.monotonic())
+                    if due:
+                        break
+                    self._cond.wait(wait)
+                batches = [(pair, self._take(pair)) for pair in due]
+                pool    = self._pool
+            for pair, texts in batches:
+                pool.submit(self._flush, pair, texts)
+
+    def _flush(self, pair, texts):
+        source, target = pair
+        try:
+            results = self.translate_many(texts, source, target)
+            if len(results) != len(texts):
+                raise ValueError(f"{len(results)} translations for {len(texts)} texts")
+        except Exception as e:
+            print(f"[SPF] Translation batch of {len(texts)} ({source}→{target}) failed: {e}")
+            self._deliver(pair, texts, error=e)
+            return
+        self._deliver(pair, texts, results)
+
+    def _deliver(self, pair, texts, results=None, error=None):
+        with self._cond:
+            self._batches += 1
+            self._sent    += len(texts)
+            self._errors  += len(texts) if error is not None else 0
+            futures = [self._inflight.pop((text, *pair)) for text in texts]
+        for i, fut in enumerate(futures):
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(results[i])
@@ -0,0 +1,247 @@
+"""
+SPF Translation Cache — in-process LRU + optional SQLite store
+==============================================================
+Car commands repeat heavily, so translations are cached by
+(text, source, target):
+
+  1. In-process LRU with a size cap and TTL.
+  2. Optional on-disk SQLite store that survives restarts and can be
+     pre-seeded.  A disk hit is promoted into the LRU.
+
+Only successful translations are stored — callers must not put()
+a fallback value after a failed translation.  Expired entries are not
+returned by get() but stay available to get_stale(), which a request
+out of time may use rather than wait on the network.
+
+Configuration (environment):
+  SPF_TRANSLATION_CACHE_SIZE   max LRU entries             (default 4096)
+  SPF_TRANSLATION_CACHE_TTL    seconds, 0 = never expire   (default 86400)
+  SPF_TRANSLATION_CACHE_DB     SQLite path, unset = memory only
+
+Pre-seed from a TSV file (text, source, target, translation per line):
+  python translation_cache.py seed seeds.tsv
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.environ.get("SPF_TRANSLATION_CACHE_SIZE", "4096"))
+CACHE_TTL  = float(os.environ.get("SPF_TRANSLATION_CACHE_TTL", "86400"))
+CACHE_DB   = os.environ.get("SPF_TRANSLATION_CACHE_DB") or None
+
+
+class TranslationCache:
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, db_path=CACHE_DB):
+        self.max_size = max(1, int(max_size))
+        self.ttl      = float(ttl)
+        self.db_path  = db_path
+
+        self._lru  = OrderedDict()   # key → (translated, created)
+        self._lock = threading.Lock()
+        self._db   = None
+        self._db_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits   = 0
+        self.misses      = 0
+        self.stale_hits  = 0
+        self.evictions   = 0
+
+        if db_path:
+            self._open_db(db_path)
+
+    # ── Public API ─────────────────────────────────────────
+    def get(self, text, source, target):
+        """Return the cached translation or None."""
+        key = (text, source, target)
+        now = time.time()
+
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is not None and not self._expired(hit[1], now):
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return hit[0]
+            # An expired entry stays until replaced or evicted; see get_stale()
+
+        hit = self._db_get(key)
+        if hit is not None and not self._expired(hit[1], now):
+            with self._lock:
+                self._insert(key, hit)
+                self.disk_hits += 1
+            return hit[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get_stale(self, text, source, target):
+        """Cached translation even if expired (for when the network is too slow), or None."""
+        key = (text, source, target)
+        with self._lock:
+            hit = self._lru.get(key)
+        if hit is None:
+            hit = self._db_get(key)
+        if hit is None:
+            return None
+        with self._lock:
+            self.stale_hits += 1
+        return hit[0]
+
+    def put(self, text, source, target, translated):
+        if not translated:
+            return
+        key   = (text, source, target)
+        entry = (translated, time.time())
+        with self._lock:
+            self._insert(key, entry)
+        self._db_put([(key, entry)])
+
+    def discard(self, text, source, target):
+        """Forget one translation, in memory and on disk (e.g. one that came back unusable)."""
+        key = (text, source, target)
+        with self._lock:
+            self._lru.pop(key, None)
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    self._db.execute("DELETE FROM translations WHERE text = ? AND source = ? AND target = ?", key)
+                    self._db.commit()
+            except sqlite3.Error as e:
+                print(f"[SPF] Translation cache write failed ({e})")
+
+    def seed(self, entries):
+        """Bulk-load (text, source, target, translated) tuples. Returns count."""
+        now  = time.time()
+        rows = [((t, s, g), (tr, now)) for t, s, g, tr in entries if tr]
+        with self._lock:
+            for key, entry in rows:
+                self._insert(key, entry)
+        self._db_put(rows)
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def preload(self, limit=None):
+        """Fill the LRU from the SQLite store, newest first. Returns rows loaded."""
+        if self._db is None:
+            return 0
+        limit = self.max_size if limit is None else min(limit, self.max_size)
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT text, source, target, translated, created FROM translations"
+                " ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        now = time.time()
+        with self._lock:
+            for text, source, target, translated, created in reversed(rows):
+                if not self._expired(created, now):
+                    self._insert((text, source, target), (translated, created))
+        return len(rows)
+
+    def reopen(self):
+        """
+        Give a forked child its own SQLite connection; one must not be
+        used on both sides of fork().  The inherited one is kept, not
+        closed, so the parent's locks are left alone.
+        """
+        self._lock    = threading.Lock()
+        self._db_lock = threading.Lock()
+        if self._db is not None:
+            self._inherited_db = self._db
+            self._open_db(self.db_path)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "size":        len(self._lru),
+                "max_size":    self.max_size,
+                "memory_hits": self.memory_hits,
+                "disk_hits":   self.disk_hits,
+                "misses":      self.misses,
+                "stale_hits":  self.stale_hits,
+                "evictions":   self.evictions,
+                "hit_rate":    round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk":        self.db_path,
+            }
+
+    # ── Internals ──────────────────────────────────────────
+    def _expired(self, created, now):
+        return self.ttl > 0 and now - created > self.ttl
+
+    def _insert(self, key, entry):
+        # Called with self._lock held
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+            self.evictions += 1
+
+    def _open_db(self, path):
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " text TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL,"
+            " translated TEXT NOT NULL, created REAL NOT NULL,"
+            " PRIMARY KEY (text, source, target))"
+        )
+        self._db.commit()
+
+    def _db_get(self, key):
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT translated, created FROM translations"
+                    " WHERE text = ? AND source = ? AND target = ?", key
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[SPF] Translation cache read failed ({e})")
+            return None
+        return tuple(row) if row else None
+
+    def _db_put(self, rows):
+        if self._db is None or not rows:
+            return
+        try:
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                    [(*key, tr, created) for key, (tr, created) in rows],
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"[SPF] Translation cache write failed ({e})")
+
+
+def main(argv):
+    if len(argv) == 2 and argv[0] == "seed":
+        if not CACHE_DB:
+            print("Set SPF_TRANSLATION_CACHE_DB to the SQLite file to seed.")
+            return 2
+        with open(argv[1], encoding="utf-8") as f:
+            entries = [line.rstrip("\n").split("\t") for line in f if line.strip()]
+        n = TranslationCache().seed(e for e in entries if len(e) == 4)
+        print(f"[SPF] Seeded {n} translations → {CACHE_DB}")
+        return 0
+    print("usage: python translation_cache.py seed <file.tsv>")
+    return 2
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))
@@ -1,2 +1,492 @@
+"""
+SPF Wake Word — streaming "hey spf" detection
+==============================================
+Finding the wake word by running full speech recognition and then
+stripping "hey spf" from the text costs a recognizer pass on everything
+the microphone hears.  WakeWordDetector instead looks at raw PCM:
+
+  • fixed-size frames (SPF_WAKE_FRAME_MS) go into a ring buffer
+  • an energy gate with an adaptive noise floor finds speech; silence
+    and steady noise cost one dot product per frame
+  • when a burst of speech ends and its length fits a wake word, its
+    MFCCs (NumPy) are matched by DTW against the enrolled templates
+
+Speech recognition starts only after a detection
+(speech.get_voice(wake_word=True)).
+
+  python wakeword.py enroll a.wav b.wav c.wav     # 3+ clips of "hey spf"
+  python wakeword.py run stream.wav               # detections + CPU
+  python wakeword.py eval --positive p/*.wav --negative n/*.wav
+
+WAV files must be mono 16-bit PCM at SPF_WAKE_SAMPLE_RATE.
+benchmarks/wakeword_eval.py runs the same evaluation on synthetic audio.
+
+Configuration (environment):
+  SPF_WAKE_TEMPLATES     enrolled templates file  (default models/wakeword.npz)
+  SPF_WAKE_SAMPLE_RATE   Hz                       (default 16000)
+  SPF_WAKE_FRAME_MS      frame size               (default 10)
+  SPF_WAKE_MARGIN        threshold = margin × largest distance
+                         between enrolled templates (default 1.5)
+  SPF_VAD_MARGIN_DB      speech = this far above the noise floor (default 9)
+"""
+
+import math
+import os
+import time
+import wave
+from collections import namedtuple
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WAKE_TEMPLATES = os.environ.get("SPF_WAKE_TEMPLATES", os.path.join(BASE_DIR, "models", "wakeword.npz"))
+SAMPLE_RATE    = int(os.environ.get("SPF_WAKE_SAMPLE_RATE", "16000"))
+FRAME_MS       = int(os.environ.get("SPF_WAKE_FRAME_MS", "10"))
+WAKE_MARGIN    = float(os.environ.get("SPF_WAKE_MARGIN", "1.5"))
+VAD_MARGIN_DB  = float(os.environ.get("SPF_VAD_MARGIN_DB", "9"))
+
+VAD_MIN_DB     = -55.0   # never call anything quieter than this speech
+HANGOVER_MS    = 250     # silence that ends a burst (spans the gap in "hey … spf")
+PREROLL_MS     = 50      # audio kept before the gate opened
+MIN_WAKE_MS    = 300     # bursts shorter / longer than these are not scored
+MAX_WAKE_MS    = 1800
+RING_SECONDS   = 3.0
+
+Detection = namedtuple("Detection", "start_s end_s distance")
+
+
 def remove_wake_word(text):
     return text.replace("hey spf", "").strip()
+
+
+# ═══════════════════════════════════════════════════════════
+#  Features
+# ═══════════════════════════════════════════════════════════
+
+N_FFT   = 512
+N_MELS  = 26
+N_MFCC  = 13
+WIN_MS  = 25
+HOP_MS  = 10
+FLOOR_DB = 30   # mel energies this far below the clip's peak are clamped
+
+_filters = {}
+
+
+def _mel_filterbank(sample_rate):
+    """(N_MELS, N_FFT//2+1) triangular filters and the (N_MFCC, N_MELS) DCT-II matrix, cached."""
+    if sample_rate not in _filters:
+        mel   = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)           # noqa: E731
+        hz    = lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0)           # noqa: E731
+        edges = hz(np.linspace(mel(20.0), mel(sample_rate / 2), N_MELS + 2))
+        bins  = np.fft.rfftfreq(N_FFT, 1.0 / sample_rate)
+        lo, mid, hi = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+        fbank = np.maximum(0.0, np.minimum((bins - lo) / (mid - lo), (hi - bins) / (hi - mid)))
+
+        n   = np.arange(N_MELS)
+        dct = np.cos(np.pi / N_MELS * (n + 0.5)[None, :] * np.arange(N_MFCC)[:, None])
+        _filters[sample_rate] = (fbank.astype(np.float32), dct.astype(np.float32))
+    return _filters[sample_rate]
+
+
+def mfcc(signal, sample_rate=SAMPLE_RATE):
+    """
+    (frames, N_MFCC - 1) MFCCs of a float signal: pre-emphasis, Hamming
+    window, power spectrum, log mel energies, DCT.  Energies more than
+    FLOOR_DB below the clip's peak are clamped, so the background noise
+    level relative to the speaker matters less; c0 (loudness) is dropped
+    and each coefficient is mean-normalised over the clip, so distance
+    and microphone gain do not matter.
+    """
+    win, hop = sample_rate * WIN_MS // 1000, sample_rate * HOP_MS // 1000
+    signal   = np.asarray(signal, dtype=np.float32)
+    if len(signal) < win:
+        signal = np.pad(signal, (0, win - len(signal)))
+    emphasised = np.append(signal[0], signal[1:] - 0.97 * signal[:-1])
+
+    frames = np.lib.stride_tricks.sliding_window_view(emphasised, win)[::hop] * np.hamming(win)
+    power  = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    fbank, dct = _mel_filterbank(sample_rate)
+    logmel = np.log(power @ fbank.T + 1e-10)
+    logmel = np.maximum(logmel, logmel.max() - FLOOR_DB * np.log(10) / 10)
+    feats  = (logmel @ dct.T)[:, 1:]
+    return (feats - feats.mean(axis=0)).astype(np.float32)
+
+
+def dtw_distance(a, b, max_ratio=2.0):
+    """
+    Length-normalised DTW distance between feature sequences a (n, d)
+    and b (m, d).  Cells on one anti-diagonal depend only on the two
+    before it, so each diagonal is filled in one vectorised step.
+    """
+    n, m = len(a), len(b)
+    if not n or not m or max(n, m) > max_ratio * min(n, m):
+        return np.inf
+
+    sq   = (a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2.0 * a @ b.T
+    cost = np.sqrt(np.maximum(sq, 0.0))
+
+    acc = np.full((n + 1, m + 1), np.inf, dtype=np.float64)
+    acc[0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        acc[i, j] = cost[i - 1, j - 1] + np.minimum(np.minimum(acc[i - 1, j], acc[i, j - 1]),
+                                                    acc[i - 1, j - 1])
+    return float(acc[n, m] / (n + m))
+
+
+# ═══════════════════════════════════════════════════════════
+#  Streaming front end
+# ═══════════════════════════════════════════════════════════
+
+class RingBuffer:
+    """Fixed-size float32 sample history; write() never allocates."""
+
+    def __init__(self, size):
+        self.size    = int(size)
+        self._buf    = np.zeros(self.size, dtype=np.float32)
+        self._pos    = 0
+        self.written = 0
+
+    def write(self, samples):
+        samples = samples[-self.size:]
+        n   = len(samples)
+        end = self._pos + n
+        if end <= self.size:
+            self._buf[self._pos:end] = samples
+        else:
+            split = self.size - self._pos
+            self._buf[self._pos:] = samples[:split]
+            self._buf[:n - split] = samples[split:]
+        self._pos     = end % self.size
+        self.written += n
+
+    def latest(self, n):
+        """The last n samples written (fewer if not that many are held)."""
+        n = min(int(n), self.size, self.written)
+        start = (self._pos - n) % self.size
+        if start + n <= self.size:
+            return self._buf[start:start + n].copy()
+        return np.concatenate((self._buf[start:], self._buf[:self._pos]))
+
+
+class EnergyVAD:
+    """
+    Frame energy against an adaptive noise floor.  The floor follows
+    quieter frames at once and louder non-speech frames slowly, so a fan
+    or engine hum is learned without speech raising it.
+    """
+
+    def __init__(self, margin_db=VAD_MARGIN_DB, min_db=VAD_MIN_DB, adapt=0.05):
+        self.margin_db = margin_db
+        self.min_db    = min_db
+        self.adapt     = adapt
+        self.noise_db  = None
+
+    def is_speech(self, frame):
+        energy = 10.0 * math.log10(float(np.dot(frame, frame)) / len(frame) + 1e-12)
+        if self.noise_db is None:
+            self.noise_db = energy
+        speech = energy > max(self.noise_db + self.margin_db, self.min_db)
+        if energy < self.noise_db:
+            self.noise_db = energy
+        elif not speech:
+            self.noise_db += self.adapt * (energy - self.noise_db)
+        return speech
+
+
+class WakeWordDetector:
+    """
+    feed() one frame of PCM at a time; it returns a Detection when an
+    enrolled wake word has just ended, else None.  Not thread-safe: one
+    detector per audio stream.
+    """
+
+    def __init__(self, templates=(), threshold=np.inf, sample_rate=SAMPLE_RATE,
+                 frame_ms=FRAME_MS, vad=None):
+        self.templates   = [np.asarray(t, dtype=np.float32) for t in templates]
+        self.threshold   = threshold
+        self.sample_rate = sample_rate
+        self.frame_len   = sample_rate * frame_ms // 1000
+        self.vad         = vad or EnergyVAD()
+
+        ms = lambda v: sample_rate * v // 1000   # noqa: E731
+        self._hangover = ms(HANGOVER_MS)
+        self._preroll  = ms(PREROLL_MS)
+        self._min_len  = ms(MIN_WAKE_MS)
+        self._max_len  = ms(MAX_WAKE_MS)
+        self._ring     = RingBuffer(sample_rate * RING_SECONDS)
+
+        self._start      = None    # sample index where the current burst began
+        self._last_voice = 0       # sample index just after its last speech frame
+        self._overlong   = False   # inside a burst too long to be a wake word
+
+        self._stats = dict.fromkeys(("frames", "speech_frames", "bursts", "scored", "detections"), 0)
+        self._cpu   = 0.0
+
+    @classmethod
+    def load(cls, path=WAKE_TEMPLATES, **kwargs):
+        with np.load(path) as npz:
+            templates   = [npz[k] for k in sorted(npz.files) if k.startswith("template_")]
+            threshold   = float(npz["threshold"])
+            sample_rate = int(npz["sample_rate"])
+        return cls(templates, threshold, sample_rate=sample_rate, **kwargs)
+
+    # ── Public API ─────────────────────────────────────────
+    def feed(self, frame):
+        """One frame of int16 or float PCM. Returns a Detection or None."""
+        t0    = time.process_time()
+        burst = self._segment(_as_float(frame))
+        found = self._score(burst) if burst is not None else None
+        self._cpu += time.process_time() - t0
+        return found
+
+    def flush(self):
+        """End of stream: score a burst still open."""
+        burst = self._close(self._last_voice + self._hangover) if self._start is not None else None
+        return self._score(burst) if burst is not None else None
+
+    def feed_signal(self, signal):
+        """Feed a whole signal frame by frame, then flush; yields every Detection."""
+        for frame in self._frames(signal):
+            found = self.feed(frame)
+            if found:
+                yield found
+        found = self.flush()
+        if found:
+            yield found
+
+    def bursts(self, signal):
+        """The wake-word-length speech bursts in signal, cut as feed() would cut them."""
+        cuts = [self._segment(frame) for frame in self._frames(signal)]
+        if self._start is not None:
+            cuts.append(self._close(self._last_voice + self._hangover))
+        return [c for c in cuts if c is not None]
+
+    def stats(self):
+        audio_s = self._stats["frames"] * self.frame_len / self.sample_rate
+        return {
+            **self._stats,
+            "audio_s":         round(audio_s, 2),
+            "cpu_s":           round(self._cpu, 4),
+            "cpu_per_audio_s": round(self._cpu / audio_s, 5) if audio_s else 0.0,
+            "noise_floor_db":  round(self.vad.noise_db, 1) if self.vad.noise_db is not None else None,
+        }
+
+    # ── Internals ──────────────────────────────────────────
+    def _frames(self, signal):
+        signal = _as_float(signal)
+        for i in range(0, len(signal) - self.frame_len + 1, self.frame_len):
+            yield signal[i:i + self.frame_len]
+
+    def _segment(self, frame):
+        """Gate one frame; returns a finished burst's audio when one of wake-word length ends."""
+        self._ring.write(frame)
+        now = self._ring.written
+        self._stats["frames"] += 1
+
+        if self.vad.is_speech(frame):
+            self._stats["speech_frames"] += 1
+            self._last_voice = now
+            if self._overlong:
+                return None
+            if self._start is None:
+                self._start = now - len(frame)
+            elif now - self._start > self._max_len:
+                self._start, self._overlong = None, True
+            return None
+
+        if now - self._last_voice < self._hangover:
+            return None
+        self._overlong = False
+        return self._close(now) if self._start is not None else None
+
+    def _close(self, now):
+        start, end  = self._start, self._last_voice
+        self._start = None
+        self._stats["bursts"] += 1
+        if not self._min_len <= end - start <= self._max_len:
+            return None
+        start = max(start - self._preroll, self._ring.written - self._ring.size)
+        return self._ring.latest(self._ring.written - start)[:end - start]
+
+    def _score(self, burst):
+        if not self.templates:
+            return None
+        self._stats["scored"] += 1
+        distance = min(dtw_distance(mfcc(burst, self.sample_rate), t) for t in self.templates)
+        if distance > self.threshold:
+            return None
+        self._stats["detections"] += 1
+        end = self._last_voice
+        return Detection(round((end - len(burst)) / self.sample_rate, 3), round(end / self.sample_rate, 3),
+                         round(distance, 3))
+
+
+def _as_float(frame):
+    frame = np.asarray(frame)
+    if frame.dtype == np.int16:
+        return frame.astype(np.float32) / 32768.0
+    return frame.astype(np.float32, copy=False)
+
+
+# ═══════════════════════════════════════════════════════════
+#  Enrollment
+# ═══════════════════════════════════════════════════════════
+
+def enroll(signals, sample_rate=SAMPLE_RATE, margin=WAKE_MARGIN):
+    """
+    Templates from clips of the wake word (one utterance each), cut by
+    the same speech gate the detector uses.  Returns (templates, threshold):
+    the threshold is margin × the largest distance between two templates.
+    """
+    templates = []
+    for signal in signals:
+        cuts = WakeWordDetector(sample_rate=sample_rate).bursts(signal)
+        if not cuts:
+            raise ValueError("no wake-word-length speech found in an enrollment clip")
+        templates.append(mfcc(max(cuts, key=len), sample_rate))
+    if len(templates) < 2:
+        raise ValueError("enroll at least 2 clips so a threshold can be set")
+
+    spread = max(dtw_distance(a, b) for i, a in enumerate(templates) for b in templates[i + 1:])
+    if not np.isfinite(spread):
+        raise ValueError("enrollment clips differ too much in length")
+    return templates, spread * margin
+
+
+def save_templates(templates, threshold, path=WAKE_TEMPLATES, sample_rate=SAMPLE_RATE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, threshold=threshold, sample_rate=sample_rate,
+             **{f"template_{i:03d}": t for i, t in enumerate(templates)})
+    os.replace(tmp, path)
+    print(f"[SPF] {len(templates)} wake-word templates saved → {path}  (threshold {threshold:.3f})")
+
+
+# ═══════════════════════════════════════════════════════════
+#  Audio sources
+# ═══════════════════════════════════════════════════════════
+
+def read_wav(path, sample_rate=SAMPLE_RATE):
+    with wave.open(path, "rb") as w:
+        if w.getnchannels() != 1 or w.getsampwidth() != 2 or w.getframerate() != sample_rate:
+            raise ValueError(f"{path}: need mono 16-bit PCM at {sample_rate} Hz")
+        return np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+
+
+def write_wav(path, signal, sample_rate=SAMPLE_RATE):
+    pcm = np.clip(_as_float(signal) * 32768.0, -32768, 32767).astype(np.int16)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+
+
+def microphone_frames(device_index=None, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """Yield int16 frames from the microphone until the generator is closed."""
+    import pyaudio
+
+    frame_len = sample_rate * frame_ms // 1000
+    audio  = pyaudio.PyAudio()
+    stream = audio.open(format=pyaudio.paInt16, channels=1, rate=sample_rate, input=True,
+                        input_device_index=device_index, frames_per_buffer=frame_len)
+    try:
+        while True:
+            data = stream.read(frame_len, exception_on_overflow=False)
+            yield np.frombuffer(data, dtype=np.int16)
+    finally:
+        stream.stop_stream()
+        stream.close()
+        audio.terminate()
+
+
+def wait_for_wake_word(frames, detector=None):
+    """Consume frames until the wake word is heard. Returns the Detection, or None if frames run out."""
+    detector = detector or WakeWordDetector.load()
+    for frame in frames:
+        found = detector.feed(frame)
+        if found:
+            return found
+    return None
+
+
+# ═══════════════════════════════════════════════════════════
+#  Evaluation
+# ═══════════════════════════════════════════════════════════
+
+def evaluate(detector_factory, positives, negatives):
+    """
+    positives / negatives: signals that do / do not contain the wake word.
+    A positive counts as accepted if any detection fires in it; every
+    detection in a negative is a false accept.
+    """
+    rejected, false_accepts = 0, 0
+    cpu, audio_s, scored = 0.0, 0.0, 0
+    for signals, positive in ((positives, True), (negatives, False)):
+        for signal in signals:
+            detector = detector_factory()
+            hits     = list(detector.feed_signal(signal))
+            if positive:
+                rejected += not hits
+            else:
+                false_accepts += len(hits)
+            s = detector.stats()
+            cpu, audio_s, scored = cpu + s["cpu_s"], audio_s + s["audio_s"], scored + s["scored"]
+
+    negative_h = sum(len(x) for x in negatives) / SAMPLE_RATE / 3600 if negatives else 0.0
+    return {
+        "positives":        len(positives),
+        "negatives":        len(negatives),
+        "false_reject":     round(rejected / len(positives), 4) if positives else 0.0,
+        "false_accept":     round(false_accepts / len(negatives), 4) if negatives else 0.0,
+        "false_accepts_per_hour": round(false_accepts / negative_h, 1) if negative_h else 0.0,
+        "bursts_scored":    scored,
+        "audio_s":          round(audio_s, 1),
+        "cpu_per_audio_s":  round(cpu / audio_s, 5) if audio_s else 0.0,
+    }
+
+
+def main(argv):
+    import argparse
+
+    ap  = argparse.ArgumentParser(prog="python wakeword.py")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("enroll", help="build templates from WAV clips of the wake word")
+    p.add_argument("wavs", nargs="+")
+    p = sub.add_parser("run", help="stream a WAV file through the detector")
+    p.add_argument("wav")
+    p = sub.add_parser("eval", help="false accept / false reject and CPU on labelled WAV clips")
+    p.add_argument("--positive", nargs="+", default=[])
+    p.add_argument("--negative", nargs="+", default=[])
+    args = ap.parse_args(argv)
+
+    if args.command == "enroll":
+        templates, threshold = enroll([read_wav(p) for p in args.wavs])
+        save_templates(templates, threshold)
+        return 0
+
+    if not os.path.exists(WAKE_TEMPLATES):
+        print(f"[SPF] No wake-word templates at {WAKE_TEMPLATES}; run: python wakeword.py enroll …")
+        return 1
+
+    if args.command == "run":
+        detector = WakeWordDetector.load()
+        for found in detector.feed_signal(read_wav(args.wav)):
+            print(f"[SPF] wake word {found.start_s:.2f}–{found.end_s:.2f}s  distance {found.distance}")
+        print(detector.stats())
+        return 0
+
+    report = evaluate(WakeWordDetector.load,
+                      [read_wav(p) for p in args.positive], [read_wav(p) for p in args.negative])
+    for key, value in report.items():
+        print(f"  {key:24s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main(sys.argv[1:]))